@@ -22,7 +22,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import json
 from dataclasses import replace
-from statistics import median
+from statistics import median, NormalDist
 import argparse
 
 from looking_glass.orchestrator import Orchestrator, SystemParams
@@ -33,6 +33,9 @@ from looking_glass.sim.sensor import PDParams
 from looking_glass.sim.tia import TIAParams
 from looking_glass.sim.comparator import ComparatorParams
 from looking_glass.sim.clock import ClockParams
+from looking_glass.stats import wilson_ci
+from looking_glass.profiling import StageProfiler
+from looking_glass.cascade import CascadeEngine
 
 
 def _parse_csv_floats(csv: str | None):
@@ -63,16 +66,10 @@ def med_ber(rows):
 
 def _wilson_ci(n_err: int, n_bits: int, z: float = 1.96):
     try:
-        n = int(n_bits)
-        k = int(n_err)
-        if n <= 0:
+        if int(n_bits) <= 0:
             return None, None
-        p = k / n
-        denom = 1 + (z*z)/n
-        center = (p + (z*z)/(2*n)) / denom
-        half = (z * ((p*(1-p)/n + (z*z)/(4*n*n)) ** 0.5)) / denom
-        lo = max(0.0, center - half)
-        hi = min(1.0, center + half)
+        conf = 2.0 * NormalDist().cdf(float(z)) - 1.0
+        lo, hi = wilson_ci(n_err, n_bits, conf=conf)
         return float(lo), float(hi)
     except Exception:
         return None, None
@@ -224,7 +221,6 @@ def quick_diag_ct_sweep(
 def _compute_pathb_return_map(sys_p: SystemParams, emit_p: EmitterParams, optx_p: OpticsParams, pd_p: PDParams, tia_p: TIAParams, comp_p: ComparatorParams, clk_p: ClockParams, depth: int, passes: int, deadzone_mw: float, *, seed_offset: int = 0, stage_gains_db: list[float] | None = None, vth_schedule_mV: list[float] | None = None):
     import numpy as _np
     depth = int(depth)
-    passes = max(1, int(passes))
     if depth <= 0:
         return {
             "levels": [],
@@ -233,77 +229,16 @@ def _compute_pathb_return_map(sys_p: SystemParams, emit_p: EmitterParams, optx_p
             "rail_positive_fraction": [],
             "rail_negative_fraction": [],
         }
-    deadzone_mw = max(1e-9, float(deadzone_mw))
-    stage_gains_db = list(stage_gains_db or [])
-    vth_schedule_mV = list(vth_schedule_mV or [])
-    results = {
-        "levels": [],
-        "stage_slopes": [],
-        "deadzone_fraction": [],
-        "rail_positive_fraction": [],
-        "rail_negative_fraction": [],
-        "stage_diff_in": [],
-        "stage_diff_out": [],
-    }
-    eps = 1e-9
-    levels = [-1, 0, 1]
-    for lvl in levels:
-        level_slopes = [[] for _ in range(depth)]
-        level_dead = [[] for _ in range(depth)]
-        level_pos = [[] for _ in range(depth)]
-        level_neg = [[] for _ in range(depth)]
-        level_diff_in = [[] for _ in range(depth)]
-        level_diff_out = [[] for _ in range(depth)]
-        for pidx in range(passes):
-            sys_clone = SystemParams(**sys_p.__dict__)
-            sys_clone.seed = int(sys_clone.seed) + seed_offset + pidx + 1
-            emit_clone = EmitterParams(**emit_p.__dict__)
-            optx_clone = OpticsParams(**optx_p.__dict__)
-            pd_clone = PDParams(**pd_p.__dict__)
-            tia_clone = TIAParams(**tia_p.__dict__)
-            comp_clone = ComparatorParams(**comp_p.__dict__)
-            clk_clone = ClockParams(**clk_p.__dict__)
-            orch = Orchestrator(sys_clone, emit_clone, optx_clone, pd_clone, tia_clone, comp_clone, clk_clone)
-            dt = float(orch.clk.sample_window())
-            tern = _np.full(sys_clone.channels, lvl, dtype=int)
-            plus, minus = orch.emit.simulate(tern, dt, orch.sys.temp_C)
-            base_vth_vec = None
-            if vth_schedule_mV:
-                existing = getattr(orch.comp, '_vth_per_ch', None)
-                if existing is not None:
-                    base_vth_vec = _np.array(existing, dtype=float)
-                else:
-                    base_vth_vec = _np.full(orch.sys.channels, float(orch.comp.p.vth_mV), dtype=float)
-            for stage in range(depth):
-                diff_in = plus - minus
-                plus, minus, _, _ = orch.optx.simulate(plus, minus, dt)
-                if stage_gains_db:
-                    gain_idx = stage if stage < len(stage_gains_db) else len(stage_gains_db) - 1
-                    gain_db = float(stage_gains_db[gain_idx])
-                    scale = 10 ** (-gain_db / 10.0)
-                    plus = plus * scale
-                    minus = minus * scale
-                if vth_schedule_mV:
-                    vth_idx = stage if stage < len(vth_schedule_mV) else len(vth_schedule_mV) - 1
-                    stage_vth = float(vth_schedule_mV[vth_idx])
-                    orch.comp.set_vth_per_channel(_np.full(orch.sys.channels, stage_vth, dtype=float))
-                diff_out = plus - minus
-                ratio = _np.abs(diff_out) / _np.clip(_np.abs(diff_in), eps, None)
-                level_slopes[stage].append(float(_np.median(ratio)))
-                level_dead[stage].append(float(_np.mean(_np.abs(diff_out) < deadzone_mw)))
-                level_diff_in[stage].append(float(_np.median(_np.abs(diff_in))))
-                level_diff_out[stage].append(float(_np.median(_np.abs(diff_out))))
-                level_pos[stage].append(float(_np.mean(diff_out > deadzone_mw)))
-                level_neg[stage].append(float(_np.mean(diff_out < -deadzone_mw)))
-            if vth_schedule_mV:
-                orch.comp.set_vth_per_channel(_np.full(orch.sys.channels, float(orch.comp.p.vth_mV), dtype=float))
-        results["levels"].append(int(lvl))
-        results["stage_slopes"].append([float(_np.median(s)) if s else None for s in level_slopes])
-        results["deadzone_fraction"].append([float(_np.median(d)) if d else None for d in level_dead])
-        results["rail_positive_fraction"].append([float(_np.median(r)) if r else None for r in level_pos])
-        results["rail_negative_fraction"].append([float(_np.median(r)) if r else None for r in level_neg])
-        results["stage_diff_in"].append([float(_np.median(di)) if di else None for di in level_diff_in])
-        results["stage_diff_out"].append([float(_np.median(do)) if do else None for do in level_diff_out])
+    # One orchestrator (static hardware draw) per pass; each runs the three levels as one batch
+    instances = []
+    for pidx in range(max(1, int(passes))):
+        sys_clone = SystemParams(**sys_p.__dict__)
+        sys_clone.seed = int(sys_clone.seed) + seed_offset + pidx + 1
+        instances.append(Orchestrator(sys_clone, EmitterParams(**emit_p.__dict__), OpticsParams(**optx_p.__dict__),
+                                      PDParams(**pd_p.__dict__), TIAParams(**tia_p.__dict__),
+                                      ComparatorParams(**comp_p.__dict__), ClockParams(**clk_p.__dict__)))
+    engine = CascadeEngine(instances[0], depth, stage_gains_db, vth_schedule_mV)
+    results = engine.return_map(passes, deadzone_mw, instances=instances)
     flat_slopes = [val for sub in results["stage_slopes"] for val in sub if val is not None]
     if flat_slopes:
         flat_arr = _np.array(flat_slopes, dtype=float)
@@ -326,23 +261,13 @@ def _run_pathb_stage_pass(orch: Orchestrator,
                           stage_gains_db: list[float] | None,
                           vth_schedule_mV: list[float] | None):
     import numpy as _np
-    dt = float(orch.clk.sample_window())
     if orch.sys.reset_analog_state_each_frame:
         orch.tia.reset()
         orch.comp.reset()
-    Pp, Pm = orch.emit.simulate(ternary, dt, orch.sys.temp_C)
-    stage_gains = list(stage_gains_db or [])
-    stage_outputs = []
-    for stage_idx in range(max(0, analog_depth)):
-        diff_in = Pp - Pm
-        Pp, Pm, _, _ = orch.optx.simulate(Pp, Pm, dt)
-        if stage_gains:
-            gain_idx = stage_idx if stage_idx < len(stage_gains) else len(stage_gains) - 1
-            gain_db = float(stage_gains[gain_idx])
-            scale = 10 ** (-gain_db / 10.0)
-            Pp = Pp * scale
-            Pm = Pm * scale
-        stage_outputs.append((Pp.copy(), Pm.copy(), diff_in.copy(), (Pp - Pm).copy()))
+    res = CascadeEngine(orch, analog_depth, stage_gains_db).run(ternary)
+    # (Pp, Pm, diff_in, diff_out) views into the engine's stage arrays
+    stage_outputs = [(res["plus"][k], res["minus"][k], res["diff"][k], res["diff"][k + 1])
+                     for k in range(max(0, analog_depth))]
     base_vth_vec = None
     if vth_schedule_mV:
         existing = getattr(orch.comp, '_vth_per_ch', None)
@@ -350,10 +275,7 @@ def _run_pathb_stage_pass(orch: Orchestrator,
             base_vth_vec = _np.array(existing, dtype=float)
         else:
             base_vth_vec = _np.full(orch.sys.channels, float(orch.comp.p.vth_mV), dtype=float)
-    return dt, stage_outputs, base_vth_vec
-
-
-
+    return res["dt"], stage_outputs, base_vth_vec
 
 
 def _build_fixed_inputs(seed: int, channels: int, count: int):
@@ -390,6 +312,8 @@ def main():
     ap.add_argument("--autotune", action="store_true", help="Run automatic tuner within realistic bounds")
     ap.add_argument("--autotune-budget", type=int, default=60)
     ap.add_argument("--autotune-trials", type=int, default=120)
+    ap.add_argument("--autotune-screen-analytic", action="store_true", help="Score autotune candidates with the semi-analytic BER and confirm only the best with Monte Carlo")
+    ap.add_argument("--autotune-confirm-top", type=int, default=3, help="Candidates confirmed with Monte Carlo when screening analytically")
     ap.add_argument("--neighbor-ct", action="store_true", help="Use neighbor crosstalk model in baseline")
     ap.add_argument("--base-window-ns", type=float, default=20.0, help="Baseline clock window (ns)")
     ap.add_argument("--apply-calibration", action="store_true", help="Apply per-channel vth trims to baseline KPIs")
@@ -473,6 +397,8 @@ def main():
     ap.add_argument("--quiet", action="store_true", help="Do not print final JSON to stdout (write file only)")
     ap.add_argument("--progress", action="store_true", help="Emit coarse progress messages to stdout")
     ap.add_argument("--json", type=str, default=None)
+    ap.add_argument("--profile", action="store_true", help="Add a per-stage timing breakdown of the Path A and baseline orchestrators")
+    ap.add_argument("--profile-memory", action="store_true", help="With --profile, also record traced allocations per stage (slow)")
     ap.add_argument("--endtoend-report", action="store_true", help="Add an end_to_end block combining Path A and Path B (assumes independent errors)")
     ap.add_argument("--light-output", action="store_true", help="Reduce output size by skipping heavy diagnostic blocks (sensitivity, drift, path-b sweeps, large arrays)")
     # Speed/skip flags
@@ -658,6 +584,7 @@ def main():
     except Exception:
         pass
     orch = Orchestrator(sys_p, emit, optx, pd, tia, comp, clk)
+    profiler = StageProfiler(memory=args.profile_memory).attach(orch) if args.profile else None
 
     # Helper: accumulate dv across frames using selected kernel
     deblur_params = {"aL": None, "aR": None}
@@ -765,6 +692,8 @@ def main():
     base_comp = ComparatorParams(input_noise_mV_rms=comp_noise, vth_mV=5.0, hysteresis_mV=1.8, vth_sigma_mV=0.2)
     base_clk = ClockParams(window_ns=float(args.base_window_ns), jitter_ps_rms=10.0)
     base_orch = Orchestrator(sys_p, base_emit, base_optx, base_pd, base_tia, base_comp, base_clk)
+    if profiler is not None:
+        profiler.attach(base_orch)
     # Hoist placeholder for per-channel threshold vector used in primary classifiers
     vth_vec_pa = None
     # Optional: import per-channel vth (mV) and apply to primary and baseline comparators
@@ -1094,7 +1023,7 @@ def main():
                             b_orch.comp.set_vth_per_channel(cal_trim_vec)
                         Vp_stage = b_orch.tia.simulate(Ip_stage, dt)
                         Vm_stage = b_orch.tia.simulate(Im_stage, dt)
-                        stage_signs.append(_np.asarray(b_orch.comp.simulate(Vp_stage, Vm_stage, b_orch.sys.temp_C), dtype=int))
+                        stage_signs.append(_np.asarray(b_orch.comp.simulate(Vp_stage, Vm_stage, b_orch.temp_C), dtype=int))
                     stage_signs_last = [arr.copy() for arr in stage_signs]
                     Pp_final = stage_outputs[-1][0].copy()
                     Pm_final = stage_outputs[-1][1].copy()
@@ -1129,7 +1058,7 @@ def main():
                     Vp = b_orch.tia.simulate(Ip, dt)
                     Vm = b_orch.tia.simulate(Im, dt)
                     dv_final = (Vp - Vm) * 1e3
-                    out = b_orch.comp.simulate(Vp, Vm, b_orch.sys.temp_C)
+                    out = b_orch.comp.simulate(Vp, Vm, b_orch.temp_C)
                     error = _np.asarray(out, dtype=float) - _np.asarray(tern0, dtype=float)
                     if eta > 0.0:
                         vth_vec = _np.clip(vth_vec + eta * error, -15.0, 15.0)
@@ -2771,6 +2700,8 @@ def main():
             seed=int(args.seed),
             use_calibration=True,
             constraints=constraints,
+            screen="analytic" if getattr(args, 'autotune_screen_analytic', False) else None,
+            confirm_top=int(getattr(args, 'autotune_confirm_top', 3)),
         )
         summary["autotune"] = tune_res
         if args.progress:
@@ -2833,6 +2764,9 @@ def main():
                     pass
         except Exception:
             pass
+    if profiler is not None:
+        profiler.detach()
+        summary["profile"] = profiler.summary()
     if not args.quiet:
         print(json.dumps(summary, indent=2))
     if args.json:
@@ -0,0 +1,92 @@
+"""Semi-analytic Gaussian BER for the Path A chain.
+
+Noise-free signals come from the chain's own models: emitter rail powers, a
+private copy of the optics, and the PD/camera and TIA responses, evaluated
+over a fixed set of random ternary patterns so crosstalk sees realistic
+neighbours. The Gaussian noise sources (emitter RIN, PD shot noise, TIA input
+noise, comparator input noise, plus the orchestrator's timing-jitter proxies)
+are carried as variances to the comparator input, and each decision's error
+probability comes from Q-functions. No orchestrator RNG draws or state
+updates happen, so screening a configuration does not disturb later Monte
+Carlo runs.
+"""
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+
+from .orchestrator import Orchestrator
+
+
+def analytic_ber(orch: Orchestrator, patterns: int = 64, seed: int = 0, dt_ns: float | None = None) -> dict:
+    """Gaussian BER estimate averaged over `patterns` random ternary frames.
+
+    `dt_ns` defaults to the nominal window minus comparator propagation delay.
+    Ignores clock jitter, comparator timing/metastability flips, slew limiting
+    and noise inside optics stages (EDFA ASE, EOM hold noise), which only
+    shape the mean here.
+    """
+    N = int(orch.sys.channels)
+    P = int(patterns)
+    dt = float(dt_ns) if dt_ns is not None else max(0.1, float(orch.clk.p.window_ns) - float(orch.comp.p.prop_delay_ns))
+    temp = float(orch.temp_C)
+    rng = np.random.default_rng(seed)
+    tern = rng.integers(-1, 2, size=(P, N)).astype(np.int8)
+
+    # Mean optical path
+    Pp, Pm = orch.emit.mean_rails(tern, temp)
+    optx = copy.deepcopy(orch.optx)
+    optx.rng = rng
+    slope = orch.plan().dwdm_slope_db_per_nm
+    dlam = (temp - 25.0) * float(orch.emit.p.wav_drift_nm_per_C)
+    dwdm = 10**(-abs(dlam) * slope / 10.0) if slope != 0.0 and dlam != 0.0 else 1.0
+    Pp2, Pm2, _, _ = optx.simulate(Pp, Pm, np.full((P, 1), dt), trans_scale=dwdm)
+
+    # Optical -> current; RIN rides on the signal part of the current
+    det = orch.cam if orch.cam is not None else orch.pd
+    Ip, var_Ip = det.moments(Pp2, dt)
+    Im, var_Im = det.moments(Pm2, dt)
+    I0, _ = det.moments(np.zeros(N), dt)
+    sig_rel = float(orch.emit.rin_sigma_rel(dt))
+    sp, sm = (Ip - I0) * sig_rel, (Im - I0) * sig_rel
+
+    # Current -> dv (V)
+    Vp, Vm, kp, km, var_out = orch.tia.rail_pair_moments(Ip, Im, dt)
+    var_rin = (kp*sp - km*sm)**2 + (0.3**2) * ((kp*sp)**2 + (km*sm)**2)
+    var_shot = kp**2 * var_Ip + km**2 * var_Im
+    var_tia = 2.0 * np.broadcast_to(var_out, Vp.shape)
+    sk = float(getattr(orch.sys, 'lane_skew_ps_rms', 0.0)) * 1e-3
+    gj = float(getattr(optx.p, 'gdr_ps_pkpk', 0.0)) * 0.29e-3 + float(getattr(orch.sys, 'pmd_ps_rms', 0.0)) * 1e-3
+    cj = float(getattr(orch.sys, 'correlated_jitter_ps_rms', 0.0)) * 1e-3
+    var_jit = np.full(Vp.shape, 4.0 * (sk**2 + gj**2 + cj**2))
+    dv = Vp - Vm
+    if getattr(orch.sys, "normalize_dv", False):
+        denom = np.clip(np.abs(Vp) + np.abs(Vm), orch.sys.normalize_eps_v, None)
+        dv = dv / denom
+        var_rin, var_shot, var_tia, var_jit = (v / denom**2 for v in (var_rin, var_shot, var_tia, var_jit))
+
+    # Comparator decision (mV)
+    var_comp = float(orch.comp.p.input_noise_mV_rms) ** 2
+    sigma_mV = np.sqrt((var_rin + var_shot + var_tia + var_jit) * 1e6 + var_comp)
+    p_err = orch.comp.error_prob(dv * 1e3, sigma_mV, tern, temp)
+
+    def _rms_mV(v):
+        return float(np.sqrt(np.mean(v) * 1e6))
+
+    return {
+        "analytic_ber": float(p_err.mean()),
+        "level_ber": {str(lvl): (float(p_err[tern == lvl].mean()) if np.any(tern == lvl) else None)
+                      for lvl in (-1, 0, 1)},
+        "channel_ber": p_err.mean(axis=0).tolist(),
+        "sigma_mV": {
+            "rin": _rms_mV(var_rin),
+            "shot": _rms_mV(var_shot),
+            "tia": _rms_mV(var_tia),
+            "jitter": _rms_mV(var_jit),
+            "comp": float(orch.comp.p.input_noise_mV_rms),
+            "total": float(np.sqrt(np.mean(sigma_mV**2))),
+        },
+        "window_ns": dt,
+        "patterns": P,
+    }
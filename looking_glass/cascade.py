@@ -0,0 +1,156 @@
+"""Path B analog cascade on batches of frames.
+
+`CascadeEngine(orch, depth, stage_gains_db, vth_schedule_mV)` repeats the
+orchestrator's optics block `depth` times without O-E-O conversion. After each
+pass the rails are scaled by that stage's inter-stage loss. Gain and threshold
+schedules are expanded once into per-stage arrays, where a short schedule
+repeats its last entry. Rails may be (N,) for one frame or (B, N) for a
+batch. Stage outputs are written into preallocated (depth, ...) arrays, and
+the optics plan compiled for the first stage is reused at every depth.
+
+`return_map` returns per-stage slopes, deadzone and rail fractions, and the
+BER of a comparator readout at every stage. Given `instances` (one
+orchestrator per pass, each with its own static hardware draw: emitter power
+spread, speckle, TIA gain, comparator offsets) each pass runs its three input
+levels as a (3, N) batch on its own instance, so the medians span hardware
+draws as the per-pass loop did. Without `instances` all levels and passes run
+as one (3 * passes, N) batch on the engine's orchestrator: a single hardware
+instance, reported as `hardware_instances: 1`, which only spreads frame noise.
+With optics frame memory (SOA gain, MZI bias, ...) every row enters a stage
+with the state left by the previous stage's last row, as with
+`step_batch(sequential=False)`.
+"""
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+
+from .orchestrator import Orchestrator
+
+LEVELS = (-1, 0, 1)
+
+
+def _schedule(values, depth: int, default: float) -> np.ndarray:
+    """Per-stage values; a short schedule repeats its last entry."""
+    vals = [float(v) for v in (values or [])]
+    if not vals:
+        return np.full(depth, default)
+    return np.array([vals[min(k, len(vals) - 1)] for k in range(depth)])
+
+
+class CascadeEngine:
+    def __init__(self, orch: Orchestrator, depth: int, stage_gains_db=None, vth_schedule_mV=None):
+        self.orch = orch
+        self.depth = max(0, int(depth))
+        self.stage_scale = 10 ** (-_schedule(stage_gains_db, self.depth, 0.0) / 10.0)
+        self.stage_vth_mV = _schedule(vth_schedule_mV, self.depth, 0.0) if vth_schedule_mV else None
+
+    def run(self, ternary, dt=None) -> dict:
+        """Propagate `ternary` (N,) or (B, N) through every stage.
+
+        Returns `dt` (a float, or (B, 1)), per-stage rails `plus` and `minus`
+        of shape (depth,) + ternary.shape, and `diff` of shape
+        (depth + 1,) + ternary.shape. `diff[k]` is stage k's input and
+        `diff[k + 1]` its output.
+        """
+        orch = self.orch
+        tern = np.asarray(ternary)
+        if dt is None:
+            dt = float(orch.clk.sample_window()) if tern.ndim == 1 else orch.clk.sample_windows(len(tern))[:, None]
+        Pp, Pm = orch.emit.simulate(tern, dt, orch.temp_C)
+        shape = (self.depth,) + np.shape(Pp)
+        plus, minus = np.empty(shape), np.empty(shape)
+        diff = np.empty((self.depth + 1,) + np.shape(Pp))
+        np.subtract(Pp, Pm, out=diff[0])
+        for k in range(self.depth):
+            Pp, Pm, _, _ = orch.optx.simulate(Pp, Pm, dt)
+            Pp = np.multiply(Pp, self.stage_scale[k], out=plus[k])
+            Pm = np.multiply(Pm, self.stage_scale[k], out=minus[k])
+            np.subtract(Pp, Pm, out=diff[k + 1])
+        return {"dt": dt, "plus": plus, "minus": minus, "diff": diff}
+
+    def readout(self, res: dict, balanced_pd: bool = False) -> np.ndarray:
+        """Comparator decisions at every stage, shape (depth,) + rails shape.
+
+        Each stage is read through the PD (or camera), TIA and comparator
+        from reset, with that stage's threshold from the vth schedule. The
+        comparator's per-channel thresholds are restored afterwards.
+        """
+        orch = self.orch
+        dt = res["dt"]
+        sensor = orch.cam if orch.cam is not None else orch.pd
+        saved = orch.comp._vth_per_ch
+        out = np.empty(res["plus"].shape, dtype=np.int8)
+        try:
+            for k in range(self.depth):
+                Ip, Im = sensor.simulate(res["plus"][k], dt), sensor.simulate(res["minus"][k], dt)
+                if balanced_pd:
+                    Ip, Im = Ip - Im, Im - Ip
+                if self.stage_vth_mV is not None:
+                    orch.comp.set_vth_per_channel(np.full(orch.sys.channels, self.stage_vth_mV[k]))
+                orch.tia.reset()
+                orch.comp.reset()
+                Vp, Vm = orch.tia.simulate(Ip, dt), orch.tia.simulate(Im, dt)
+                out[k] = orch.comp.simulate(Vp, Vm, orch.temp_C)
+        finally:
+            orch.comp._vth_per_ch = saved
+        return out
+
+    def _row_stats(self, tern: np.ndarray, deadzone_mw: float, eps: float) -> tuple:
+        """Per-stage statistics of every row of `tern`, each (depth, rows)."""
+        res = self.run(tern)
+        d_in, d_out = np.abs(res["diff"][:-1]), res["diff"][1:]
+        a_out = np.abs(d_out)
+        return (
+            np.median(a_out / np.clip(d_in, eps, None), axis=-1),
+            np.mean(a_out < deadzone_mw, axis=-1),
+            np.mean(d_out > deadzone_mw, axis=-1),
+            np.mean(d_out < -deadzone_mw, axis=-1),
+            np.median(d_in, axis=-1),
+            np.median(a_out, axis=-1),
+            np.mean(self.readout(res) != tern, axis=-1),
+        )
+
+    def return_map(self, passes: int, deadzone_mw: float, eps: float = 1e-9, instances=None) -> dict:
+        """Per-level, per-stage medians over `passes` frames per input level.
+
+        Keys mirror the Path B report: `stage_slopes` (median |diff_out| /
+        |diff_in|), `deadzone_fraction`, `rail_positive_fraction`,
+        `rail_negative_fraction`, `stage_diff_in`, `stage_diff_out`, and
+        `stage_ber` (readout errors against the input level), each a
+        [level][stage] list. `instances` is an optional sequence of
+        orchestrators, one per pass; `hardware_instances` reports how many
+        static hardware draws the medians span.
+        """
+        keys = ("stage_slopes", "deadzone_fraction", "rail_positive_fraction", "rail_negative_fraction",
+                "stage_diff_in", "stage_diff_out", "stage_ber")
+        if self.depth == 0:
+            return {"levels": [], **{key: [] for key in keys}, "hardware_instances": 0}
+        deadzone_mw = max(1e-9, float(deadzone_mw))
+        N = int(self.orch.sys.channels)
+        levels = np.array(LEVELS, dtype=np.int8)
+        if instances is None:
+            passes = max(1, int(passes))
+            tern = np.repeat(np.repeat(levels, passes)[:, None], N, axis=1)
+            # (depth, levels * passes) -> (depth, levels, passes)
+            per_row = [v.reshape(self.depth, len(LEVELS), passes)
+                       for v in self._row_stats(tern, deadzone_mw, eps)]
+            hardware = 1
+        else:
+            if len(instances) == 0:
+                raise ValueError("return_map needs at least one instance")
+            tern = np.repeat(levels[:, None], N, axis=1)
+            runs = []
+            for orch in instances:
+                engine = copy.copy(self)
+                engine.orch = orch
+                runs.append(engine._row_stats(tern, deadzone_mw, eps))
+            hardware = len(runs)
+            per_row = [np.stack(v, axis=-1) for v in zip(*runs)]
+        out = {"levels": list(LEVELS)}
+        for key, val in zip(keys, per_row):
+            # [level][stage] medians over passes
+            out[key] = np.median(val, axis=-1).T.tolist()
+        out["hardware_instances"] = hardware
+        return out
@@ -220,6 +220,7 @@ def api_run():
     adaptive_input = request.args.get("adaptive_input", "1")
     adaptive_max_frames = request.args.get("adaptive_max_frames", "3")
     adaptive_margin_mV = request.args.get("adaptive_margin_mV", "0.5")
+    profile = request.args.get("profile", "0")
     args = ["--trials", str(trials), "--seed", str(seed), "--json", str(OUT_JSON), "--quiet"]
     # Optional pack overrides (single run)
     for key in ("emitter_pack","optics_pack","sensor_pack","tia_pack","comparator_pack","camera_pack","clock_pack","thermal_pack"):
@@ -230,6 +231,7 @@ def api_run():
     if autotune in ("1", "true", "True"): args.append("--autotune")
     if sensitivity in ("1", "true", "True"): args.append("--sensitivity")
     if neighbor_ct in ("1", "true", "True"): args.append("--neighbor-ct")
+    if profile in ("1", "true", "True"): args.append("--profile")
     args += ["--base-window-ns", str(base_window)]
     if channels not in (None, "", "None"): args += ["--channels", str(channels)]
     if str(path_b_depth) not in ("0", "false", "False", "", None): args += ["--path-b-depth", str(path_b_depth)]
@@ -378,7 +380,7 @@ def api_history():
                     "preflight.reasons": "; ".join(pre.get("reasons", [])),
                 })
                 # Attach full summaries
-                for block in ("baseline","path_a","path_b","path_b_chain","path_b_sweeps","cold_input","realism","components","window_sweep","rin_sweep","crosstalk_sweep","baseline_calibrated","sensitivity","drift","autotune"):
+                for block in ("baseline","path_a","path_b","path_b_chain","path_b_sweeps","cold_input","realism","components","window_sweep","rin_sweep","crosstalk_sweep","baseline_calibrated","sensitivity","drift","autotune","profile"):
                     if r.get(block) is not None:
                         base.update(flat(f"{block}.", r.get(block)))
                 flat_rows.append(base)
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+import time
 import numpy as np
 from .sim.emitter import EmitterArray, EmitterParams
 from .sim.optics import Optics, OpticsParams
@@ -8,9 +9,16 @@ from .sim.comparator import Comparator, ComparatorParams
 from .sim.clock import Clock, ClockParams
 from .sim.thermal import Thermal, ThermalParams
 from .sim.camera import Camera, CameraParams
+from .sim.frame import open_stack, sensor_tokens_per_s
+from .sim.noise import mixture_logw
+from .sim.plan import PlanCache, Tracked
+from .sim.rng import CounterStream, MODULES
+from .stats import BerAccumulator, StopRule
+from .trits import pack_trits, packed_bytes, trit_confusion, trit_errors, unpack_trits
 
 @dataclass
-class SystemParams:
+class SystemParams(Tracked):
+    _live = frozenset({"temp_C"})  # drifts per frame; not compiled into plans
     channels: int = 16
     window_ns: float = 10.0
     temp_C: float = 25.0
@@ -23,6 +31,20 @@ class SystemParams:
     pmd_ps_rms: float = 0.0
     correlated_jitter_ps_rms: float = 0.0
     balanced_pd: bool = False
+    # Per-module counter-based streams keyed by (seed, module, trial); see sim/rng.py
+    rng_streams: bool = False
+
+@dataclass(frozen=True)
+class FramePlan:
+    """Per-frame constants compiled from the system, optics and comparator params."""
+    prop_delay_ns: float
+    temp_ramp_C_per_hr: float
+    dwdm_slope_db_per_nm: float
+    skew_ns: float
+    jitter_ns: float
+    cj_ns: float
+    normalize_dv: bool
+
 
 class Orchestrator:
     def __init__(self,
@@ -36,26 +58,217 @@ class Orchestrator:
                  cam_p: CameraParams | None = None,
                  thermal_p: ThermalParams | None = None,
                  emitter_override=None):
-        self.rng = np.random.default_rng(sys.seed)
         self.sys = sys
         self.balanced_pd = bool(getattr(sys, 'balanced_pd', False))
-        self.emit = emitter_override if emitter_override is not None else EmitterArray(emitter_p, rng=self.rng)
-        self.optx = Optics(optics_p, rng=self.rng)
-        self.pd = Photodiode(pd_p, rng=self.rng)
-        self.cam = Camera(cam_p, rng=self.rng) if cam_p is not None else None
-        self.tia = TIA(tia_p, rng=self.rng)
-        self.comp = Comparator(comp_p, rng=self.rng)
-        self.clk = Clock(clk_p, rng=self.rng)
-        self.therm = Thermal(thermal_p, rng=self.rng) if thermal_p is not None else None
-
-    def step(self, force_ternary: np.ndarray | None = None):
+        if getattr(sys, 'rng_streams', False):
+            self._streams = {m: CounterStream(sys.seed, m) for m in MODULES}
+            rng = self._streams
+        else:
+            self._streams = None
+            shared = np.random.default_rng(sys.seed)
+            rng = {m: shared for m in MODULES}
+        self.rng = rng["input"]
+        self._jitter_rng = rng["jitter"]
+        self.trial = 0
+        self.emit = emitter_override if emitter_override is not None else EmitterArray(emitter_p, rng=rng["emitter"])
+        self.optx = Optics(optics_p, rng=rng["optics"])
+        self.optx.set_wavelengths(getattr(self.emit, "_channel_wavelengths", None))
+        self.pd = Photodiode(pd_p, rng=rng["pd"])
+        self.cam = Camera(cam_p, rng=rng["camera"]) if cam_p is not None else None
+        if self.cam is not None:
+            self.cam.set_tile_grid(optics_p.grid_px, optics_p.tile_border_px)
+        self.tia = TIA(tia_p, rng=rng["tia"])
+        self.comp = Comparator(comp_p, rng=rng["comparator"])
+        self.clk = Clock(clk_p, rng=rng["clock"])
+        self.therm = Thermal(thermal_p, rng=rng["thermal"]) if thermal_p is not None else None
+        # Importance sampling: {"pd"|"tia"|"comp": NoiseBias} proposals, see looking_glass.rare
+        self.noise_bias = None
+        # Thermal drift: ((vth_mV, transmittance) params it started from, running drifted values)
+        self._drift = None
+        # Temperature ramp: (sys.temp_C it started from, running ramped temperature)
+        self._temp = None
+        self._plan = PlanCache(self._compile)
+        if self._streams is not None:
+            # Static mismatch comes from each stream's static block, never from trial blocks
+            self.prime_static()
+
+    def plan(self) -> FramePlan:
+        """Frame-level constants; recompiled when sys/optics/comparator params change."""
+        return self._plan.get((self.sys, self.optx.p, self.comp.p))
+
+    def _compile(self) -> FramePlan:
+        gdr = float(getattr(self.optx.p, 'gdr_ps_pkpk', 0.0))
+        pmd = float(getattr(self.sys, 'pmd_ps_rms', 0.0))
+        return FramePlan(
+            prop_delay_ns=float(self.comp.p.prop_delay_ns),
+            temp_ramp_C_per_hr=float(getattr(self.sys, 'temp_ramp_C_per_hr', 0.0)),
+            dwdm_slope_db_per_nm=float(getattr(self.optx.p, 'dwdm_slope_db_per_nm', 0.0)),
+            skew_ns=float(getattr(self.sys, 'lane_skew_ps_rms', 0.0)) * 1e-3,  # ps->ns scaling proxy
+            jitter_ns=(gdr * 0.29e-3) + (pmd * 1e-3),  # coarse proxy to voltage jitter scale
+            cj_ns=float(getattr(self.sys, 'correlated_jitter_ps_rms', 0.0)) * 1e-3,
+            normalize_dv=bool(getattr(self.sys, "normalize_dv", False)),
+        )
+
+    def _dwdm_scale(self, plan: FramePlan) -> float:
+        """Transmittance factor for DWDM passband walk-off due to wavelength drift."""
+        # A float, or a (B, 1) column after a batch with per-frame temperatures
+        dlam = getattr(self.emit, '_delta_lambda_nm', 0.0)
+        if plan.dwdm_slope_db_per_nm != 0.0 and np.any(dlam != 0.0):
+            loss_db = np.abs(dlam) * plan.dwdm_slope_db_per_nm
+            return 10**(-loss_db/10.0)
+        return 1.0
+
+    @property
+    def temp_C(self) -> float:
+        """Current temperature: `sys.temp_C` plus the ramp accumulated since it was set."""
+        if self._temp is None or self._temp[0] != self.sys.temp_C:
+            return self.sys.temp_C
+        return self._temp[1]
+
+    def step(self, force_ternary: np.ndarray | None = None, lean: bool = False):
+        """Simulate one frame.
+
+        Returns the full result dict (per-channel vectors as lists) or, with
+        `lean=True`, only the scalar KPIs named in `TRIAL_DTYPE`.
+        """
+        f = self._simulate_frame(force_ternary)
+        if lean:
+            return {k: f[k] for k in TRIAL_DTYPE.names}
+        N = self.sys.channels
+        Vp, Vm = f["Vp"], f["Vm"]
+        return {
+            "ber": f["ber"],
+            "energy_pj": f["energy_pj"],
+            "window_ns": f["window_ns"],
+            "snr_emit": f["snr_emit"],
+            "snr_pd": f["snr_pd"],
+            "snr_tia": f["snr_tia"],
+            "t_out": np.asarray(f["t_out"]).tolist(),
+            "truth": np.asarray(f["truth"]).tolist(),
+            "n_bits": f["n_bits"],
+            "n_err": f["n_err"],
+            "blocks": int(np.sqrt(N)) if int(np.sqrt(N))**2 == N else None,
+            "per_tile": {
+                "plus": f["per_tile_p"].tolist(),
+                "minus": f["per_tile_m"].tolist(),
+            },
+            "dv_mV": (np.asarray(Vp) - np.asarray(Vm)).tolist(),
+            "vsum_mV": (np.abs(np.asarray(Vp)) + np.abs(np.asarray(Vm))).tolist(),
+            "effective_channels": f["n_bits"],
+        }
+
+    def prime_static(self) -> None:
+        """Draw static mismatch that blocks otherwise draw lazily on the first frame.
+
+        Call before `reseed` so the camera PRNU map, static speckle pattern,
+        TIA gain spread and comparator threshold offset come from the
+        construction seed rather than the per-trial stream.
+        """
+        N = self.sys.channels
+        if self.cam is not None and self.cam.p.frame_readout:
+            rows, cols = self.cam.layout(N).shape
+            self.cam._ensure_prnu(rows * cols, self.cam._frame_key())
+        elif self.cam is not None:
+            self.cam._ensure_prnu(N)
+        self.optx._ensure_speckle(N)
+        self.tia._ensure_gain_scale((N,))
+        self.comp._ensure_vth_offset()
+
+    def reseed(self, seed) -> None:
+        """Restart the random stream(s) from `seed` (int or SeedSequence).
+
+        The shared generator is reseeded in place, so every block keeps drawing
+        from it; with `rng_streams` each module stream is rekeyed instead.
+        Static mismatch already drawn is kept.
+        """
+        if self._streams is not None:
+            for st in self._streams.values():
+                st.rekey(seed)
+            return
+        self.rng.bit_generator.state = type(self.rng.bit_generator)(seed).state
+
+    def seek(self, trial: int) -> None:
+        """Set the index of the next trial (selects its counter block with `rng_streams`)."""
+        self.trial = int(trial)
+
+    def reset_drift(self) -> None:
+        """Drop accumulated thermal drift and temperature ramp; the next frame starts from the params again."""
+        self._drift = None
+        self._temp = None
+        self.comp.vth_live_mV = None
+        self.optx.transmittance_live = None
+
+    def _apply_drift(self, d_vth, trans_scale) -> None:
+        """Accumulate drift terms (floats for one frame, (B,) arrays for a batch).
+
+        Drifted values go to the comparator's and optics' live overrides; the
+        params are not touched. Reassigning `vth_mV` or `transmittance` restarts
+        the drift from the new values.
+        """
+        base = (self.comp.p.vth_mV, self.optx.p.transmittance)
+        if self._drift is None or self._drift[0] != base:
+            self._drift = (base, base)
+        vth, trans = self._drift[1]
+        if np.ndim(d_vth):
+            vth = vth + np.cumsum(d_vth)[:, None]
+            trans = trans * np.cumprod(trans_scale)[:, None]
+            self._drift = (base, (float(vth[-1, 0]), float(trans[-1, 0])))
+        else:
+            vth = vth + d_vth
+            trans = trans * trans_scale
+            self._drift = (base, (vth, trans))
+        self.comp.vth_live_mV = vth
+        self.optx.transmittance_live = trans
+
+    def _ramp_temp(self, dt, ramp: float):
+        """Temperature of the next frame after `dt` ns, or a (B, 1) column for (B, 1) windows.
+
+        The ramp runs on live state; `sys.temp_C` is not touched, and
+        reassigning it restarts the ramp from the new value.
+        """
+        temp = self.temp_C
+        if ramp == 0.0:
+            return temp
+        if np.ndim(dt):
+            temp = temp + np.cumsum(dt * 1e-9 * (ramp / 3600.0), axis=0)
+            last = float(temp[-1, 0])
+        else:
+            temp = last = float(temp) + (dt * 1e-9) * (ramp / 3600.0)
+        self._temp = (self.sys.temp_C, last)
+        return temp
+
+    def _end_batch_drift(self) -> None:
+        # Leave scalar overrides (the last frame's drift) after a batch
+        if self._drift is not None:
+            self.comp.vth_live_mV, self.optx.transmittance_live = self._drift[1]
+
+    def _begin_frames(self, count: int | None = None) -> None:
+        """Point module streams at the next trial (or `count` trials) and advance the index."""
+        if self._streams is not None:
+            for st in self._streams.values():
+                st.begin(self.trial, count)
+        self.trial += 1 if count is None else int(count)
+
+    def _end_frames(self) -> None:
+        """Return module streams to the static block once a frame's draws are done.
+
+        Draws made between frames (e.g. static maps built on first use) then
+        land in the static block instead of the last trial's.
+        """
+        if self._streams is not None:
+            for st in self._streams.values():
+                st.end()
+
+    def _simulate_frame(self, force_ternary: np.ndarray | None = None) -> dict:
+        """Run the signal chain for one frame and return KPIs and raw arrays."""
         N = self.sys.channels
+        plan = self.plan()
+        self._begin_frames()
         dt_raw = self.clk.sample_window()
         # Apply comparator propagation delay as lost effective integration time
-        dt = max(0.1, float(dt_raw) - float(self.comp.p.prop_delay_ns))
-        # Apply temperature ramp to system temperature (affects emitter wavelength drift via simulate)
-        if float(getattr(self.sys, 'temp_ramp_C_per_hr', 0.0)) != 0.0:
-            self.sys.temp_C = float(self.sys.temp_C) + (dt * 1e-9) * (float(self.sys.temp_ramp_C_per_hr) / 3600.0)
+        dt = max(0.1, float(dt_raw) - plan.prop_delay_ns)
+        # Temperature ramp (affects emitter wavelength drift via simulate)
+        temp = self._ramp_temp(dt, plan.temp_ramp_C_per_hr)
         if self.sys.reset_analog_state_each_frame:
             # Reset analog state to avoid inter-frame memory when desired
             self.tia.reset()
@@ -63,65 +276,47 @@ class Orchestrator:
         # Slow drift
         if self.therm is not None:
             drift = self.therm.step(frame_period_s=dt*1e-9)
-            # Apply comparator threshold drift and optics transmittance scale
-            self.comp.p.vth_mV = self.comp.p.vth_mV + drift["comp_vth_mV_delta"]
-            self.optx.p.transmittance = self.optx.p.transmittance * drift["opt_trans_scale"]
+            # Comparator threshold drift and optics transmittance scale (live overrides, params untouched)
+            self._apply_drift(drift["comp_vth_mV_delta"], drift["opt_trans_scale"])
         # ternary input vector
         if force_ternary is None:
-            tern = self.rng.integers(-1, 2, size=N)
+            tern = self.rng.integers(-1, 2, size=N).astype(np.int8)
         else:
-            tern = np.asarray(force_ternary, dtype=int)
+            tern = np.asarray(force_ternary, dtype=np.int8)
             assert tern.shape[0] == N
-        Pp, Pm = self.emit.simulate(tern, dt, self.sys.temp_C)
-        # DWDM passband walk-off due to wavelength drift: adjust optics transmittance temporarily
-        trans_save = self.optx.p.transmittance
-        try:
-            slope = float(getattr(self.optx.p, 'dwdm_slope_db_per_nm', 0.0))
-            dlam = float(getattr(self.emit, '_delta_lambda_nm', 0.0))
-            if slope != 0.0 and dlam != 0.0:
-                loss_db = abs(dlam) * slope
-                self.optx.p.transmittance = trans_save * 10**(-loss_db/10.0)
-        except Exception:
-            pass
-        Pp2, Pm2, per_tile_p, per_tile_m = self.optx.simulate(Pp, Pm, dt)
-        # restore transmittance
-        self.optx.p.transmittance = trans_save
+        d_err = None if self.noise_bias is None else self._error_direction(tern)
+        Pp, Pm = self.emit.simulate(tern, dt, temp)
+        # DWDM passband walk-off due to wavelength drift scales transmittance for this frame
+        Pp2, Pm2, per_tile_p, per_tile_m = self.optx.simulate(Pp, Pm, dt, trans_scale=self._dwdm_scale(plan))
         if self.cam is not None:
             # Camera converts optical power to equivalent current with shot/read noise and quantization
-            Ip = self.cam.simulate(Pp2, dt)
-            Im = self.cam.simulate(Pm2, dt)
+            Ip, Im = self.cam.simulate_pair(Pp2, Pm2, dt)
+            lw_pd = 0.0
         else:
             # Direct PD path
-            Ip = self.pd.simulate(Pp2, dt)
-            Im = self.pd.simulate(Pm2, dt)
-        Vp = self.tia.simulate(Ip, dt)
-        Vm = self.tia.simulate(Im, dt)
+            Ip, Im, lw_pd = self._rails(self.pd, "pd", Pp2, Pm2, dt, d_err)
+        Vp, Vm, lw_tia = self._rails(self.tia, "tia", Ip, Im, dt, d_err)
         # Lane skew: small per-channel timing mismatch -> dv perturbation proxy
-        if float(getattr(self.sys, 'lane_skew_ps_rms', 0.0)) > 0.0:
-            sk = float(self.sys.lane_skew_ps_rms) * 1e-3  # ps->ns scaling proxy
-            dv_noise = self.rng.normal(0.0, sk, size=N)
+        if plan.skew_ns > 0.0:
+            dv_noise = self._jitter_rng.normal(0.0, plan.skew_ns, size=N)
             Vp = Vp + dv_noise
             Vm = Vm - dv_noise
         # PMD and AWG group-delay ripple: additional timing-induced dv noise
-        gdr = float(getattr(self.optx.p, 'gdr_ps_pkpk', 0.0))
-        pmd = float(getattr(self.sys, 'pmd_ps_rms', 0.0))
-        sigma_ns = (gdr * 0.29e-3) + (pmd * 1e-3)  # coarse proxy to voltage jitter scale
-        if sigma_ns > 0.0:
-            jit = self.rng.normal(0.0, sigma_ns, size=N)
+        if plan.jitter_ns > 0.0:
+            jit = self._jitter_rng.normal(0.0, plan.jitter_ns, size=N)
             Vp = Vp + jit
             Vm = Vm - jit
         # Correlated jitter across lanes (common-mode sampling error)
-        cj_ps = float(getattr(self.sys, 'correlated_jitter_ps_rms', 0.0))
-        if cj_ps > 0.0:
-            cj_ns = self.rng.normal(0.0, cj_ps * 1e-3)
+        if plan.cj_ns > 0.0:
+            cj_ns = self._jitter_rng.normal(0.0, plan.cj_ns)
             Vp = Vp + cj_ns
             Vm = Vm - cj_ns
-        if getattr(self.sys, "normalize_dv", False):
+        if plan.normalize_dv:
             # Per-channel normalization to suppress multiplicative noise (AGC-like)
             denom = np.clip(np.abs(Vp) + np.abs(Vm), self.sys.normalize_eps_v, None)
             Vp = Vp / denom
             Vm = Vm / denom
-        t_out = self.comp.simulate(Vp, Vm, self.sys.temp_C)
+        t_out, lw_comp = self._compare(Vp, Vm, d_err, temp)
         # Align lengths defensively (square grid backends may not match arbitrary channel counts)
         truth = tern
         try:
@@ -133,6 +328,9 @@ class Orchestrator:
                 Vm = np.asarray(Vm)[:M]
         except Exception:
             M = len(truth)
+        logw = None
+        if d_err is not None:
+            logw = mixture_logw(lw_pd + lw_tia + lw_comp, tern == 0)[:M]
         # crude "true" comparing to sign with 0 threshold
         err_mask = (np.asarray(t_out) != np.asarray(truth))
         ber = np.mean(err_mask)
@@ -144,6 +342,7 @@ class Orchestrator:
         snr_emit = float((np.mean(Pp+Pm)+eps)/(np.std(Pp-Pm)+eps))
         snr_pd = float((np.mean(Ip+Im)+eps)/(np.std(Ip-Im)+eps))
         snr_tia = float((np.mean(Vp+Vm)+eps)/(np.std(Vp-Vm)+eps))
+        self._end_frames()
         return {
             "ber": float(ber),
             "energy_pj": energy_pj,
@@ -151,35 +350,438 @@ class Orchestrator:
             "snr_emit": snr_emit,
             "snr_pd": snr_pd,
             "snr_tia": snr_tia,
-            "t_out": np.asarray(t_out).tolist(),
-            "truth": np.asarray(truth).tolist(),
             "n_bits": n_bits,
             "n_err": n_err,
+            "t_out": t_out,
+            "truth": truth,
+            "Vp": Vp,
+            "Vm": Vm,
+            "per_tile_p": np.asarray(per_tile_p),
+            "per_tile_m": np.asarray(per_tile_m),
+            "logw": logw,
+        }
+
+    def _error_direction(self, tern: np.ndarray) -> np.ndarray:
+        """Sign of the dv excursion that flips each channel's decision.
+
+        Zero-level channels can fail on either side; they pick one at random and
+        are weighted as a two-sided mixture (see `mixture_logw`).
+        """
+        side = self.rng.integers(0, 2, size=np.shape(tern)) * 2 - 1
+        return np.where(tern != 0, -np.sign(tern), side).astype(float)
+
+    def _rails(self, block, key: str, Xp, Xm, dt, d_err):
+        """Run `block` on the plus and minus rails; returns (Yp, Ym, logw).
+
+        With an importance-sampling proposal for `key`, plus-rail noise is
+        pushed along `d_err` and minus-rail noise against it.
+        """
+        bias = None if self.noise_bias is None else self.noise_bias.get(key)
+        if bias is None:
+            return block.simulate(Xp, dt), block.simulate(Xm, dt), 0.0
+        try:
+            block.noise_bias = bias.along(d_err)
+            Yp = block.simulate(Xp, dt)
+            lw = block.last_logw
+            block.noise_bias = bias.along(-d_err)
+            Ym = block.simulate(Xm, dt)
+            lw = lw + block.last_logw
+        finally:
+            block.noise_bias = None
+        return Yp, Ym, lw
+
+    def _tia_sequence(self) -> bool:
+        return bool(self.tia.p.waveform_sequence) and self.tia.p.waveform_oversample > 0
+
+    def _tia_block(self, Ip, Im, dt, d_err):
+        """TIA on a (B, N) block of consecutive frames without analog reset (`waveform_sequence`).
+
+        The rails are stacked as (B, 2, N), i.e. the windows p0, m0, p1, m1, ...
+        in the order `step()` runs them, so each minus rail continues from its
+        own frame's plus rail and each plus rail from the previous frame's
+        minus rail.
+        """
+        X = np.stack([Ip, Im], axis=1)
+        bias = None if self.noise_bias is None else self.noise_bias.get("tia")
+        lw = 0.0
+        try:
+            if bias is not None:
+                self.tia.noise_bias = bias.along(np.stack([d_err, -d_err], axis=1))
+            Y = self.tia.simulate(X, np.expand_dims(dt, 1) if np.ndim(dt) else dt)
+            if bias is not None:
+                lw = self.tia.last_logw.sum(axis=2)
+        finally:
+            self.tia.noise_bias = None
+        return Y[:, 0], Y[:, 1], lw
+
+    def _compare(self, Vp, Vm, d_err, temp):
+        bias = None if self.noise_bias is None else self.noise_bias.get("comp")
+        if bias is None:
+            return self.comp.simulate(Vp, Vm, temp), 0.0
+        try:
+            self.comp.noise_bias = bias.along(d_err)
+            out = self.comp.simulate(Vp, Vm, temp)
+        finally:
+            self.comp.noise_bias = None
+        return out, self.comp.last_logw
+
+    def _batch_independent(self) -> bool:
+        """True when frames of a batch can be simulated in one vectorized pass.
+
+        Requires per-frame analog reset (TIA filter and comparator memory start
+        from zero each frame) and memoryless optics, either of which would make
+        frames depend on their predecessors. A `waveform_sequence` TIA is the
+        exception: it runs the batch as consecutive windows with state carried
+        between frames, which matches `step()` only without per-frame reset.
+        Thermal drift and the temperature ramp are fed to batches as
+        precomputed per-frame trajectories.
+        """
+        if self.optx.has_frame_memory():
+            return False
+        if self._tia_sequence():
+            return not self.sys.reset_analog_state_each_frame
+        return bool(self.sys.reset_analog_state_each_frame)
+
+    def step_batch(self, batch: int, force_ternary: np.ndarray | None = None, sequential: bool | None = None,
+                   lean: bool = False):
+        """Simulate `batch` frames and return per-trial results as arrays.
+
+        Scalar KPIs (ber, energy_pj, window_ns, snr_*, n_bits, n_err) are (B,)
+        arrays; per-channel vectors (t_out, truth, dv_mV, vsum_mV, per_tile) are
+        (B, N) arrays. With `sequential=None` the vectorized fast path is used
+        whenever `_batch_independent()` holds, otherwise frames are stepped one
+        at a time so inter-frame state evolves exactly as in `step()`. Passing
+        `sequential=False` forces the fast path while analog state is reset per
+        frame (or carried through a `waveform_sequence` TIA without reset);
+        MZI bias, EOM hold, and SOA gain and pattern memory without
+        `soa_sequence` then start every frame from the state carried into the
+        batch (see `Optics`). With
+        `lean=True` only the scalar KPI arrays are returned.
+        """
+        B = int(batch)
+        if force_ternary is not None:
+            force_ternary = np.asarray(force_ternary, dtype=np.int8).reshape(B, -1)
+        if sequential is None:
+            sequential = not self._batch_independent()
+        elif not sequential and self._tia_sequence() and self.sys.reset_analog_state_each_frame:
+            raise ValueError("step_batch fast path with waveform_sequence requires reset_analog_state_each_frame=False")
+        elif not sequential and not self._tia_sequence() and not self.sys.reset_analog_state_each_frame:
+            raise ValueError("step_batch fast path requires reset_analog_state_each_frame")
+        if sequential:
+            frames = [self._simulate_frame(None if force_ternary is None else force_ternary[b]) for b in range(B)]
+            return _stack_frames(frames, self.sys.channels, lean=lean)
+        N = self.sys.channels
+        plan = self.plan()
+        self._begin_frames(B)
+        dt_raw = self.clk.sample_windows(B)
+        dt_vec = np.maximum(0.1, dt_raw - plan.prop_delay_ns)
+        dt = dt_vec[:, None]
+        temp = self._ramp_temp(dt, plan.temp_ramp_C_per_hr)
+        if self.sys.reset_analog_state_each_frame:
+            self.tia.reset()
+            self.comp.reset()
+        if self.therm is not None:
+            drift = self.therm.trajectory(B, frame_period_s=dt_vec*1e-9)
+            self._apply_drift(drift["comp_vth_mV_delta"], drift["opt_trans_scale"])
+        if force_ternary is None:
+            tern = self.rng.integers(-1, 2, size=(B, N)).astype(np.int8)
+        else:
+            tern = force_ternary
+            assert tern.shape[1] == N
+        d_err = None if self.noise_bias is None else self._error_direction(tern)
+        Pp, Pm = self.emit.simulate(tern, dt, temp)
+        Pp2, Pm2, per_tile_p, per_tile_m = self.optx.simulate(Pp, Pm, dt, trans_scale=self._dwdm_scale(plan))
+        if self.cam is not None:
+            Ip, Im = self.cam.simulate_pair(Pp2, Pm2, dt)
+            lw_pd = 0.0
+        else:
+            Ip, Im, lw_pd = self._rails(self.pd, "pd", Pp2, Pm2, dt, d_err)
+        if self._tia_sequence():
+            Vp, Vm, lw_tia = self._tia_block(Ip, Im, dt, d_err)
+        else:
+            Vp, Vm, lw_tia = self._rails(self.tia, "tia", Ip, Im, dt, d_err)
+        if plan.skew_ns > 0.0:
+            dv_noise = self._jitter_rng.normal(0.0, plan.skew_ns, size=(B, N))
+            Vp = Vp + dv_noise
+            Vm = Vm - dv_noise
+        if plan.jitter_ns > 0.0:
+            jit = self._jitter_rng.normal(0.0, plan.jitter_ns, size=(B, N))
+            Vp = Vp + jit
+            Vm = Vm - jit
+        if plan.cj_ns > 0.0:
+            cj_ns = self._jitter_rng.normal(0.0, plan.cj_ns, size=(B, 1))
+            Vp = Vp + cj_ns
+            Vm = Vm - cj_ns
+        if plan.normalize_dv:
+            denom = np.clip(np.abs(Vp) + np.abs(Vm), self.sys.normalize_eps_v, None)
+            Vp = Vp / denom
+            Vm = Vm / denom
+        t_out, lw_comp = self._compare(Vp, Vm, d_err, temp)
+        self._end_batch_drift()
+        t_out = np.asarray(t_out)
+        truth = np.asarray(tern)
+        M = int(min(t_out.shape[1], truth.shape[1]))
+        t_out, truth = t_out[:, :M], truth[:, :M]
+        Vp, Vm = np.asarray(Vp)[:, :M], np.asarray(Vm)[:, :M]
+        err_mask = (t_out != truth)
+        n_err = err_mask.sum(axis=1)
+        energy_pj = (Pp2.sum(axis=1) + Pm2.sum(axis=1))*1e-3*dt_vec*1e-9*1e12
+        eps = 1e-18
+        snr_emit = (np.mean(Pp+Pm, axis=1)+eps)/(np.std(Pp-Pm, axis=1)+eps)
+        snr_pd = (np.mean(Ip+Im, axis=1)+eps)/(np.std(Ip-Im, axis=1)+eps)
+        snr_tia = (np.mean(Vp+Vm, axis=1)+eps)/(np.std(Vp-Vm, axis=1)+eps)
+        self._end_frames()
+        if lean:
+            return {
+                "ber": err_mask.mean(axis=1), "energy_pj": energy_pj, "window_ns": dt_vec,
+                "snr_emit": snr_emit, "snr_pd": snr_pd, "snr_tia": snr_tia,
+                "n_bits": np.full(B, M, dtype=int), "n_err": n_err,
+            }
+        return {
+            "ber": err_mask.mean(axis=1),
+            "energy_pj": energy_pj,
+            "window_ns": dt_vec,
+            "snr_emit": snr_emit,
+            "snr_pd": snr_pd,
+            "snr_tia": snr_tia,
+            "t_out": t_out,
+            "truth": truth,
+            "n_bits": np.full(B, M, dtype=int),
+            "n_err": n_err,
             "blocks": int(np.sqrt(N)) if int(np.sqrt(N))**2 == N else None,
             "per_tile": {
-                "plus": per_tile_p.tolist() if hasattr(per_tile_p, "tolist") else per_tile_p,
-                "minus": per_tile_m.tolist() if hasattr(per_tile_m, "tolist") else per_tile_m,
+                "plus": np.asarray(per_tile_p),
+                "minus": np.asarray(per_tile_m),
             },
-            "dv_mV": (np.asarray(Vp) - np.asarray(Vm)).tolist(),
-            "vsum_mV": (np.abs(np.asarray(Vp)) + np.abs(np.asarray(Vm))).tolist(),
-            "effective_channels": int(M),
+            "dv_mV": Vp - Vm,
+            "vsum_mV": np.abs(Vp) + np.abs(Vm),
+            "effective_channels": M,
+            "logw": None if d_err is None else mixture_logw(lw_pd + lw_tia + lw_comp, tern == 0)[:, :M],
         }
 
-    def run(self, trials=100):
-        outs = [self.step() for _ in range(trials)]
-        ber = np.median([o["ber"] for o in outs])
-        en = np.median([o["energy_pj"] for o in outs])
-        dt = np.median([o["window_ns"] for o in outs])
-        snr_emit = np.median([o["snr_emit"] for o in outs])
-        snr_pd = np.median([o["snr_pd"] for o in outs])
-        snr_tia = np.median([o["snr_tia"] for o in outs])
-        tokens_per_s = float(self.sys.channels) / max(1e-12, (dt * 1e-9))
-        return {
-            "p50_ber": float(ber),
-            "p50_energy_pj": float(en),
-            "window_ns": float(dt),
-            "p50_tokens_per_s": float(tokens_per_s),
-            "p50_snr_emit": float(snr_emit),
-            "p50_snr_pd": float(snr_pd),
-            "p50_snr_tia": float(snr_tia),
-        }
+    def record(self, trials: int, batch: int | None = None, vector_every: int = 0,
+               acc: BerAccumulator | None = None, packed: bool = False) -> "TrialLog":
+        """Run `trials` frames in lean mode into preallocated arrays.
+
+        Scalar KPIs land in a structured array of dtype `TRIAL_DTYPE`. Per-channel
+        vectors (t_out, truth, dv_mV, vsum_mV) are kept only for every
+        `vector_every`-th trial (0 keeps none, 1 keeps all); with `packed=True`
+        their t_out and truth are stored as packed trits (see `looking_glass.trits`).
+        Decisions are also pooled into `acc` when given.
+        """
+        trials = int(trials)
+        every = max(0, int(vector_every))
+        log = TrialLog(metrics=np.zeros(trials, dtype=TRIAL_DTYPE), packed=bool(packed))
+        if every:
+            log.vector_trials = np.arange(0, trials, every)
+        chunk = max(1, int(batch)) if batch else 1
+        start = 0
+        while start < trials:
+            b = min(chunk, trials - start)
+            need_vec = every > 0 and ((-start) % every) < b
+            if batch:
+                res = self.step_batch(b, lean=not (need_vec or acc is not None))
+                if acc is not None:
+                    acc.update(res["t_out"], res["truth"])
+                for k in TRIAL_DTYPE.names:
+                    log.metrics[k][start:start+b] = res[k]
+                if need_vec:
+                    rows = np.arange(start, start + b)
+                    sel = (rows % every) == 0
+                    log._store_vectors(rows[sel] // every, res["t_out"][sel], res["truth"][sel],
+                                       res["dv_mV"][sel], res["vsum_mV"][sel])
+            else:
+                f = self._simulate_frame()
+                log.metrics[start] = tuple(f[k] for k in TRIAL_DTYPE.names)
+                if acc is not None:
+                    acc.update(f["t_out"], f["truth"])
+                if need_vec:
+                    Vp, Vm = np.asarray(f["Vp"]), np.asarray(f["Vm"])
+                    log._store_vectors(np.array([start // every]), np.asarray(f["t_out"])[None],
+                                       np.asarray(f["truth"])[None], (Vp - Vm)[None], (np.abs(Vp) + np.abs(Vm))[None])
+            start += b
+        return log
+
+    def run_until(self, stop: StopRule, batch: int | None = None,
+                  acc: BerAccumulator | None = None) -> tuple["TrialLog", BerAccumulator, str]:
+        """Simulate in chunks of `stop.check_every` trials until `stop` fires.
+
+        Returns the lean trial log, the pooled accumulator and the stop reason.
+        Targets may never be met (e.g. an error-free link), so `stop` must set
+        `max_trials` or `max_seconds`.
+        """
+        if stop.max_trials is None and stop.max_seconds is None:
+            raise ValueError("run_until needs a budget: set StopRule.max_trials or max_seconds")
+        acc = BerAccumulator(self.sys.channels) if acc is None else acc
+        chunks = []
+        done = 0
+        t0 = time.perf_counter()
+        while True:
+            n = max(1, int(stop.check_every))
+            if stop.max_trials is not None:
+                n = min(n, int(stop.max_trials) - done)
+            if n > 0:
+                chunks.append(self.record(n, batch=batch, acc=acc).metrics)
+                done += n
+            reason = stop.reason(acc, done, time.perf_counter() - t0)
+            if reason is not None:
+                break
+        metrics = np.concatenate(chunks) if chunks else np.zeros(0, dtype=TRIAL_DTYPE)
+        return TrialLog(metrics=metrics), acc, reason
+
+    def run(self, trials=100, batch: int | None = None, stop: StopRule | None = None):
+        """Summarize `trials` frames, or run sequentially under `stop`.
+
+        With a stop rule, `trials` is the trial budget unless the rule sets its
+        own `max_trials`; the summary then also reports `stop_reason`.
+        """
+        stop_reason = None
+        if stop is not None:
+            if stop.max_trials is None:
+                stop = replace(stop, max_trials=int(trials))
+            t0 = time.perf_counter()
+            log, acc, stop_reason = self.run_until(stop, batch=batch)
+            elapsed = time.perf_counter() - t0
+            m = log.metrics
+        else:
+            acc = BerAccumulator(self.sys.channels)
+            m = self.record(trials, batch=batch, acc=acc).metrics
+        tps = sensor_tokens_per_s(self.cam.p if self.cam is not None else None, self.optx.p, self.sys.channels,
+                                  float(np.median(m["window_ns"])))
+        out = summarize_log(m, acc, self.sys.channels, tokens_per_s=tps)
+        if stop_reason is not None:
+            out["stop_reason"] = stop_reason
+            out["elapsed_s"] = float(elapsed)
+        return out
+
+    def capture(self, frames: int, path, batch: int = 64) -> np.memmap:
+        """Run `frames` frames and store the camera's rail images in a .npy memmap.
+
+        Needs a camera with `frame_readout`. Returns the (frames, 2, rows, cols)
+        float32 stack (plus/minus rails of the binned ROI) written to `path`.
+        """
+        if self.cam is None or not self.cam.p.frame_readout:
+            raise ValueError("capture needs a camera with frame_readout")
+        shape = self.cam.layout(self.sys.channels).shape
+        stack = open_stack(path, frames, shape)
+        done, batched = 0, self._batch_independent()
+        while done < int(frames):
+            b = min(max(1, int(batch)), int(frames) - done) if batched else 1
+            if batched:
+                self.step_batch(b, lean=True)
+            else:
+                self._simulate_frame()
+            stack[done:done + b] = self.cam.last_pixels.reshape((b, 2) + shape)
+            done += b
+        stack.flush()
+        return stack
+
+
+def summarize_log(m: np.ndarray, acc: BerAccumulator, channels: int, tokens_per_s: float | None = None) -> dict:
+    """Median per-trial KPIs of a `TRIAL_DTYPE` array plus pooled BER from `acc`.
+
+    `tokens_per_s` overrides the channels / window proxy (e.g. with the
+    readout-limited rate of a frame camera, see `sensor_tokens_per_s`).
+    """
+    ber = np.median(m["ber"])
+    en = np.median(m["energy_pj"])
+    dt = np.median(m["window_ns"])
+    snr_emit = np.median(m["snr_emit"])
+    snr_pd = np.median(m["snr_pd"])
+    snr_tia = np.median(m["snr_tia"])
+    if tokens_per_s is None:
+        tokens_per_s = float(channels) / max(1e-12, (dt * 1e-9))
+    return {
+        "p50_ber": float(ber),
+        "p50_energy_pj": float(en),
+        "window_ns": float(dt),
+        "p50_tokens_per_s": float(tokens_per_s),
+        "p50_snr_emit": float(snr_emit),
+        "p50_snr_pd": float(snr_pd),
+        "p50_snr_tia": float(snr_tia),
+        **acc.summary(exact=False, detail=False),
+    }
+
+
+# Scalar per-trial KPIs written by Orchestrator.record (lean result mode)
+TRIAL_DTYPE = np.dtype([
+    ("ber", np.float64),
+    ("energy_pj", np.float64),
+    ("window_ns", np.float64),
+    ("snr_emit", np.float64),
+    ("snr_pd", np.float64),
+    ("snr_tia", np.float64),
+    ("n_bits", np.int32),
+    ("n_err", np.int32),
+])
+
+
+@dataclass
+class TrialLog:
+    """Lean per-trial results: a KPI record array plus sampled channel vectors.
+
+    With `packed`, t_out and truth hold `pack_trits` rows of `channels` trits.
+    """
+    metrics: np.ndarray
+    vector_trials: np.ndarray | None = None
+    t_out: np.ndarray | None = None
+    truth: np.ndarray | None = None
+    dv_mV: np.ndarray | None = None
+    vsum_mV: np.ndarray | None = None
+    packed: bool = False
+    channels: int = 0
+
+    def _store_vectors(self, slots, t_out, truth, dv, vsum) -> None:
+        if self.t_out is None:
+            S, M = len(self.vector_trials), np.shape(t_out)[-1]
+            W, dtype = (packed_bytes(M), np.uint8) if self.packed else (M, np.int8)
+            self.channels = M
+            self.t_out = np.zeros((S, W), dtype=dtype)
+            self.truth = np.zeros((S, W), dtype=dtype)
+            self.dv_mV = np.zeros((S, M), dtype=float)
+            self.vsum_mV = np.zeros((S, M), dtype=float)
+        self.t_out[slots] = pack_trits(t_out) if self.packed else t_out
+        self.truth[slots] = pack_trits(truth) if self.packed else truth
+        self.dv_mV[slots] = dv
+        self.vsum_mV[slots] = vsum
+
+    def trits(self) -> tuple[np.ndarray, np.ndarray]:
+        """(t_out, truth) of the stored trials as int8 arrays."""
+        if not self.packed:
+            return self.t_out, self.truth
+        return unpack_trits(self.t_out, self.channels), unpack_trits(self.truth, self.channels)
+
+    def errors(self) -> np.ndarray:
+        """Decision errors per stored trial (popcount over packed rows)."""
+        if not self.packed:
+            return np.count_nonzero(self.t_out != self.truth, axis=-1)
+        return trit_errors(self.t_out, self.truth)
+
+    def confusion(self) -> np.ndarray:
+        """3x3 truth-by-decision counts over the stored trials."""
+        if not self.packed:
+            return trit_confusion(pack_trits(self.truth), pack_trits(self.t_out), self.channels)
+        return trit_confusion(self.truth, self.t_out, self.channels)
+
+
+def _stack_frames(frames: list[dict], channels: int, lean: bool = False) -> dict:
+    """Stack `_simulate_frame` results into the columnar layout of `step_batch`."""
+    out = {k: np.asarray([f[k] for f in frames]) for k in TRIAL_DTYPE.names}
+    if lean:
+        return out
+    Vp = np.asarray([f["Vp"] for f in frames])
+    Vm = np.asarray([f["Vm"] for f in frames])
+    out["t_out"] = np.asarray([f["t_out"] for f in frames])
+    out["truth"] = np.asarray([f["truth"] for f in frames])
+    out["dv_mV"] = Vp - Vm
+    out["vsum_mV"] = np.abs(Vp) + np.abs(Vm)
+    out["per_tile"] = {
+        "plus": np.asarray([f["per_tile_p"] for f in frames]),
+        "minus": np.asarray([f["per_tile_m"] for f in frames]),
+    }
+    N = int(channels)
+    out["blocks"] = int(np.sqrt(N)) if int(np.sqrt(N))**2 == N else None
+    out["effective_channels"] = int(frames[0]["n_bits"]) if frames else 0
+    if frames and frames[0]["logw"] is not None:
+        out["logw"] = np.asarray([f["logw"] for f in frames])
+    return out
@@ -0,0 +1,131 @@
+"""Opt-in per-stage timing of the signal chain.
+
+`StageProfiler().attach(orch)` shadows the block methods an orchestrator calls
+each frame (clock, thermal, emitter, optics, PD, camera, TIA, comparator)
+with timed wrappers, and has `Optics` wrap every compiled stage
+(`optics.soa`, `optics.mzi`, `optics.neighbor_ct`, ...). Nothing is wrapped
+until `attach`, and `detach` restores the plain methods, so runs without a
+profiler pay nothing.
+
+Each stage accumulates calls, inclusive time and self time (excluding nested
+stages). With `memory=True` it also records the peak traced allocation above
+the stage's starting footprint (`tracemalloc`), which slows runs noticeably.
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+# (orchestrator attribute, method, stage name)
+HOOKS = (
+    (None, "step_batch", "batch"),
+    (None, "_simulate_frame", "frame"),
+    ("clk", "sample_window", "clock"),
+    ("clk", "sample_windows", "clock"),
+    ("therm", "step", "thermal"),
+    ("emit", "simulate", "emitter"),
+    ("optx", "simulate", "optics"),
+    ("pd", "simulate", "pd"),
+    ("cam", "simulate", "camera"),
+    ("tia", "simulate", "tia"),
+    ("comp", "simulate", "comparator"),
+)
+
+
+class StageProfiler:
+    def __init__(self, memory: bool = False):
+        self.memory = bool(memory)
+        self._stats = {}   # name -> [calls, total_s, self_s, alloc_bytes]
+        self._stack = []   # [name, t0, child_s, mem0, peak]
+        self._patched = []
+        self._started_trace = False
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def attach(self, orch) -> "StageProfiler":
+        """Wrap `orch`'s per-frame block calls; several orchestrators may share one profiler."""
+        for attr, method, name in HOOKS:
+            obj = orch if attr is None else getattr(orch, attr, None)
+            fn = getattr(obj, method, None) if obj is not None else None
+            if fn is None:
+                continue
+            setattr(obj, method, self._wrap(name, fn))
+            self._patched.append((obj, method))
+        orch.optx.stage_wrap = lambda name, fn: self._wrap("optics." + name, fn)
+        orch.optx._plan.invalidate()
+        self._patched.append((orch.optx, "stage_wrap"))
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_trace = True
+        return self
+
+    def detach(self) -> None:
+        for obj, method in reversed(self._patched):
+            obj.__dict__.pop(method, None)
+            if method == "stage_wrap":
+                obj._plan.invalidate()
+        self._patched.clear()
+        if self._started_trace:
+            tracemalloc.stop()
+            self._started_trace = False
+
+    def _wrap(self, name: str, fn):
+        def timed(*args, **kwargs):
+            self._enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit()
+        timed.__name__ = getattr(fn, "__name__", name)
+        return timed
+
+    def _enter(self, name: str) -> None:
+        mem0 = peak = 0
+        if self.memory:
+            mem0, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak so far, then measure this stage from here
+                self._stack[-1][4] = max(self._stack[-1][4], peak)
+            tracemalloc.reset_peak()
+        self._stack.append([name, time.perf_counter(), 0.0, mem0, mem0])
+
+    def _exit(self) -> None:
+        name, t0, child_s, mem0, peak = self._stack.pop()
+        dt = time.perf_counter() - t0
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = [0, 0.0, 0.0, 0]
+        st[0] += 1
+        st[1] += dt
+        st[2] += dt - child_s
+        if self.memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            st[3] += max(0, peak - mem0)
+        if self._stack:
+            parent = self._stack[-1]
+            parent[2] += dt
+            if self.memory:
+                parent[4] = max(parent[4], peak)
+
+    def summary(self) -> dict:
+        """JSON-ready breakdown, stages sorted by inclusive time.
+
+        `share` is the stage's self time over the summed self time, i.e. its
+        fraction of the profiled wall time. `alloc_kb` is present with
+        `memory=True`.
+        """
+        wall = sum(st[2] for st in self._stats.values())
+        stages = {}
+        for name, (calls, total, own, alloc) in sorted(self._stats.items(), key=lambda kv: -kv[1][1]):
+            row = {
+                "calls": calls,
+                "total_ms": total * 1e3,
+                "self_ms": own * 1e3,
+                "mean_us": total / calls * 1e6 if calls else 0.0,
+                "share": own / wall if wall > 0 else 0.0,
+            }
+            if self.memory:
+                row["alloc_kb"] = alloc / 1024.0
+            stages[name] = row
+        return {"wall_s": wall, "memory": self.memory, "stages": stages}
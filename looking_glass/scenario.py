@@ -17,6 +17,10 @@ from .sim.comparator import ComparatorParams
 from .sim.clock import ClockParams
 from .sim.camera import CameraParams
 from .sim.thermal import ThermalParams
+from .stats import StopRule, wilson_ci
+from .analytic import analytic_ber
+from .shard import orchestrator_params, run_sharded
+from .profiling import StageProfiler
 
 
 def _load_yaml(path: t.Union[str, Path]) -> dict:
@@ -63,13 +67,16 @@ def _instantiate(cls: t.Type[t.Any], data: dict):
     return cls(**filtered)
 
 
-def build_orchestrator_from_scenario(scenario_yaml_path: t.Union[str, Path]) -> tuple[Orchestrator, int, dict]:
+def build_orchestrator_from_scenario(scenario_yaml_path: t.Union[str, Path],
+                                     rng_streams: bool | None = None) -> tuple[Orchestrator, int, dict]:
     scn = _load_yaml(scenario_yaml_path)
 
     trials = int(scn.get("trials", 100))
     channels = int(scn.get("channels", 16))
     seed = int(scn.get("seed", 42))
     temp_C = float(scn.get("temp_C", 25.0))
+    if rng_streams is None:
+        rng_streams = bool(scn.get("rng_streams", False))
 
     def _pack_data(key: str, *, required: bool) -> dict | None:
         if required and key not in scn:
@@ -105,13 +112,37 @@ def build_orchestrator_from_scenario(scenario_yaml_path: t.Union[str, Path]) ->
     # Enforce channel count from scenario on relevant packs
     emit_p.channels = channels
 
-    sys_p = SystemParams(channels=channels, window_ns=clk_p.window_ns, temp_C=temp_C, seed=seed)
+    sys_p = SystemParams(channels=channels, window_ns=clk_p.window_ns, temp_C=temp_C, seed=seed,
+                         rng_streams=rng_streams)
     orch = Orchestrator(sys_p, emit_p, optx_p, pd_p, tia_p, comp_p, clk_p, cam_p, therm_p)
     return orch, trials, scn
 
 
-def run_trials(orch: Orchestrator, trials: int) -> list[dict]:
-    return [orch.step() for _ in range(int(trials))]
+def run_trials(orch: Orchestrator, trials: int, batch: int | None = None) -> list[dict]:
+    if not batch:
+        return [orch.step() for _ in range(int(trials))]
+    # Batched path runs in lean mode: only scalar per-trial KPIs are kept
+    m = orch.record(int(trials), batch=batch).metrics
+    return [dict(zip(m.dtype.names, rec)) for rec in m.tolist()]
+
+
+def run_trials_until(orch: Orchestrator, stop: StopRule, batch: int | None = None) -> tuple[list[dict], str]:
+    """Run lean trials until `stop` fires; returns scalar rows and the stop reason."""
+    log, _, reason = orch.run_until(stop, batch=batch)
+    m = log.metrics
+    return [dict(zip(m.dtype.names, rec)) for rec in m.tolist()], reason
+
+
+def _stop_rule_from_args(args, trials: int) -> StopRule | None:
+    rule = StopRule(
+        rel_ci_width=args.target_rel_ci,
+        min_errors=args.min_errors,
+        max_seconds=args.max_seconds,
+        max_trials=int(args.max_trials) if args.max_trials is not None else int(trials),
+        min_trials=int(args.min_trials),
+        check_every=int(args.check_every),
+    )
+    return rule if rule.enabled() else None
 
 
 def summarize(trial_rows: list[dict]) -> dict:
@@ -121,7 +152,15 @@ def summarize(trial_rows: list[dict]) -> dict:
     ber = median([r["ber"] for r in trial_rows])
     en = median([r["energy_pj"] for r in trial_rows])
     dt = median([r["window_ns"] for r in trial_rows])
-    return {"p50_ber": float(ber), "p50_energy_pj": float(en), "window_ns": float(dt)}
+    out = {"p50_ber": float(ber), "p50_energy_pj": float(en), "window_ns": float(dt)}
+    if all("n_err" in r and "n_bits" in r for r in trial_rows):
+        # Pooled error counts resolve BER far below the 1/channels median quantum
+        n_err = int(sum(int(r["n_err"]) for r in trial_rows))
+        n_bits = int(sum(int(r["n_bits"]) for r in trial_rows))
+        lo, hi = wilson_ci(n_err, n_bits)
+        out.update({"pooled_ber": (n_err / n_bits) if n_bits else None, "n_err": n_err, "n_bits": n_bits,
+                    "ber_wilson_lo": lo, "ber_wilson_hi": hi})
+    return out
 
 
 def save_csv(trial_rows: list[dict], path: t.Union[str, Path]) -> None:
@@ -142,6 +181,32 @@ def run_scenario_cli(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Run LookingGlass scenario YAML")
     parser.add_argument("scenario", type=str, help="Path to scenario YAML")
     parser.add_argument("--trials", type=int, default=None, help="Override trials count")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="Simulate trials in vectorized batches of this size (Orchestrator.step_batch)")
+    # Sequential early stopping: run until a target is met or the budget is spent
+    parser.add_argument("--target-rel-ci", type=float, default=None,
+                        help="Stop once the 95%% Wilson CI width relative to pooled BER is at or below this")
+    parser.add_argument("--min-errors", type=int, default=None, help="Stop once this many bit errors are pooled")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Wall-clock budget per run (s)")
+    parser.add_argument("--max-trials", type=int, default=None,
+                        help="Trial budget when early stopping is enabled (default: --trials)")
+    parser.add_argument("--min-trials", type=int, default=0, help="Do not stop on a target before this many trials")
+    parser.add_argument("--check-every", type=int, default=100, help="Trials between stopping checks")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Run trials as seed-spawned shards on this many processes (summary only, no per-trial CSV; "
+                             "not combinable with early stopping)")
+    parser.add_argument("--shard-size", type=int, default=1000,
+                        help="Trials per shard; results depend on it but not on --workers")
+    parser.add_argument("--rng-streams", action="store_true", default=None,
+                        help="Per-module counter-based RNG streams: results independent of --batch and --shard-size")
+    parser.add_argument("--analytic", action="store_true",
+                        help="Also report the semi-analytic Gaussian BER (analytic_ber) per run/sweep point")
+    parser.add_argument("--profile", action="store_true",
+                        help="Add a per-stage timing breakdown to the summary (in-process runs only)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, also record traced allocations per stage (slow)")
+    parser.add_argument("--confirm-top", type=int, default=0,
+                        help="With --analytic sweeps, run Monte Carlo only at the K points with the lowest analytic BER")
     parser.add_argument("--csv", type=str, default=None, help="Optional CSV output path for per-trial rows")
     parser.add_argument("--json", type=str, default=None, help="Optional JSON output path for summary")
     # Optional TDM Path B passthrough: if provided, delegate to examples/test.py with TDM flags
@@ -164,8 +229,12 @@ def run_scenario_cli(argv: list[str] | None = None) -> int:
     parser.add_argument("--plot", type=str, default=None, help="Optional path to save BER vs window_ns PNG plot")
     args = parser.parse_args(argv)
 
-    orch, trials_default, scn = build_orchestrator_from_scenario(args.scenario)
+    orch, trials_default, scn = build_orchestrator_from_scenario(args.scenario, rng_streams=args.rng_streams)
     trials = args.trials if args.trials is not None else trials_default
+    stop_rule = _stop_rule_from_args(args, trials)
+    if args.workers and stop_rule is not None:
+        # Shards run fixed trial budgets; a stop rule would be silently ignored
+        parser.error("--workers cannot be combined with --target-rel-ci, --min-errors or --max-seconds")
 
     # If TDM requested, delegate to examples/test.py with equivalent packs and flags
     if int(getattr(args, 'tdm_k', 0)) > 0:
@@ -276,9 +345,31 @@ def run_scenario_cli(argv: list[str] | None = None) -> int:
         ys = []
         from .plotting import save_xy_plot
         all_rows = []
-        for x in xs:
+        reasons = []
+        a_bers = []
+        mc_xs = set(range(len(xs)))
+        if args.analytic:
+            for x in xs:
+                setter(x)
+                a_bers.append(analytic_ber(orch)["analytic_ber"])
+            if int(args.confirm_top) > 0:
+                mc_xs = set(sorted(range(len(xs)), key=lambda i: a_bers[i])[:int(args.confirm_top)])
+        for i, x in enumerate(xs):
             setter(x)
-            rows = run_trials(orch, trials)
+            if i not in mc_xs:
+                ys.append(None)
+                if stop_rule is not None:
+                    reasons.append(None)
+                continue
+            if args.workers:
+                ys.append(run_sharded(orchestrator_params(orch), trials, args.shard_size, args.workers,
+                                      batch=args.batch)["p50_ber"])
+                continue
+            if stop_rule is not None:
+                rows, reason = run_trials_until(orch, stop_rule, batch=args.batch)
+                reasons.append(reason)
+            else:
+                rows = run_trials(orch, trials, batch=args.batch)
             all_rows.extend([{**r, xlabel: x} for r in rows])
             summ = summarize(rows)
             ys.append(summ["p50_ber"]) 
@@ -298,18 +389,39 @@ def run_scenario_cli(argv: list[str] | None = None) -> int:
                     })
         # Save plot
         if args.plot:
-            save_xy_plot(xs, ys, xlabel=xlabel, ylabel="p50_ber", out_path=args.plot,
+            pts = [(x, y) for x, y in zip(xs, ys) if y is not None]
+            save_xy_plot([x for x, _ in pts], [y for _, y in pts], xlabel=xlabel, ylabel="p50_ber", out_path=args.plot,
                          title=f"BER vs {xlabel}")
         # Save summary list if requested
+        sweep_out = {f"x_{xlabel}": xs, "p50_ber": ys}
+        if args.analytic:
+            sweep_out["analytic_ber"] = a_bers
+        if stop_rule is not None:
+            sweep_out["stop_reason"] = reasons
         if args.json:
             Path(args.json).parent.mkdir(parents=True, exist_ok=True)
             with open(args.json, "w", encoding="utf-8") as f:
-                json.dump({f"x_{xlabel}": xs, "p50_ber": ys}, f, indent=2)
-        print(json.dumps({f"x_{xlabel}": xs, "p50_ber": ys}, indent=2))
+                json.dump(sweep_out, f, indent=2)
+        print(json.dumps(sweep_out, indent=2))
         return 0
     else:
-        rows = run_trials(orch, trials)
-        summary = summarize(rows)
+        profiler = None
+        if args.profile and not args.workers:
+            profiler = StageProfiler(memory=args.profile_memory).attach(orch)
+        if args.workers:
+            rows = []
+            summary = run_sharded(orchestrator_params(orch), trials, args.shard_size, args.workers, batch=args.batch)
+        elif stop_rule is not None:
+            rows, reason = run_trials_until(orch, stop_rule, batch=args.batch)
+            summary = {**summarize(rows), "trials_run": len(rows), "stop_reason": reason}
+        else:
+            rows = run_trials(orch, trials, batch=args.batch)
+            summary = summarize(rows)
+        if profiler is not None:
+            profiler.detach()
+            summary["profile"] = profiler.summary()
+        if args.analytic:
+            summary["analytic_ber"] = analytic_ber(orch)["analytic_ber"]
         if args.csv:
             save_csv(rows, args.csv)
         if args.json:
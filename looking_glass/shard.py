@@ -0,0 +1,100 @@
+"""Deterministic multi-process trial sharding.
+
+A trial budget is cut into fixed-size shards. Shard k always covers the same
+trials and draws from child k of `SeedSequence(seed).spawn(...)`, whatever the
+number of workers, and results are merged in shard order. Summaries are
+therefore bit-identical for any worker count (including in-process runs).
+
+Every shard builds its orchestrator from the construction seed, so emitter
+power spread, camera PRNU, TIA gain spread and comparator offsets (the static
+"hardware") are identical across shards; only the per-trial stream differs.
+Inter-frame state (thermal drift, optics memory) restarts at each shard.
+
+With `SystemParams.rng_streams` shards are not reseeded: shard k seeks to its
+first global trial index, so frame noise is also independent of the shard
+size.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .orchestrator import Orchestrator, TRIAL_DTYPE, summarize_log
+from .sim.frame import sensor_tokens_per_s
+from .stats import BerAccumulator
+
+
+def orchestrator_params(orch: Orchestrator) -> tuple:
+    """Constructor arguments to rebuild `orch` in another process."""
+    return (orch.sys, orch.emit.p, orch.optx.p, orch.pd.p, orch.tia.p, orch.comp.p, orch.clk.p,
+            orch.cam.p if orch.cam is not None else None,
+            orch.therm.p if orch.therm is not None else None)
+
+
+def shard_sizes(trials: int, shard_size: int) -> list[int]:
+    trials, shard_size = int(trials), max(1, int(shard_size))
+    return [min(shard_size, trials - s) for s in range(0, trials, shard_size)]
+
+
+def run_shard(params: tuple, seed_seq: np.random.SeedSequence, trials: int,
+              batch: int | None = None, start: int = 0) -> tuple[np.ndarray, BerAccumulator]:
+    """Simulate one shard; returns its lean metrics and pooled counts.
+
+    `start` is the shard's first global trial index (used with `rng_streams`).
+    """
+    # Drift lives on the blocks (`vth_live_mV`, `transmittance_live`, `_temp`), so
+    # shards can share the caller's params read-only
+    orch = Orchestrator(*params)
+    if getattr(orch.sys, 'rng_streams', False):
+        orch.seek(start)
+    else:
+        orch.prime_static()
+        orch.reseed(seed_seq)
+    acc = BerAccumulator(orch.sys.channels)
+    metrics = orch.record(int(trials), batch=batch, acc=acc).metrics
+    return metrics, acc
+
+
+def _run_shard_args(args):
+    return run_shard(*args)
+
+
+def run_sharded(params: tuple, trials: int, shard_size: int = 1000, workers: int | None = None,
+                batch: int | None = None) -> dict:
+    """Summarize `trials` frames split into shards over a process pool.
+
+    `params` are the Orchestrator constructor arguments (see
+    `orchestrator_params`); the base seed is `params[0].seed`. `workers=None`
+    uses all cores, `workers<=1` runs in-process.
+    """
+    sizes = shard_sizes(trials, shard_size)
+    seeds = np.random.SeedSequence(int(params[0].seed)).spawn(len(sizes))
+    starts = np.cumsum([0] + sizes[:-1]).tolist()
+    jobs = [(params, s, n, batch, k) for s, n, k in zip(seeds, sizes, starts)]
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    t0 = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_run_shard_args(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+            results = list(ex.map(_run_shard_args, jobs))
+    acc = BerAccumulator(params[0].channels)
+    for _, a in results:
+        acc.merge(a)
+    m = np.concatenate([r for r, _ in results]) if results else np.zeros(0, dtype=TRIAL_DTYPE)
+    tps = sensor_tokens_per_s(params[7], params[2], params[0].channels, float(np.median(m["window_ns"])))
+    out = summarize_log(m, acc, params[0].channels, tokens_per_s=tps)
+    out.update({
+        "mean_energy_pj": float(np.mean(m["energy_pj"])),
+        "mean_snr_emit": float(np.mean(m["snr_emit"])),
+        "mean_snr_pd": float(np.mean(m["snr_pd"])),
+        "mean_snr_tia": float(np.mean(m["snr_tia"])),
+        "shards": len(sizes),
+        "shard_size": int(shard_size),
+        "workers": max(1, min(workers, len(jobs))),
+        "elapsed_s": time.perf_counter() - t0,
+    })
+    return out
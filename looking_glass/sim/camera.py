@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import numpy as np
+from .frame import TileReadout, tile_readout
 
 q = 1.602176634e-19
 h = 6.62607015e-34
@@ -16,6 +17,18 @@ class CameraParams:
     prnu_pct: float = 0.5              # pixel response non-uniformity (% std)
     adc_bits: int = 12
     adc_fullscale_e: float = 20000.0
+    dsnu_pct: float = 0.0              # dark signal non-uniformity (% std of dark current)
+    # Pixels with mean signal above this many electrons draw Gaussian shot+read
+    # noise instead of Poisson + Gaussian (0 keeps exact Poisson everywhere)
+    gauss_above_e: float = 0.0
+    # Full-frame readout of the optics tile grid (see sim/frame.py); off reads one pixel per channel
+    frame_readout: bool = False
+    roi_px: tuple = ()                 # (row0, col0, rows, cols) sensor pixels; empty = full frame
+    binning: int = 1                   # on-chip binning x binning
+    shutter: str = "global"            # "global" or "rolling"
+    line_time_us: float = 10.0         # readout time per (binned) row
+    frame_overhead_us: float = 0.0
+    max_fps: float = 0.0               # interface frame-rate cap, 0 = none
 
 
 class Camera:
@@ -23,27 +36,63 @@ class Camera:
         self.p = params
         self.rng = np.random.default_rng() if rng is None else rng
         self._prnu = None
+        self._dark = 1.0
+        # Static PRNU/DSNU maps per sensor geometry: the channel count for per-channel
+        # readout, (grid_px, tile_border_px, roi_px, binning) for frame readout
+        self._maps = {}
+        # Tile grid for frame readout, set from the optics params by the orchestrator
+        self.grid_px = 64
+        self.tile_border_px = 0.0
+        self.last_pixels = None
 
-    def _ensure_prnu(self, N: int):
-        if self._prnu is None:
+    def set_tile_grid(self, grid_px: int, tile_border_px: float) -> None:
+        self.grid_px = int(grid_px)
+        self.tile_border_px = float(tile_border_px)
+
+    def layout(self, channels: int) -> TileReadout:
+        return tile_readout(int(channels), self.grid_px, self.tile_border_px, tuple(self.p.roi_px), int(self.p.binning))
+
+    def _frame_key(self) -> tuple:
+        return (self.grid_px, self.tile_border_px, tuple(self.p.roi_px), int(self.p.binning))
+
+    def _ensure_prnu(self, N: int, key=None):
+        """Select (drawing once) the maps of `N` pixels for geometry `key` (default N)."""
+        key = N if key is None else key
+        if key not in self._maps:
             sigma = max(self.p.prnu_pct, 0.0) / 100.0
-            self._prnu = 1.0 + self.rng.normal(0.0, sigma, size=N)
+            prnu = 1.0 + self.rng.normal(0.0, sigma, size=N)
+            dark = 1.0
+            if self.p.dsnu_pct > 0.0:
+                dark = np.clip(1.0 + self.rng.normal(0.0, self.p.dsnu_pct / 100.0, size=N), 0.0, None)
+            self._maps[key] = (prnu, dark)
+        self._prnu, self._dark = self._maps[key]
 
     def simulate(self, optical_mw, dt_ns: float):
+        """Equivalent current (A) per channel of (N,) or (B, N) rail powers (mW)."""
+        if self.p.frame_readout:
+            lay = self.layout(np.shape(optical_mw)[-1])
+            self.last_pixels = self._pixels(lay.render(np.asarray(optical_mw, dtype=float)), dt_ns, self._frame_key())
+            return lay.channel_sum(self.last_pixels)
+        return self._pixels(optical_mw, dt_ns)
+
+    def _pixels(self, optical_mw, dt_ns: float, key=None):
         P = np.clip(np.array(optical_mw, dtype=float) * 1e-3, 0.0, None)  # W
-        N = P.size
-        self._ensure_prnu(N)
+        # P is (N,) or (B, N); PRNU is a per-pixel map over the last axis
+        N = P.shape[-1] if P.ndim else P.size
+        self._ensure_prnu(N, key)
+        if self.p.gauss_above_e > 0.0:
+            return self._simulate_gauss(P, dt_ns)
         lam = self.p.wavelength_nm * 1e-9
         photons_per_J = 1.0 / (h * c / lam)
         t_s = dt_ns * 1e-9
         # Electrons from signal
         e_sig = P * t_s * photons_per_J * self.p.qe
         # Dark current contribution
-        e_dark = np.full(N, self.p.dark_current_e_per_s * t_s)
+        e_dark = np.broadcast_to(self.p.dark_current_e_per_s * t_s * self._dark, P.shape)
         # Shot noise (Poisson) and read noise
         e_mean = e_sig * self._prnu + e_dark
         e_poiss = self.rng.poisson(np.clip(e_mean, 0.0, None))
-        e_read = self.rng.normal(0.0, self.p.read_noise_e_rms, size=N)
+        e_read = self.rng.normal(0.0, self.p.read_noise_e_rms, size=P.shape)
         e_total = e_poiss + e_read
         # Saturation and ADC quantization (electrons domain)
         e_total = np.clip(e_total, 0.0, self.p.full_well_e)
@@ -55,3 +104,85 @@ class Camera:
         I_equiv = (e_total * q) / np.clip(t_s, 1e-12, None)
         return I_equiv
 
+    def _simulate_gauss(self, P: np.ndarray, dt_ns) -> np.ndarray:
+        # Same chain as `simulate`, in place on the clipped power P (W). One normal
+        # per pixel: mean + sqrt(mean + read^2) z above `gauss_above_e`, Poisson +
+        # read z at or below it.
+        p = self.p
+        t_s = dt_ns * 1e-9
+        e_mean = P
+        e_mean *= t_s * (p.qe / (h * c / (p.wavelength_nm * 1e-9)))
+        e_mean *= self._prnu
+        e_mean += p.dark_current_e_per_s * t_s * self._dark
+        np.maximum(e_mean, 0.0, out=e_mean)
+        r = p.read_noise_e_rms
+        z = self.rng.normal(0.0, 1.0, size=e_mean.shape)
+        low = e_mean <= p.gauss_above_e
+        e = np.add(e_mean, r * r)
+        np.sqrt(e, out=e)
+        e *= z
+        e += e_mean
+        if low.any():
+            # Full-shape draw so each frame's counts do not depend on the rest of the batch
+            e = np.where(low, self.rng.poisson(np.where(low, e_mean, 0.0)) + r * z, e)
+        cap = p.full_well_e
+        quant = p.adc_bits > 0 and p.adc_fullscale_e > 0
+        if quant:
+            cap = min(cap, p.adc_fullscale_e)
+        np.clip(e, 0.0, cap, out=e)
+        if quant:
+            step = p.adc_fullscale_e / (2 ** p.adc_bits)
+            e /= step
+            np.round(e, out=e)
+            e *= step
+        e *= q / np.clip(t_s, 1e-12, None)
+        return e
+
+    def simulate_pair(self, Pp, Pm, dt_ns):
+        """Plus and minus rails; with `gauss_above_e` both go through one stacked call.
+
+        Rails are stacked on axis -2, so a batch stays (B, 2, N) with the trial
+        axis first. With `frame_readout`, `last_pixels` keeps the (..., 2, pixels)
+        rail images.
+        """
+        if self.p.gauss_above_e > 0.0:
+            dt = dt_ns if np.ndim(dt_ns) == 0 else np.expand_dims(dt_ns, -2)
+            I = self.simulate(np.stack([np.asarray(Pp, dtype=float), np.asarray(Pm, dtype=float)], axis=-2), dt)
+            return I[..., 0, :], I[..., 1, :]
+        Ip = self.simulate(Pp, dt_ns)
+        pix = self.last_pixels
+        Im = self.simulate(Pm, dt_ns)
+        if self.p.frame_readout:
+            self.last_pixels = np.stack([pix, self.last_pixels], axis=-2)
+        return Ip, Im
+
+    def moments(self, optical_mw, dt_ns: float):
+        """Mean equivalent current (A) and its variance (A^2) without drawing.
+
+        Uses the PRNU map once drawn (nominal response before the first frame).
+        A saturated pixel (full well or ADC full scale) keeps only read and
+        quantization noise. With `frame_readout` the per-pixel moments are
+        summed over each channel's pixels.
+        """
+        if self.p.frame_readout:
+            lay = self.layout(np.shape(optical_mw)[-1])
+            mean, var = self._pixel_moments(lay.render(np.asarray(optical_mw, dtype=float)), dt_ns, self._frame_key())
+            return lay.channel_sum(mean), lay.channel_sum(var)
+        return self._pixel_moments(optical_mw, dt_ns)
+
+    def _pixel_moments(self, optical_mw, dt_ns: float, key=None):
+        P = np.clip(np.array(optical_mw, dtype=float) * 1e-3, 0.0, None)
+        lam = self.p.wavelength_nm * 1e-9
+        t_s = dt_ns * 1e-9
+        prnu, dark = self._maps.get((P.shape[-1] if P.ndim else P.size) if key is None else key, (1.0, 1.0))
+        e_mean = P * t_s / (h * c / lam) * self.p.qe * prnu + self.p.dark_current_e_per_s * t_s * dark
+        cap = self.p.full_well_e
+        e_var = self.p.read_noise_e_rms ** 2
+        if self.p.adc_bits > 0 and self.p.adc_fullscale_e > 0:
+            cap = min(cap, self.p.adc_fullscale_e)
+            e_var = e_var + (self.p.adc_fullscale_e / (2 ** self.p.adc_bits)) ** 2 / 12.0
+        e_var = e_var + np.where(e_mean < cap, np.clip(e_mean, 0.0, None), 0.0)
+        e_mean = np.clip(e_mean, 0.0, cap)
+        k = q / np.clip(t_s, 1e-12, None)
+        return e_mean * k, e_var * k * k
+
@@ -14,3 +14,8 @@ class Clock:
     def sample_window(self) -> float:
         jitter_ns = self.rng.normal(0.0, self.p.jitter_ps_rms*1e-3)
         return max(0.1, self.p.window_ns + jitter_ns)
+
+    def sample_windows(self, count: int) -> np.ndarray:
+        """Draw `count` jittered frame windows at once (ns)."""
+        jitter_ns = self.rng.normal(0.0, self.p.jitter_ps_rms*1e-3, size=int(count))
+        return np.maximum(0.1, self.p.window_ns + jitter_ns)
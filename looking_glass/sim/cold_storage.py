@@ -27,7 +27,7 @@ class ColdReader:
 
     def simulate(self, ternary: np.ndarray, dt_ns: float, temp_C: float):
         ternary = np.asarray(ternary)
-        assert ternary.size == self.p.channels
+        assert ternary.shape[-1] == self.p.channels
 
         base = float(self.p.read_laser_mw) * float(self.p.diffraction_efficiency)
         ext = 10 ** (-float(self.p.extinction_db) / 10.0)
@@ -38,8 +38,8 @@ class ColdReader:
         # Global crosstalk pedestal
         ct = 10 ** (float(self.p.global_ct_db) / 10.0)
         if Pp.size:
-            leak_p = Pp.mean() * ct
-            leak_m = Pm.mean() * ct
+            leak_p = Pp.mean(axis=-1, keepdims=True) * ct
+            leak_m = Pm.mean(axis=-1, keepdims=True) * ct
             Pp = Pp + leak_p
             Pm = Pm + leak_m
 
@@ -53,8 +53,8 @@ class ColdReader:
 
         # Simple MTF blur effect: reduce rail contrast a bit
         k = 1.0 / (1.0 + (float(self.p.mtf_blur_w)) ** 2)
-        Pp = Pp * (1.0 - 0.5 * k) + 0.5 * k * Pp.mean()
-        Pm = Pm * (1.0 - 0.5 * k) + 0.5 * k * Pm.mean()
+        Pp = Pp * (1.0 - 0.5 * k) + 0.5 * k * Pp.mean(axis=-1, keepdims=True)
+        Pm = Pm * (1.0 - 0.5 * k) + 0.5 * k * Pm.mean(axis=-1, keepdims=True)
 
         Pp = np.clip(Pp, 0.0, None)
         Pm = np.clip(Pm, 0.0, None)
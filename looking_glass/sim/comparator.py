@@ -1,8 +1,12 @@
 from dataclasses import dataclass
 import numpy as np
+from .noise import biased_normal
+from .plan import Tracked
+from ..stats import q_function
 
 @dataclass
-class ComparatorParams:
+class ComparatorParams(Tracked):
+    _live = frozenset({"vth_mV"})  # drifts per frame; not compiled into plans
     vth_mV: float = 5.0
     hysteresis_mV: float = 1.0
     input_noise_mV_rms: float = 0.8
@@ -24,6 +28,11 @@ class Comparator:
         self._vth_offset = None
         self._vth_per_ch = None
         self._offset_per_ch = None
+        # Drifted threshold (mV) used instead of p.vth_mV when set: a float, or (B, 1) per frame
+        self.vth_live_mV = None
+        # Optional importance-sampling proposal for the input-noise draw
+        self.noise_bias = None
+        self.last_logw = 0.0
 
     def reset(self) -> None:
         self._last_out = None
@@ -41,22 +50,46 @@ class Comparator:
         else:
             self._offset_per_ch = np.asarray(offset_mV_vec, dtype=float)
 
-    def simulate(self, Vp: np.ndarray, Vm: np.ndarray, temp_C: float):
-        dv = (np.array(Vp) - np.array(Vm))*1e3  # mV
-        if self._offset_per_ch is not None and self._offset_per_ch.shape == dv.shape:
-            dv = dv - self._offset_per_ch
+    def _ensure_vth_offset(self) -> None:
         if self._vth_offset is None and self.p.vth_sigma_mV > 0.0:
             self._vth_offset = float(self.rng.normal(0.0, self.p.vth_sigma_mV))
         else:
             self._vth_offset = self._vth_offset or 0.0
-        if self._vth_per_ch is not None and self._vth_per_ch.shape[0] == dv.shape[0]:
+
+    def _vth_vector(self, dv: np.ndarray, temp_C: float) -> np.ndarray:
+        if self._vth_per_ch is not None and self._vth_per_ch.shape[0] == dv.shape[-1]:
             # Treat provided per-channel thresholds as absolute vth (mV)
-            vth_vec = self._vth_per_ch
-        else:
-            base_vth = self.p.vth_mV + (temp_C-25.0)*self.p.drift_mV_per_C + self._vth_offset
-            vth_vec = np.full_like(dv, base_vth, dtype=float)
+            return self._vth_per_ch
+        vth = self.p.vth_mV if self.vth_live_mV is None else self.vth_live_mV
+        base_vth = vth + (temp_C-25.0)*self.p.drift_mV_per_C + (self._vth_offset or 0.0)
+        return np.full_like(dv, base_vth, dtype=float)
+
+    def error_prob(self, dv_mV: np.ndarray, sigma_mV: np.ndarray, truth: np.ndarray, temp_C: float) -> np.ndarray:
+        """Gaussian probability of a wrong ternary decision, without drawing.
+
+        `dv_mV` is the noise-free comparator input (before per-channel offset)
+        and `sigma_mV` the total input-referred noise including this
+        comparator's own. Timing jitter flips and metastability are ignored.
+        """
+        dv = np.asarray(dv_mV, dtype=float)
+        if self._offset_per_ch is not None and self._offset_per_ch.shape == dv.shape[-1:]:
+            dv = dv - self._offset_per_ch
+        up_th = self._vth_vector(dv, temp_C) + 0.5*self.p.hysteresis_mV
+        s = np.maximum(np.asarray(sigma_mV, dtype=float), 1e-12)
+        truth = np.asarray(truth)
+        miss_hi = q_function((dv - up_th) / s)    # +1 falls below the upper threshold
+        miss_lo = q_function((-up_th - dv) / s)   # -1 rises above the lower threshold
+        zero_err = q_function((up_th - dv) / s) + q_function((dv + up_th) / s)
+        return np.where(truth > 0, miss_hi, np.where(truth < 0, miss_lo, zero_err))
+
+    def simulate(self, Vp: np.ndarray, Vm: np.ndarray, temp_C: float):
+        dv = (np.array(Vp) - np.array(Vm))*1e3  # mV
+        if self._offset_per_ch is not None and self._offset_per_ch.shape == dv.shape[-1:]:
+            dv = dv - self._offset_per_ch
+        self._ensure_vth_offset()
+        vth_vec = self._vth_vector(dv, temp_C)
         hyst = self.p.hysteresis_mV
-        noise = self.rng.normal(0.0, self.p.input_noise_mV_rms, size=dv.shape)
+        noise, self.last_logw = biased_normal(self.rng, self.p.input_noise_mV_rms, dv.shape, self.noise_bias)
         eff = dv + noise
         if self._last_out is None:
             self._last_out = np.zeros_like(eff)
@@ -85,5 +118,5 @@ class Comparator:
                 flip_mask = mask & flips
                 out = np.where(flip_mask, -np.sign(out), out)
         self._last_out = out
-        return out.astype(int)
+        return out.astype(np.int8)
 
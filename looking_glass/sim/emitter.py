@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 import numpy as np
+from .plan import PlanCache, Tracked
 
 @dataclass
-class EmitterParams:
+class EmitterParams(Tracked):
     wavelength_nm: float = 850.0
     channels: int = 16
     power_mw_per_ch: float = 1.0
@@ -18,10 +19,20 @@ class EmitterParams:
     wavelengths_nm: tuple[float, ...] | None = None
     channels_per_lambda: int | None = None
 
+@dataclass(frozen=True)
+class EmitterPlan:
+    """Per-channel base power and linear coefficients compiled from `EmitterParams`."""
+    base_vec: np.ndarray
+    ext: float
+    pushpull_alpha: float
+    rin_lin: float
+
+
 class EmitterArray:
     def __init__(self, params: EmitterParams, rng=None):
         self.p = params
         self.rng = np.random.default_rng() if rng is None else rng
+        self._plan = PlanCache(self._compile)
         # Fixed per-channel power scale (mismatch)
         sigma = max(self.p.power_sigma_pct, 0.0) / 100.0
         if self.p.channels > 0 and sigma > 0:
@@ -32,55 +43,108 @@ class EmitterArray:
         if self.p.wavelengths_nm:
             base_wls = np.array(self.p.wavelengths_nm, dtype=float)
             repeats = int(np.ceil(max(1, self.p.channels) / len(base_wls)))
-            self._channel_wavelengths = np.tile(base_wls, repeats)[:self.p.channels]
+            self._base_wavelengths = np.tile(base_wls, repeats)[:self.p.channels]
         else:
-            self._channel_wavelengths = np.full(self.p.channels, self.p.wavelength_nm) if self.p.channels > 0 else np.array([], dtype=float)
+            self._base_wavelengths = np.full(self.p.channels, self.p.wavelength_nm) if self.p.channels > 0 else np.array([], dtype=float)
+        # Current wavelengths: the base grid shifted by the drift at the last simulated temperature
+        self._channel_wavelengths = self._base_wavelengths
+        self._delta_lambda_nm = 0.0
+        # Rail table cache, see _rail_table
+        self._table = None
+        self._table_plan = None
+        self._table_temp = None
 
-    def simulate(self, ternary: np.ndarray, dt_ns: float, temp_C: float) -> tuple[np.ndarray, np.ndarray]:
-        ternary = np.asarray(ternary)
-        assert len(ternary) == self.p.channels
-        # Map ternary to two rails (W+ and W-)
-        base = self.p.power_mw_per_ch
-        if self._ch_scale is not None:
-            base_vec = np.full_like(ternary, base, dtype=float) * self._ch_scale
-        else:
-            base_vec = np.full_like(ternary, base, dtype=float)
-        temp_scale = 1.0 + (temp_C-25.0)*self.p.temp_coeff_pct_per_C/100.0
+    def _rail_table(self, plan: EmitterPlan, temp_C: float) -> np.ndarray:
+        """(2, 3, N) plus/minus rail powers for ternary -1, 0, +1 at `temp_C`.
+
+        Rebuilt only when the plan or the temperature changes.
+        """
+        if self._table is not None and self._table_plan is plan and self._table_temp == temp_C:
+            return self._table
+        table = self._levels(plan, temp_C)
+        table.flags.writeable = False
+        self._table, self._table_plan, self._table_temp = table, plan, temp_C
+        return table
+
+    def _levels(self, plan: EmitterPlan, temp_C) -> np.ndarray:
+        """(2, 3) + shape of `plan.base_vec * temp_scale` rail powers per ternary level."""
         # Regression: temperature scaling must be applied exactly once per rail (see
         # tests/test_emitter.py).
-        base_vec_temp = base_vec * temp_scale
+        temp_scale = 1.0 + (temp_C-25.0)*self.p.temp_coeff_pct_per_C/100.0
+        base_vec_temp = plan.base_vec * temp_scale
         if self.p.modulation_mode == "pushpull":
             # Constant total per channel; differential encodes sign
-            alpha = float(np.clip(self.p.pushpull_alpha, 0.0, 1.0))
-            total = base_vec_temp
-            half = 0.5 * total
-            add = 0.5 * alpha * total
-            Pp = np.where(ternary>0, half+add, np.where(ternary<0, half-add, half))
-            Pm = np.where(ternary>0, half-add, np.where(ternary<0, half+add, half))
+            half = 0.5 * base_vec_temp
+            add = 0.5 * plan.pushpull_alpha * base_vec_temp
+            table = np.stack([[half-add, half, half+add], [half+add, half, half-add]])
         else:
             # Extinction-based on/off per rail
-            ext = 10**(-self.p.extinction_db/10.0)
-            Pp = np.where(ternary>0, base_vec_temp, base_vec_temp*ext)
-            Pm = np.where(ternary<0, base_vec_temp, base_vec_temp*ext)
-        # Add RIN with a common-mode component per channel (correlated across rails)
+            off = base_vec_temp*plan.ext
+            table = np.stack([[off, off, base_vec_temp], [base_vec_temp, off, off]])
+        return table
+
+    def mean_rails(self, ternary: np.ndarray, temp_C: float) -> tuple[np.ndarray, np.ndarray]:
+        """Noise-free rail powers (mW) for a ternary (N,) vector or (B, N) batch.
+
+        `temp_C` is a float, or a (B, 1) column of per-frame temperatures.
+        """
+        ternary = np.asarray(ternary)
+        N = ternary.shape[-1]
+        if np.ndim(temp_C):
+            # Per-frame (2, 3, B, N) table, not cached
+            table = self._levels(self.plan(N), temp_C)
+            lvl = (np.sign(ternary).astype(np.intp) + 1)[None]
+            return np.take_along_axis(table[0], lvl, 0)[0], np.take_along_axis(table[1], lvl, 0)[0]
+        table = self._rail_table(self.plan(N), temp_C)
+        # One gather per rail from the flattened (level, channel) table
+        flat = (np.sign(ternary).astype(np.intp) + 1) * N + np.arange(N)
+        return table[0].ravel()[flat], table[1].ravel()[flat]
+
+    def plan(self, size: int) -> EmitterPlan:
+        """Compiled constants for `size` channels; recompiled after any param change."""
+        return self._plan.get((self.p,), int(size), id(self._ch_scale))
+
+    def _compile(self, size: int, _scale_id=None) -> EmitterPlan:
+        base_vec = np.full(size, self.p.power_mw_per_ch, dtype=float)
+        if self._ch_scale is not None:
+            base_vec = base_vec * self._ch_scale
+        return EmitterPlan(
+            base_vec=base_vec,
+            ext=10**(-self.p.extinction_db/10.0),
+            pushpull_alpha=float(np.clip(self.p.pushpull_alpha, 0.0, 1.0)),
+            rin_lin=max(0.0, 10**(self.p.rin_dbhz/10.0)),
+        )
+
+    def rin_sigma_rel(self, dt_ns):
+        """Relative RIN std over the integration window (common-mode part)."""
+        # dt_ns is a scalar or a (B, 1) column of per-frame windows
         bw_hz = 1.0/(dt_ns*1e-9 + 1e-18)
-        rin_lin = max(0.0, 10**(self.p.rin_dbhz/10.0))
-        sigma_rel = np.sqrt(max(bw_hz, 1.0) * rin_lin)
+        return np.sqrt(np.maximum(bw_hz, 1.0) * self.plan(self.p.channels).rin_lin)
+
+    def simulate(self, ternary: np.ndarray, dt_ns: float, temp_C: float) -> tuple[np.ndarray, np.ndarray]:
+        # ternary may be (N,) for one frame or (B, N) for a batch of frames
+        ternary = np.asarray(ternary)
+        assert ternary.shape[-1] == self.p.channels
+        Pp, Pm = self.mean_rails(ternary, temp_C)
+        # Add RIN with a common-mode component per channel (correlated across rails)
+        sigma_rel = self.rin_sigma_rel(dt_ns)
         # Common-mode multiplicative fluctuation per channel
         g = self.rng.normal(0.0, sigma_rel, size=Pp.shape)
         Pp = Pp * (1.0 + g)
         Pm = Pm * (1.0 + g)
         # Residual uncorrelated component (e.g., rail-specific speckle)
         resid = 0.3 * sigma_rel
-        if resid > 0:
+        if np.any(resid > 0):
             Pp = Pp + self.rng.normal(0.0, resid * np.maximum(Pp, 0.0))
             Pm = Pm + self.rng.normal(0.0, resid * np.maximum(Pm, 0.0))
         Pp = np.clip(Pp, 0.0, None)
         Pm = np.clip(Pm, 0.0, None)
         # Coherence/linewidth hook: expose phase diffusion scale (used by optics for partial coherence)
         self._coherence_time_s = 1.0 / max(1.0, float(self.p.linewidth_hz))
-        # Wavelength drift vs temperature (used by DWDM overlays); store effective drift
-        self._delta_lambda_nm = (temp_C - 25.0) * float(self.p.wav_drift_nm_per_C)
-        if self._channel_wavelengths.size:
-            self._channel_wavelengths = self._channel_wavelengths + self._delta_lambda_nm
+        # Wavelength drift vs temperature (used by DWDM overlays); store effective drift,
+        # a (B, 1) column (and (B, N) wavelengths) for per-frame batch temperatures
+        delta = (temp_C - 25.0) * float(self.p.wav_drift_nm_per_C)
+        if np.ndim(delta) or np.ndim(self._delta_lambda_nm) or delta != self._delta_lambda_nm:
+            self._delta_lambda_nm = delta
+            self._channel_wavelengths = self._base_wavelengths + delta
         return Pp, Pm
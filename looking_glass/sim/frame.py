@@ -0,0 +1,114 @@
+"""Full-frame camera readout of the tile grid.
+
+Channels sit row-major on a `side x side` tile layout (`side = ceil(sqrt(N))`)
+spanning a `grid_px x grid_px` sensor, as in sim/psf.py. Each channel's light
+is spread evenly over its tile aperture: the pixels whose centres lie at least
+`tile_border_px` inside the tile. The sensor reads a region of interest (ROI)
+with on-chip `binning x binning` charge binning. Each binned pixel belongs to
+the channel that covers most of its sub-pixels, and a channel's current is the
+sum over the binned pixels it owns. Channels with no pixels in the ROI read 0
+and are left out of the throughput.
+
+Frame timing: a row readout takes `line_time_us`, and only binned ROI rows are
+read. A global shutter overlaps exposure with the previous frame's readout,
+giving period = max(exposure, readout). With a rolling shutter the pattern
+must stay up until the last row has been exposed, so period = exposure +
+readout. `frame_overhead_us` is added and `max_fps` caps the rate. Throughput
+is the number of read channels per period.
+
+Long captures go to `open_stack`, a .npy memmap of (frames, 2, rows, cols)
+float32 rail images.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .psf import grid_side
+
+SHUTTERS = ("global", "rolling")
+
+
+@dataclass(frozen=True)
+class TileReadout:
+    shape: tuple          # (rows, cols) of the binned ROI image
+    idx: np.ndarray       # (P, b*b) channel of every sub-pixel of each binned pixel (0 if dark)
+    w: np.ndarray         # (P, b*b) share of that channel's power landing on the sub-pixel
+    lit: np.ndarray       # binned pixels owned by some channel, sorted by owner
+    starts: np.ndarray    # reduceat offsets into `lit`, one per read channel
+    read: np.ndarray      # channels with at least one binned pixel in the ROI
+    channels: int
+
+    def render(self, P: np.ndarray) -> np.ndarray:
+        """(..., N) channel powers -> (..., P) binned pixel powers."""
+        return np.einsum("...pk,pk->...p", P[..., self.idx], self.w)
+
+    def channel_sum(self, X: np.ndarray) -> np.ndarray:
+        """(..., P) pixel values -> (..., N) per-channel sums (0 for unread channels)."""
+        out = np.zeros(X.shape[:-1] + (self.channels,))
+        if self.lit.size:
+            out[..., self.read] = np.add.reduceat(X[..., self.lit], self.starts, axis=-1)
+        return out
+
+
+@lru_cache(maxsize=16)
+def tile_readout(channels: int, grid_px: int, border_px: float, roi: tuple = (), binning: int = 1) -> TileReadout:
+    """Pixel layout for `channels` tiles on a `grid_px` sensor (cached per geometry)."""
+    N, G, b = int(channels), int(grid_px), max(1, int(binning))
+    side = grid_side(N)
+    pitch = G / side
+    centre = np.arange(G) + 0.5
+    tile = np.minimum((centre // pitch).astype(np.intp), side - 1)
+    off = centre - tile * pitch
+    inside = (off >= border_px) & (off < pitch - border_px)
+    ch = tile[:, None] * side + tile[None, :]
+    chmap = np.where(inside[:, None] & inside[None, :] & (ch < N), ch, -1)
+    count = np.bincount(chmap[chmap >= 0], minlength=N)
+    if N and count.min() == 0:
+        raise ValueError(f"tile_border_px={border_px} leaves no pixel in some tiles at grid_px={G}")
+    r0, c0, h, w = (int(v) for v in roi) if roi else (0, 0, G, G)
+    sub = chmap[r0:r0 + h, c0:c0 + w]
+    rows, cols = sub.shape[0] // b, sub.shape[1] // b
+    sub = sub[:rows * b, :cols * b].reshape(rows, b, cols, b).transpose(0, 2, 1, 3).reshape(rows * cols, b * b)
+    idx = np.maximum(sub, 0)
+    wgt = np.where(sub >= 0, 1.0 / np.maximum(count[idx], 1), 0.0)
+    # Owner: the channel covering most sub-pixels of each binned pixel
+    votes = ((sub[:, :, None] == sub[:, None, :]) & (sub >= 0)[:, None, :]).sum(axis=-1)
+    owner = np.where(votes.max(axis=-1, initial=0) > 0, sub[np.arange(len(sub)), votes.argmax(axis=-1)], -1)
+    lit = np.flatnonzero(owner >= 0)
+    lit = lit[np.argsort(owner[lit], kind="stable")]
+    read, starts = np.unique(owner[lit], return_index=True)
+    for a in (idx, wgt, lit, starts, read):
+        a.flags.writeable = False
+    return TileReadout((rows, cols), idx, wgt, lit, starts, read, N)
+
+
+def frame_period_us(rows_read: int, exposure_us: float, shutter: str = "global", line_time_us: float = 10.0,
+                    overhead_us: float = 0.0, max_fps: float = 0.0) -> float:
+    """Readout-limited frame period (us) for one displayed pattern."""
+    if shutter not in SHUTTERS:
+        raise ValueError(f"unknown shutter {shutter!r}; expected one of {SHUTTERS}")
+    readout = rows_read * line_time_us
+    period = exposure_us + readout if shutter == "rolling" else max(exposure_us, readout)
+    period += overhead_us
+    if max_fps > 0.0:
+        period = max(period, 1e6 / max_fps)
+    return float(period)
+
+
+def sensor_tokens_per_s(cam_p, optics_p, channels: int, window_ns: float) -> float | None:
+    """Channels read per second by a frame-readout camera, or None without one."""
+    if cam_p is None or not getattr(cam_p, "frame_readout", False):
+        return None
+    lay = tile_readout(int(channels), int(optics_p.grid_px), float(optics_p.tile_border_px),
+                       tuple(cam_p.roi_px), int(cam_p.binning))
+    period = frame_period_us(lay.shape[0], window_ns * 1e-3, cam_p.shutter, cam_p.line_time_us,
+                             cam_p.frame_overhead_us, cam_p.max_fps)
+    return len(lay.read) / max(period * 1e-6, 1e-18)
+
+
+def open_stack(path, frames: int, shape: tuple) -> np.memmap:
+    """New (frames, 2, rows, cols) float32 .npy memmap for plus/minus rail images."""
+    return np.lib.format.open_memmap(str(path), mode="w+", dtype=np.float32, shape=(int(frames), 2) + tuple(shape))
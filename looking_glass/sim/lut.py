@@ -0,0 +1,90 @@
+"""Tabulated transfer curves for the memoryless optics nonlinearities.
+
+Each shaping core of the saturable absorber, the hard and post clips and the
+MZI is a function of one variable: the rail difference, or the bias-corrected
+difference for the MZI. `transfer_lut(kind, args, tol)` samples it on knots
+spaced evenly in asinh(x / scale), so they are dense where the curve bends. It
+doubles the knot count until linear interpolation is within `tol` (mW) at
+three probes per interval. The end knots sit where the curve has flattened to
+within `tol`, and `np.interp` holds the end values beyond them. The verified
+bound is stored as `max_err`.
+
+Tables are cached in memory per (kind, args, tol) and, with `path`, as .npz
+files named by a hash of that key, so later runs and other tools (e.g.
+scripts/pathb_characterize.py --stage-luts) load them instead of refitting.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+_MAX_KNOTS = 1 << 18
+
+
+def _sat_abs(sat: float, alpha: float):
+    return lambda d: d * (1.0 / (1.0 + (np.abs(d) / sat) ** alpha))
+
+
+def _tanh(sat: float, gain: float = 1.0, clip: float = 0.0):
+    if clip > 0.0:
+        return lambda d: gain * sat * np.tanh(np.clip(d / sat, -clip, clip))
+    return lambda d: sat * np.tanh(d / sat)
+
+
+CURVES = {"sat_abs": _sat_abs, "tanh": _tanh}
+
+
+class TransferLUT:
+    def __init__(self, x: np.ndarray, y: np.ndarray, max_err: float):
+        self.x = x
+        self.y = y
+        self.max_err = float(max_err)
+
+    def __call__(self, d: np.ndarray) -> np.ndarray:
+        return np.interp(d, self.x, self.y)
+
+    def curve(self) -> dict:
+        """JSON-ready knots for plotting."""
+        return {"x_mw": self.x.tolist(), "y_mw": self.y.tolist(), "max_err_mw": self.max_err}
+
+
+def _fit(f, scale: float, tol: float) -> TransferLUT:
+    # Extend the range until the held end values stay within tol of the curve far beyond it
+    reach = scale
+    far = np.array([2.0, 10.0, 1e2, 1e4])
+    while reach < scale * 1e12:
+        end = np.array([-reach, reach])
+        if np.all(np.abs(f(np.outer(end, far)) - f(end)[:, None]) <= tol):
+            break
+        reach *= 2.0
+    top = float(np.arcsinh(reach / scale))
+    n = 65
+    while True:
+        x = scale * np.sinh(np.linspace(-top, top, n))
+        y = f(x)
+        probe = (x[:-1, None] + np.diff(x)[:, None] * np.array([0.25, 0.5, 0.75])).ravel()
+        err = float(np.max(np.abs(np.interp(probe, x, y) - f(probe))))
+        if err <= tol or n >= _MAX_KNOTS:
+            break
+        n = 2 * n - 1
+    x.flags.writeable = y.flags.writeable = False
+    return TransferLUT(x, y, err)
+
+
+@lru_cache(maxsize=32)
+def transfer_lut(kind: str, args: tuple, tol: float = 1e-6, path: str = "") -> TransferLUT:
+    """Cached table for CURVES[kind](*args); the first arg is the curve's mW scale."""
+    key = f"{kind}{tuple(float(a) for a in args)}tol{tol:.3g}"
+    fname = Path(path) / f"lut_{hashlib.sha1(key.encode()).hexdigest()[:16]}.npz" if path else None
+    if fname is not None and fname.exists():
+        with np.load(fname) as z:
+            if str(z["key"]) == key:
+                return TransferLUT(z["x"], z["y"], float(z["max_err"]))
+    lut = _fit(CURVES[kind](*args), max(float(args[0]), 1e-9), float(tol))
+    if fname is not None:
+        fname.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(fname, key=key, x=lut.x, y=lut.y, max_err=lut.max_err)
+    return lut
@@ -0,0 +1,58 @@
+"""Exponential optical memory along the frame axis.
+
+`exp_memory` evaluates the first-order IIR y[t] = (1 - a) x[t] + a y[t-1] over
+a (T, N) block of consecutive frames, starting from the state y[-1] carried
+out of the previous block. It uses `scipy.signal.lfilter` when SciPy is
+installed. Otherwise narrow blocks (few channels, many frames) use a
+cumulative scan: inside blocks of ~30 time constants,
+y[t] = a^t (a y[-1] + (1 - a) cumsum(a^-j x[j])), where the block length keeps
+a^-j well inside float range. Wide blocks step frame by frame with in-place
+row operations, which beats NumPy's axis-0 cumsum there. Array poles (one per
+row and/or column, e.g. per-frame sample steps) always take the row loop.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+except ModuleNotFoundError:  # optional dependency
+    lfilter = None
+
+_SCAN_MAX_WIDTH = 64  # channels per frame up to which the scan beats the row loop
+
+
+def _scan(x: np.ndarray, a: float, y_prev: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    step = max(1, int(30.0 / -np.log(a)))
+    for s in range(0, len(x), step):
+        blk = x[s:s + step]
+        k = np.arange(len(blk)).reshape((-1,) + (1,) * (x.ndim - 1))
+        out[s:s + len(blk)] = a ** k * (a * y_prev + (1.0 - a) * np.cumsum(blk * a ** -k, axis=0))
+        y_prev = out[s + len(blk) - 1]
+    return out
+
+
+def _rows(x: np.ndarray, a, y_prev: np.ndarray) -> np.ndarray:
+    out = np.multiply(x, 1.0 - a)
+    a = np.broadcast_to(a, (len(x),) + np.shape(a)[1:])  # per-row poles
+    for t in range(len(x)):
+        out[t] += a[t] * y_prev
+        y_prev = out[t]
+    return out
+
+
+def exp_memory(x: np.ndarray, a: float, y_prev: np.ndarray, use_scipy: bool = True) -> np.ndarray:
+    """IIR memory with pole `a` in [0, 1) along axis 0 of `x`, from state `y_prev`.
+
+    `a` is a float, or an array with the ndim of `x` that broadcasts against it.
+    """
+    if np.ndim(a):
+        return _rows(x, np.asarray(a, dtype=float), np.asarray(y_prev, dtype=float))
+    if a <= 0.0:
+        return x.copy()
+    if use_scipy and lfilter is not None:
+        y, _ = lfilter([1.0 - a], [1.0, -a], x, axis=0, zi=(a * np.asarray(y_prev, dtype=float))[None])
+        return y
+    y_prev = np.asarray(y_prev, dtype=float)
+    return _scan(x, a, y_prev) if x[0].size <= _SCAN_MAX_WIDTH else _rows(x, a, y_prev)
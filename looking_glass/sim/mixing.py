@@ -0,0 +1,170 @@
+"""Mode-mixing operators for the optics reservoir stage.
+
+`build_mixer(spec, size)` compiles `OpticsParams.mode_mix` (or the legacy
+dense `mode_mix_matrix`) once per plan into an operator whose `apply(x)`
+mixes rails of shape (N,) or (B, N). Spec kinds (YAML dicts):
+
+  dense     {kind: dense, matrix: [[...]]}             O(N^2)
+  lowrank   {kind: lowrank, diag: 1.0, u: [[...]], v: [[...]]}
+            or {rank: r, strength: s, seed: k}          x*diag + (x @ v) @ u.T, O(N r)
+  banded    {kind: banded, offsets: [0, 1, -1], weights: [...], wrap: true}
+  sparse    {kind: sparse, rows: [...], cols: [...], vals: [...]}
+  fft       {kind: fft, depth: 2, seed: k}              random unitary, O(N log N)
+  hadamard  {kind: hadamard, depth: 2, seed: k}         random orthogonal, N = 2^m, O(N sqrt N)
+
+Linear kinds act on rail power like the dense matrix (output clipped at 0).
+The unitary kinds (fft, hadamard) model a coherent scatterer: they act on the
+field amplitude sqrt(P) with fixed random input phases or signs, and return
+|E|^2, so total power is conserved. Random structure comes from `seed`, not
+the simulation stream, so it is fixed hardware.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class DenseMix:
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        if x.ndim == 1:
+            return self.matrix @ x
+        return x @ self.matrix.T
+
+
+class LowRankMix:
+    """diag * I + U V^T."""
+
+    def __init__(self, diag: float, u: np.ndarray, v: np.ndarray):
+        self.diag = float(diag)
+        self.u = u
+        self.v = v
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        return self.diag * x + (x @ self.v) @ self.u.T
+
+
+class BandedMix:
+    """Sum of shifted copies: out[i] = sum_k w_k * x[i + offset_k]."""
+
+    def __init__(self, size: int, offsets, weights, wrap: bool):
+        idx = np.arange(size)
+        self.bands = []
+        for off, w in zip(offsets, weights):
+            src = idx + int(off)
+            if wrap:
+                self.bands.append((float(w), slice(None), src % size))
+            else:
+                ok = (src >= 0) & (src < size)
+                self.bands.append((float(w), np.flatnonzero(ok), src[ok]))
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        out = np.zeros_like(x)
+        for w, dst, src in self.bands:
+            out[..., dst] += w * x[..., src]
+        return out
+
+
+class SparseMix:
+    """COO matrix applied with a gather and a segmented sum per row."""
+
+    def __init__(self, size: int, rows, cols, vals):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        vals = np.asarray(vals, dtype=float)
+        if not (rows.shape == cols.shape == vals.shape):
+            raise ValueError("sparse mode_mix needs rows, cols and vals of equal length")
+        if rows.size and (min(rows.min(), cols.min()) < 0 or max(rows.max(), cols.max()) >= size):
+            raise ValueError(f"sparse mode_mix index out of range for {size} channels")
+        order = np.argsort(rows, kind="stable")
+        self.rows, self.cols, self.vals = rows[order], cols[order], vals[order]
+        self.out_rows, self.starts = np.unique(self.rows, return_index=True)
+        self.size = size
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        out = np.zeros(x.shape[:-1] + (self.size,))
+        if self.vals.size:
+            out[..., self.out_rows] = np.add.reduceat(x[..., self.cols] * self.vals, self.starts, axis=-1)
+        return out
+
+
+def _hadamard(n: int) -> np.ndarray:
+    """Orthonormal Sylvester-Hadamard matrix, n = 2^m."""
+    h = np.ones((1, 1))
+    while h.shape[0] < n:
+        h = np.block([[h, h], [h, -h]])
+    return h / np.sqrt(n)
+
+
+class UnitaryMix:
+    """depth x (random diagonal, then FFT or Hadamard) on the field amplitude."""
+
+    def __init__(self, size: int, kind: str, depth: int, seed: int):
+        if kind == "hadamard" and size & (size - 1):
+            raise ValueError(f"hadamard mode_mix needs a power-of-two channel count, got {size}")
+        rng = np.random.default_rng(seed)
+        self.kind = kind
+        if kind == "fft":
+            self.diags = [np.exp(2j * np.pi * rng.random(size)) for _ in range(max(1, depth))]
+        else:
+            self.diags = [rng.choice((-1.0, 1.0), size) for _ in range(max(1, depth))]
+            # H_n = H_n1 (x) H_n2: two small matmuls on the (n1, n2) view, O(N sqrt N) in BLAS
+            n1 = 1 << (size.bit_length() - 1) // 2
+            self.shape = (n1, size // n1)
+            self.h1, self.h2 = _hadamard(n1), _hadamard(size // n1)
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        field = np.sqrt(np.clip(x, 0.0, None))
+        if self.kind == "fft":
+            for d in self.diags:
+                field = np.fft.fft(field * d, norm="ortho")
+            return field.real ** 2 + field.imag ** 2
+        lead = field.shape[:-1]
+        for d in self.diags:
+            f = (field * d).reshape(lead + self.shape)
+            field = (self.h1 @ f @ self.h2).reshape(lead + (-1,))
+        return field * field
+
+
+def build_mixer(spec, size: int):
+    """Operator for `spec` (dict or legacy dense list) at `size` channels, or None.
+
+    A legacy list whose shape does not match `size` is ignored, as before.
+    """
+    if spec is None or size <= 0:
+        return None
+    if not isinstance(spec, dict):
+        mat = np.array(spec, dtype=float)
+        return DenseMix(mat) if mat.ndim == 2 and mat.shape == (size, size) else None
+    kind = str(spec.get("kind", "dense")).lower()
+    seed = int(spec.get("seed", 0))
+    if kind == "dense":
+        mat = np.array(spec["matrix"], dtype=float)
+        if mat.shape != (size, size):
+            raise ValueError(f"dense mode_mix is {mat.shape}, expected {(size, size)}")
+        return DenseMix(mat)
+    if kind == "lowrank":
+        if "u" in spec:
+            u = np.array(spec["u"], dtype=float)
+            v = np.array(spec.get("v", spec["u"]), dtype=float)
+        else:
+            rng = np.random.default_rng(seed)
+            r = int(spec.get("rank", 4))
+            u, v = rng.random((size, r)), rng.random((size, r))
+            # Scale so every output row of U V^T sums to `strength`
+            u *= float(spec.get("strength", 0.1)) / (u @ v.sum(axis=0))[:, None]
+        if u.shape[0] != size or v.shape != u.shape:
+            raise ValueError(f"lowrank mode_mix factors must both be ({size}, rank)")
+        return LowRankMix(spec.get("diag", 1.0), u, v)
+    if kind == "banded":
+        offsets = spec.get("offsets", [0])
+        weights = spec.get("weights", [1.0] * len(offsets))
+        if len(offsets) != len(weights):
+            raise ValueError("banded mode_mix needs one weight per offset")
+        return BandedMix(size, offsets, weights, bool(spec.get("wrap", True)))
+    if kind == "sparse":
+        return SparseMix(size, spec.get("rows", []), spec.get("cols", []), spec.get("vals", []))
+    if kind in ("fft", "hadamard"):
+        return UnitaryMix(size, kind, int(spec.get("depth", 2)), seed)
+    raise ValueError(f"unknown mode_mix kind {kind!r}")
@@ -0,0 +1,50 @@
+from dataclasses import dataclass, replace
+import numpy as np
+
+
+@dataclass
+class NoiseBias:
+    """Importance-sampling proposal for a block's Gaussian noise draw.
+
+    Draws come from N(shift_sigma * direction * sigma, (scale * sigma)^2)
+    instead of N(0, sigma^2). `direction` is +1/-1/0 per element (or a scalar).
+    """
+    shift_sigma: float = 0.0
+    scale: float = 1.0
+    direction: object = 1.0
+
+    def along(self, direction) -> "NoiseBias":
+        return replace(self, direction=direction)
+
+
+def biased_normal(rng, sigma, size, bias: NoiseBias | None):
+    """Zero-mean Gaussian noise, optionally drawn from a biased proposal.
+
+    Returns (noise, logw). Without bias the draw is exactly
+    `rng.normal(0.0, sigma, size)` and logw is 0.0. With bias, logw has shape
+    (2, *size): log p(x) - log q(x) for the proposal and for its mirror image
+    (direction negated), so callers can form two-sided mixture weights.
+    """
+    if bias is None:
+        return rng.normal(0.0, sigma, size=size), 0.0
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), size)
+    s = max(float(bias.scale), 1e-12)
+    m = float(bias.shift_sigma) * np.broadcast_to(np.asarray(bias.direction, dtype=float), size)
+    z = rng.normal(0.0, 1.0, size=size) * s + m
+    live = sigma > 0
+    base = np.log(s) - 0.5 * z * z
+    logw = np.stack([np.where(live, base + 0.5 * ((z - m) / s) ** 2, 0.0),
+                     np.where(live, base + 0.5 * ((z + m) / s) ** 2, 0.0)])
+    return z * sigma, logw
+
+
+def mixture_logw(logw, two_sided):
+    """Collapse (2, ...) log-weights to one per element.
+
+    Elements flagged `two_sided` were drawn from an equal mixture of the
+    proposal and its mirror, so their weight is p / (q/2 + q_mirror/2).
+    """
+    if np.ndim(logw) == 0:
+        return np.zeros(np.shape(two_sided)) + float(logw)
+    mix = np.log(2.0) - np.logaddexp(-logw[0], -logw[1])
+    return np.where(two_sided, mix, logw[0])
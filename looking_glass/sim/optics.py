@@ -1,14 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from typing import Callable
 import numpy as np
 import math
+from .plan import PlanCache, Tracked, roll_index
+from .mixing import build_mixer
+from .psf import grid_side, parse_psf, psf_convolve, psf_spectrum
+from .speckle import draw_fields, speckle_bank
+from .lut import transfer_lut
+from .wdm import wdm_grid, wdm_nonlinear
+from .memory import exp_memory
 
 @dataclass
-class OpticsParams:
+class OpticsParams(Tracked):
+    _live = frozenset({"transmittance"})  # drifts per frame; not compiled into plans
     transmittance: float = 0.7
     w_plus_contrast: float = 0.85
     w_minus_contrast: float = 0.84
     crosstalk_db: float = -35.0
-    ct_model: str = "global"  # "global" or "neighbor"
+    ct_model: str = "global"  # "global", "neighbor" or "psf" (2D psf_kernel on grid_px, see sim/psf.py)
     ct_neighbor_db: float = -30.0
     ct_diag_db: float = -35.0
     stray_floor_db: float = -38.0
@@ -27,6 +36,8 @@ class OpticsParams:
     speckle_on: bool = False
     speckle_sigma: float = 0.0
     speckle_corr_px: int = 7
+    speckle_bank_frames: int = 256  # pre-generated fields (see sim/speckle.py)
+    speckle_bank_path: str = ""     # directory for a memory-mapped .npy bank; "" keeps it in memory
     tile_border_px: int = 0
     tile_gain_sigma_pct: float = 0.0
     tile_isolation: bool = False
@@ -35,12 +46,14 @@ class OpticsParams:
     ins_loss_db_sigma: float = 0.0
     pdl_db: float = 0.0
     pdl_step_rad: float = 0.0
+    # Exponential memory over consecutive frames, plus random back-reflection (MPI) events per frame
     memory_tau_frames: float = 0.0
-    reflection_event_db: float = 0.0
+    reflection_event_db: float = 0.0  # return loss of an event; intensity beat 2*sqrt(10^(-dB/10))
     reflection_prob: float = 0.0
     speckle_time_on: bool = False
     speckle_time_sigma: float = 0.0
     speckle_time_tau_frames: int = 0
+    # WDM nonlinear crosstalk over the emitter wavelengths, referenced to soa_psat_mw (see sim/wdm.py)
     xgm_on: bool = False
     xgm_coeff: float = 0.0
     xpm_on: bool = False
@@ -52,12 +65,20 @@ class OpticsParams:
     voa_bits: int = 0
     soa_pattern_alpha: float = 0.0
     mode_mix_matrix: list | None = None
+    mode_mix: dict | None = None  # structured mixer spec (see sim/mixing.py); overrides mode_mix_matrix
     soa_on: bool = False
     soa_small_signal_gain_db: float = 0.0
     soa_psat_mw: float = 10.0
     soa_noise_figure_db: float = 6.0
     soa_tau_ns: float = 0.5
     soa_alpha: float = 4.0
+    soa_solver: str = "euler"  # gain ODE per window: "euler" (soa_substeps forward steps) or "exp" (exact)
+    soa_substeps: int = 1
+    soa_sequence: bool = False  # a batch is consecutive windows: SOA gain and pattern memory run through it
+    # Tabulated sat_abs / clip / MZI shaping (see sim/lut.py); path caches tables on disk
+    transfer_lut: bool = False
+    transfer_lut_tol_mw: float = 1e-6
+    transfer_lut_path: str = ""
     mzi_on: bool = False
     mzi_gain: float = 1.0
     mzi_sat_mw: float = 5.0
@@ -82,10 +103,113 @@ class OpticsParams:
     channels: int = 0
 
 
+def _frame_shape(arr):
+    """Draw size for one value per frame: a scalar for one frame, (B, 1) for a batch."""
+    shape = np.shape(arr)
+    return None if len(shape) <= 1 else tuple(shape[:-1]) + (1,)
+
+
+def soa_gain_step(G, total, dt_s, gain0, psat, tau_s, solver="euler", substeps=1):
+    """SOA gain after a window of constant input power `total` (mW), starting from `G`.
+
+    Integrates dG/dt = ((gain0 - G) - G * total / psat) / tau. "euler" takes
+    `substeps` forward-Euler steps; a single step is the legacy update, which
+    overshoots once dt approaches tau. "exp" is the closed form
+    G_ss + (G - G_ss) * exp(-(1 + total/psat) dt / tau), G_ss = gain0 / (1 + total/psat),
+    which is exact at any dt. Arrays broadcast, so `G` may hold one gain per
+    device of a batch.
+    """
+    if solver == "exp":
+        rate = 1.0 + total / psat
+        g_ss = gain0 / rate
+        return np.clip(g_ss + (G - g_ss) * np.exp(-rate * (dt_s / tau_s)), 1e-3, gain0)
+    h = dt_s / substeps
+    for _ in range(substeps):
+        G = np.clip(G + ((gain0 - G) - (G * total / psat)) * (h / tau_s), 1e-3, gain0)
+    return G
+
+
+def _last_frame(arr):
+    """State carried to the next call: a copy of the last frame of a batch.
+
+    Copied because later stages may update their input rails in place.
+    """
+    arr = np.asarray(arr)
+    return (arr[-1] if arr.ndim > 1 else arr).copy()
+
+
+@dataclass(frozen=True)
+class OpticsPlan:
+    """Linear coefficients and enabled stages compiled from `OpticsParams`."""
+    stages: tuple
+    stage_names: tuple = ()
+    extra: dict = field(default_factory=dict)  # coefficients of stages registered outside this module
+    mix: object = None  # operator from build_mixer
+    ct_bleed: float = 0.0
+    ct_diag_bleed: float = 0.0
+    ct_idx: tuple = ()
+    psf_spectrum: np.ndarray | None = None
+    psf_side: int = 0
+    psf_len: int = 0
+    speckle_bank: np.ndarray | None = None
+    speckle_sigma: float = 0.0
+    speckle_time_sigma: float = 0.0
+    speckle_rho: float = 0.0
+    voa_levels: int = 0
+    pattern_alpha: float = 0.0
+    amp_gain0: float = 1.0
+    amp_nf_lin: float = 1.0
+    amp_psat: float = 1.0
+    amp_tau_s: float = 1.0
+    amp_ase_sigma: float = 0.0
+    amp_atten: float = 1.0
+    soa_alpha: float = 0.0
+    soa_solver: str = "euler"
+    soa_substeps: int = 1
+    soa_sequence: bool = False
+    memory_a: float = 0.0
+    reflect_amp: float = 0.0
+    reflect_prob: float = 0.0
+    wdm_xgm: float = 0.0
+    wdm_xpm: float = 0.0
+    wdm_fwm: float = 0.0
+    wdm_ref_mw: float = 1.0
+    voa_post_scale: float = 1.0
+    lut_sat_abs: object = None  # TransferLUT tables replacing the analytic shaping cores
+    lut_hard_clip: object = None
+    lut_post_clip: object = None
+    lut_mzi: object = None
+    loss_lin: float = 1.0
+    stray: float = 0.0
+
+
 class Optics:
+    """Optical path between emitter and receiver.
+
+    `simulate` accepts (N,) rails for one frame or (B, N) rails for a batch of
+    frames. In every case the last row's state is carried out of the call.
+    Optical memory (`memory_tau_frames`) always treats the rows as
+    consecutive frames, and so do SOA gain and pattern memory with
+    `soa_sequence`: each row starts from the previous row's state. Without
+    `soa_sequence` those two, like MZI bias/servo and EOM hold, restart every
+    row from the state carried into the call, so the rows are exact only as
+    independent frames (see `has_frame_memory`).
+
+    Effects are the `OpticsStage` entries of `OPTICS_STAGES`, in order. Only
+    the enabled ones are compiled, together with their dB conversions and
+    operators, into an `OpticsPlan` that is rebuilt only when a field of
+    `self.p` is reassigned (see `PlanCache`). Stages own the rails they are
+    given and may update them in place; `simulate` copies its inputs first.
+    """
+    # Optional `wrap(name, fn)` applied to each compiled stage (see looking_glass.profiling)
+    stage_wrap = None
+
     def __init__(self, params: OpticsParams, rng=None):
         self.p = params
         self.rng = np.random.default_rng() if rng is None else rng
+        self._plan = PlanCache(self._compile)
+        # Drifted transmittance used instead of p.transmittance when set: a float, or (B, 1) per frame
+        self.transmittance_live = None
         self._soa_gain = None
         self._mzi_bias_state = None
         self._servo_bias = None
@@ -94,6 +218,45 @@ class Optics:
         self._pattern_prev_minus = None
         self._eom_hold_plus = None
         self._eom_hold_minus = None
+        self._speckle_static = None
+        self._speckle_g = None
+        self._wdm_grid = None
+        self._memory_plus = None
+        self._memory_minus = None
+
+    def has_frame_memory(self) -> bool:
+        """True if an enabled stage carries state between frames that a batch call does not follow.
+
+        With `soa_sequence`, SOA gain and pattern memory evolve through a batch
+        frame by frame, so a batch is exact for them.
+        """
+        amp_type = getattr(self.p, 'amp_type', 'soa').lower()
+        seq = bool(self.p.soa_sequence)
+        return bool((self.p.soa_on and amp_type != 'edfa' and not seq) or self.p.mzi_on
+                    or (float(self.p.soa_pattern_alpha) > 0.0 and not seq) or getattr(self.p, 'eom_gate_on', False))
+
+    def set_wavelengths(self, wavelengths_nm) -> None:
+        """Per-channel wavelengths (e.g. from the emitter) used by the WDM stage."""
+        wls = tuple(float(w) for w in np.ravel(wavelengths_nm)) if wavelengths_nm is not None else ()
+        self._wdm_grid = wdm_grid(wls) if wls else None
+
+    def plan(self, size: int) -> OpticsPlan:
+        """Compiled plan for `size` channels; recompiled after any param change."""
+        return self._plan.get((self.p,), int(size))
+
+    def _compile(self, size: int) -> OpticsPlan:
+        names, stages, kw, extra = [], [], {}, {}
+        for st in OPTICS_STAGES:
+            coeffs = st.build(self.p, size)
+            if coeffs is None:
+                continue
+            for key, val in coeffs.items():
+                (kw if key in _PLAN_FIELDS else extra)[key] = val
+            names.append(st.name)
+            stages.append(st.apply if self.stage_wrap is None else self.stage_wrap(st.name, st.apply))
+        kw["loss_lin"] = 10 ** (-float(self.p.ins_loss_db_mean) / 10.0)
+        kw["stray"] = 10 ** (self.p.stray_floor_db / 10.0)
+        return OpticsPlan(stages=tuple(stages), stage_names=tuple(names), extra=extra, **kw)
 
     def _ensure_state(self, size: int):
         if self.p.soa_on:
@@ -116,41 +279,37 @@ class Optics:
                 self._eom_hold_plus = np.zeros(size, dtype=float)
                 self._eom_hold_minus = np.zeros(size, dtype=float)
 
-    def _apply_soa(self, plus, minus, dt_ns):
-        amp_type = getattr(self.p, 'amp_type', 'soa').lower()
-        if amp_type == 'edfa':
-            gain_lin = 10 ** (self.p.soa_small_signal_gain_db / 10.0)
-            out_plus = plus * gain_lin
-            out_minus = minus * gain_lin
-            nf_lin = 10 ** (self.p.soa_noise_figure_db / 10.0)
-            ase_sigma = np.sqrt(np.maximum(gain_lin - 1.0, 0.0) * nf_lin) * 1e-3
-            if np.any(ase_sigma > 0):
-                out_plus += self.rng.normal(0.0, ase_sigma) * np.maximum(out_plus, 0.0)
-                out_minus += self.rng.normal(0.0, ase_sigma) * np.maximum(out_minus, 0.0)
-            bw_nm = max(getattr(self.p, 'obpf_bw_nm', 0.5), 0.01)
-            atten = np.exp(-0.2 / bw_nm)
-            out_plus = np.clip(out_plus * atten, 0.0, None)
-            out_minus = np.clip(out_minus * atten, 0.0, None)
-            return out_plus, out_minus
-        if not self.p.soa_on:
-            return plus, minus
-        dt_s = max(dt_ns * 1e-9, 1e-12)
-        gain0 = 10 ** (self.p.soa_small_signal_gain_db / 10.0)
-        psat = max(self.p.soa_psat_mw, 1e-9)
-        tau_s = max(self.p.soa_tau_ns, 1e-3) * 1e-9
+    def _apply_edfa(self, plus, minus, dt_ns, plan):
+        out_plus = plus * plan.amp_gain0
+        out_minus = minus * plan.amp_gain0
+        if plan.amp_ase_sigma > 0:
+            out_plus += self.rng.normal(0.0, plan.amp_ase_sigma, size=_frame_shape(plus)) * np.maximum(out_plus, 0.0)
+            out_minus += self.rng.normal(0.0, plan.amp_ase_sigma, size=_frame_shape(minus)) * np.maximum(out_minus, 0.0)
+        out_plus = np.clip(out_plus * plan.amp_atten, 0.0, None)
+        out_minus = np.clip(out_minus * plan.amp_atten, 0.0, None)
+        return out_plus, out_minus
+
+    def _apply_soa(self, plus, minus, dt_ns, plan):
+        dt_s = np.maximum(dt_ns * 1e-9, 1e-12)
         total = np.clip(plus + minus, 0.0, None)
-        G = self._soa_gain
-        dG = ((gain0 - G) - (G * total / psat)) * (dt_s / tau_s)
-        G = np.clip(G + dG, 1e-3, gain0)
-        self._soa_gain = G
+        args = (plan.amp_gain0, plan.amp_psat, plan.amp_tau_s, plan.soa_solver, plan.soa_substeps)
+        if plan.soa_sequence and total.ndim > 1:
+            # Consecutive windows: each frame starts from the previous frame's gain
+            G = np.empty_like(total)
+            g = self._soa_gain
+            dts = np.broadcast_to(dt_s, total.shape[:-1] + (1,))
+            for t in range(len(total)):
+                g = G[t] = soa_gain_step(g, total[t], dts[t], *args)
+        else:
+            G = soa_gain_step(self._soa_gain, total, dt_s, *args)
+        self._soa_gain = _last_frame(G)
         out_plus = plus * G
         out_minus = minus * G
-        nf_lin = 10 ** (self.p.soa_noise_figure_db / 10.0)
-        ase_sigma = np.sqrt(np.maximum(G - 1.0, 0.0) * nf_lin) * 1e-3
+        ase_sigma = np.sqrt(np.maximum(G - 1.0, 0.0) * plan.amp_nf_lin) * 1e-3
         if np.any(ase_sigma > 0):
             out_plus += self.rng.normal(0.0, ase_sigma) * np.maximum(out_plus, 0.0)
             out_minus += self.rng.normal(0.0, ase_sigma) * np.maximum(out_minus, 0.0)
-        alpha = float(self.p.soa_alpha)
+        alpha = plan.soa_alpha
         if alpha != 0.0:
             diff = out_plus - out_minus
             phase_term = alpha * diff * 1e-3
@@ -160,47 +319,47 @@ class Optics:
         out_minus = np.clip(out_minus, 0.0, None)
         return out_plus, out_minus
 
-    def _apply_sat_abs(self, plus, minus):
-        if not self.p.sat_abs_on:
-            return plus, minus
+    def _apply_sat_abs(self, plus, minus, dt_ns=None, plan=None):
         total = np.clip(plus + minus, 0.0, None)
         diff = plus - minus
         mean = 0.5 * total
         sat = max(self.p.sat_I_sat, 1e-9)
         alpha = max(self.p.sat_alpha, 1.0)
-        scale = 1.0 / (1.0 + (np.abs(diff) / sat) ** alpha)
-        diff_clamped = diff * scale
+        if plan is not None and plan.lut_sat_abs is not None:
+            diff_clamped = plan.lut_sat_abs(diff)
+        else:
+            diff_clamped = diff * (1.0 / (1.0 + (np.abs(diff) / sat) ** alpha))
         plus_out = np.clip(mean + 0.5 * diff_clamped, 0.0, None)
         minus_out = np.clip(mean - 0.5 * diff_clamped, 0.0, None)
         return plus_out, minus_out
 
-    def _apply_hard_clip(self, plus, minus):
-        if not self.p.hard_clip_on:
-            return plus, minus
+    def _apply_hard_clip(self, plus, minus, dt_ns=None, plan=None):
         total = np.clip(plus + minus, 1e-12, None)
         diff = plus - minus
         mean = 0.5 * total
         sat = max(self.p.hard_clip_sat_mw, 1e-6)
-        diff_clamped = sat * np.tanh(diff / sat)
+        if plan is not None and plan.lut_hard_clip is not None:
+            diff_clamped = plan.lut_hard_clip(diff)
+        else:
+            diff_clamped = sat * np.tanh(diff / sat)
         plus_out = np.clip(mean + 0.5 * diff_clamped, 0.0, None)
         minus_out = np.clip(mean - 0.5 * diff_clamped, 0.0, None)
         return plus_out, minus_out
 
-    def _apply_post_clip(self, plus, minus):
-        if not getattr(self.p, 'post_clip_on', False):
-            return plus, minus
+    def _apply_post_clip(self, plus, minus, dt_ns=None, plan=None):
         total = np.clip(plus + minus, 1e-12, None)
         diff = plus - minus
         mean = 0.5 * total
         sat = max(getattr(self.p, 'post_clip_sat_mw', 0.1), 1e-6)
-        diff_clamped = sat * np.tanh(diff / sat)
+        if plan is not None and plan.lut_post_clip is not None:
+            diff_clamped = plan.lut_post_clip(diff)
+        else:
+            diff_clamped = sat * np.tanh(diff / sat)
         plus_out = np.clip(mean + 0.5 * diff_clamped, 0.0, None)
         minus_out = np.clip(mean - 0.5 * diff_clamped, 0.0, None)
         return plus_out, minus_out
 
-    def _apply_mzi(self, plus, minus, dt_ns):
-        if not self.p.mzi_on:
-            return plus, minus
+    def _apply_mzi(self, plus, minus, dt_ns, plan=None):
         total = np.clip(plus + minus, 1e-12, None)
         diff = plus - minus
         bias_state = self._mzi_bias_state
@@ -212,34 +371,36 @@ class Optics:
         if leak > 0.0:
             bias_state *= (1.0 - leak)
         bias_state = np.clip(bias_state, -self.p.mzi_sat_mw, self.p.mzi_sat_mw)
-        self._mzi_bias_state = bias_state
+        self._mzi_bias_state = _last_frame(bias_state)
         servo_bias = self._servo_bias if self.p.servo_on else 0.0
         bias_total = bias_state + servo_bias
         sat = max(self.p.mzi_sat_mw, 1e-6)
         diff_eff = diff - bias_total
-        diff_norm = np.clip(diff_eff / sat, -10.0, 10.0)
-        diff_shaped = self.p.mzi_gain * sat * np.tanh(diff_norm)
+        if plan is not None and plan.lut_mzi is not None:
+            diff_shaped = plan.lut_mzi(diff_eff)
+        else:
+            diff_shaped = self.p.mzi_gain * sat * np.tanh(np.clip(diff_eff / sat, -10.0, 10.0))
         diff_out = np.clip(diff_shaped, -total, total)
         plus_out = 0.5 * (total + diff_out)
         minus_out = 0.5 * (total - diff_out)
         plus_out = np.clip(plus_out, 0.0, None)
         minus_out = np.clip(minus_out, 0.0, None)
         if self.p.servo_on:
-            dt_s = max(dt_ns * 1e-9, 1e-12)
+            dt_s = np.maximum(dt_ns * 1e-9, 1e-12)
             error = diff_out - self.p.servo_ref_mw
-            self._servo_integral = self._servo_integral + error * dt_s
+            integral = self._servo_integral + error * dt_s
             if self.p.servo_leak > 0.0:
-                self._servo_integral *= (1.0 - self.p.servo_leak)
-            bias_update = self.p.servo_kp * error + self.p.servo_ki * self._servo_integral
-            self._servo_bias = np.clip(self._servo_bias + bias_update, -self.p.servo_max_bias_mw, self.p.servo_max_bias_mw)
+                integral *= (1.0 - self.p.servo_leak)
+            bias_update = self.p.servo_kp * error + self.p.servo_ki * integral
+            self._servo_integral = _last_frame(integral)
+            self._servo_bias = _last_frame(np.clip(self._servo_bias + bias_update, -self.p.servo_max_bias_mw, self.p.servo_max_bias_mw))
         return plus_out, minus_out
-    def _apply_eom_gate(self, plus, minus, dt_ns):
-        if not getattr(self.p, 'eom_gate_on', False):
-            return plus, minus
-        size = len(plus)
-        if self._eom_hold_plus is None or len(self._eom_hold_plus) != size:
-            self._eom_hold_plus = np.zeros(size, dtype=float)
-            self._eom_hold_minus = np.zeros(size, dtype=float)
+
+    def _apply_eom_gate(self, plus, minus, dt_ns, plan=None):
+        size = plus.shape
+        if self._eom_hold_plus is None or len(self._eom_hold_plus) != size[-1]:
+            self._eom_hold_plus = np.zeros(size[-1], dtype=float)
+            self._eom_hold_minus = np.zeros(size[-1], dtype=float)
         duty = np.clip(getattr(self.p, 'eom_gate_duty', 0.3), 0.01, 1.0)
         jitter_ps = float(getattr(self.p, 'eom_gate_jitter_ps', 0.0))
         if jitter_ps > 0.0:
@@ -264,83 +425,348 @@ class Optics:
         if hold_noise > 0.0:
             hold_plus = hold_plus + self.rng.normal(0.0, hold_noise, size)
             hold_minus = hold_minus + self.rng.normal(0.0, hold_noise, size)
-        self._eom_hold_plus = np.clip(hold_plus, 0.0, None)
-        self._eom_hold_minus = np.clip(hold_minus, 0.0, None)
-        return self._eom_hold_plus, self._eom_hold_minus
-
-    def _apply_mode_mix(self, arr):
-        mat = self.p.mode_mix_matrix
-        if isinstance(mat, (list, tuple)):
-            mat = np.array(mat, dtype=float)
-            if mat.ndim == 2 and mat.shape == (len(arr), len(arr)):
-                return mat @ arr
-        return arr
-
-    def _apply_neighbor_ct(self, arr):
-        bleed = 10 ** (self.p.ct_neighbor_db / 10.0)
-        diag_bleed = 10 ** (self.p.ct_diag_db / 10.0)
-        shifted = np.roll(arr, 1) + np.roll(arr, -1)
-        arr = arr + bleed * shifted
-        diag = np.roll(np.roll(arr, 1), 1) + np.roll(np.roll(arr, 1), -1)
-        diag += np.roll(np.roll(arr, -1), 1) + np.roll(np.roll(arr, -1), -1)
-        arr = arr + diag_bleed * diag
-        return arr
-
-    def simulate(self, power_vec_plus, power_vec_minus, dt_ns):
+        hold_plus = np.clip(hold_plus, 0.0, None)
+        hold_minus = np.clip(hold_minus, 0.0, None)
+        self._eom_hold_plus = _last_frame(hold_plus)
+        self._eom_hold_minus = _last_frame(hold_minus)
+        return hold_plus, hold_minus
+
+    def _apply_mode_mix(self, plus, minus, dt_ns, plan):
+        plus, minus = plan.mix.apply(plus), plan.mix.apply(minus)
+        return np.clip(plus, 0.0, None), np.clip(minus, 0.0, None)
+
+    def _neighbor_ct(self, arr, plan):
+        # Index gathers reproduce the np.roll sums exactly (same operands, same order)
+        i1, j1, i2, j2 = plan.ct_idx
+        arr = arr + plan.ct_bleed * (arr[..., i1] + arr[..., j1])
+        diag = arr[..., i2] + arr
+        diag += arr + arr[..., j2]
+        return arr + plan.ct_diag_bleed * diag
+
+    def _apply_neighbor_ct(self, plus, minus, dt_ns, plan):
+        return self._neighbor_ct(plus, plan), self._neighbor_ct(minus, plan)
+
+    def _apply_psf_ct(self, plus, minus, dt_ns, plan):
+        both = psf_convolve(np.stack([plus, minus]), plan.psf_spectrum, plan.psf_side, plan.psf_len)
+        return both[0], both[1]
+
+    def _apply_global_ct(self, plus, minus, dt_ns, plan):
+        total = plus + minus
+        total *= plan.ct_bleed
+        plus += total
+        minus += total
+        return plus, minus
+
+    def _speckle_draw(self, plan, shape):
+        bank = plan.speckle_bank
+        return self.rng.integers(0, bank.shape[0] * bank.shape[1] * bank.shape[2], size=shape)
+
+    def _ensure_speckle(self, size: int) -> None:
+        """Draw the static speckle pattern (fixed diffuser) for `size` channels once."""
+        plan = self.plan(size)
+        if plan.speckle_sigma > 0.0 and (self._speckle_static is None or len(self._speckle_static) != size):
+            field = draw_fields(plan.speckle_bank, self._speckle_draw(plan, None), size)[0]
+            self._speckle_static = np.clip(1.0 + plan.speckle_sigma * field, 0.0, None)
+
+    def _apply_speckle(self, plus, minus, dt_ns, plan):
+        size = plus.shape[-1]
+        mult = 1.0
+        if plan.speckle_sigma > 0.0:
+            self._ensure_speckle(size)
+            mult = self._speckle_static
+        if plan.speckle_time_sigma > 0.0:
+            # AR(1) in time; a batch evolves frame by frame, as sequential calls would
+            w = draw_fields(plan.speckle_bank, self._speckle_draw(plan, _frame_shape(plus)), size)
+            rho, c = plan.speckle_rho, np.sqrt(1.0 - plan.speckle_rho ** 2)
+            g = self._speckle_g if self._speckle_g is not None and len(self._speckle_g) == size else None
+            for b in range(w.shape[0]):
+                g = w[b] if g is None else rho * g + c * w[b]
+                w[b] = g
+            self._speckle_g = g
+            tm = np.clip(1.0 + plan.speckle_time_sigma * w, 0.0, None)
+            mult = mult * (tm[0] if plus.ndim == 1 else tm)
+        plus *= mult
+        minus *= mult
+        return plus, minus
+
+    def _apply_memory(self, plus, minus, dt_ns, plan):
+        if plan.reflect_prob > 0.0:
+            # Event frames beat the signal with its double reflection at a random phase per channel
+            event = self.rng.random(size=_frame_shape(plus)) < plan.reflect_prob
+            beat = 1.0 + (plan.reflect_amp * event) * np.cos(2.0 * np.pi * self.rng.random(size=plus.shape))
+            plus = plus * beat
+            minus = minus * beat
+        if plan.memory_a > 0.0:
+            size = plus.shape[-1]
+            if self._memory_plus is None or len(self._memory_plus) != size:
+                # Start from steady state at the first frame
+                self._memory_plus = plus.reshape(-1, size)[0]
+                self._memory_minus = minus.reshape(-1, size)[0]
+            # Batch frames are consecutive; one frame is a block of one
+            frames_p, frames_m = plus.reshape(-1, size), minus.reshape(-1, size)
+            plus = exp_memory(frames_p, plan.memory_a, self._memory_plus).reshape(plus.shape)
+            minus = exp_memory(frames_m, plan.memory_a, self._memory_minus).reshape(minus.shape)
+            self._memory_plus = _last_frame(plus)
+            self._memory_minus = _last_frame(minus)
+        return plus, minus
+
+    def _apply_wdm(self, plus, minus, dt_ns, plan):
+        grid = self._wdm_grid
+        if grid is None or len(grid.slot) != plus.shape[-1]:
+            # No wavelength map for this width: one shared wavelength
+            grid = wdm_grid((0.0,) * plus.shape[-1])
+        return wdm_nonlinear(plus, minus, grid, plan.wdm_xgm, plan.wdm_xpm, plan.wdm_fwm, plan.wdm_ref_mw)
+
+    def _apply_voa(self, plus, minus, dt_ns, plan):
+        levels = plan.voa_levels
+        # Full-scale span is set per frame
+        span = np.maximum(np.maximum(plus.max(axis=-1, keepdims=True, initial=0.0),
+                                     minus.max(axis=-1, keepdims=True, initial=0.0)), 1e-12)
+        step = span / (levels - 1) if levels > 1 else span
+        return np.round(plus / step) * step, np.round(minus / step) * step
+
+    def _apply_pattern(self, plus, minus, dt_ns, plan):
+        alpha = plan.pattern_alpha
+        if plan.soa_sequence and plus.ndim > 1:
+            prev_p, prev_m = self._pattern_prev_plus, self._pattern_prev_minus
+            for t in range(len(plus)):
+                prev_p = plus[t] = (1 - alpha) * plus[t] + alpha * prev_p
+                prev_m = minus[t] = (1 - alpha) * minus[t] + alpha * prev_m
+        else:
+            plus = (1 - alpha) * plus + alpha * self._pattern_prev_plus
+            minus = (1 - alpha) * minus + alpha * self._pattern_prev_minus
+        self._pattern_prev_plus = _last_frame(plus)
+        self._pattern_prev_minus = _last_frame(minus)
+        return plus, minus
+
+    def _apply_voa_post(self, plus, minus, dt_ns, plan):
+        plus *= plan.voa_post_scale
+        minus *= plan.voa_post_scale
+        return plus, minus
+
+    def _transmittance(self, trans_scale):
+        t = self.p.transmittance if self.transmittance_live is None else self.transmittance_live
+        t = t * trans_scale
+        return float(t) if np.ndim(t) == 0 else t
+
+    def simulate(self, power_vec_plus, power_vec_minus, dt_ns, trans_scale: float = 1.0):
+        """Propagate rails through the enabled stages.
+
+        `trans_scale` multiplies `transmittance` for this call only (e.g. a
+        DWDM passband walk-off loss) without touching the params.
+        """
         plus = np.clip(np.asarray(power_vec_plus, dtype=float), 0.0, None)
         minus = np.clip(np.asarray(power_vec_minus, dtype=float), 0.0, None)
-        size = len(plus)
+        size = plus.shape[-1]
+        plan = self.plan(size)
         self._ensure_state(size)
-        if self.p.mode_mix_matrix:
-            plus = self._apply_mode_mix(plus)
-            minus = self._apply_mode_mix(minus)
-            plus = np.clip(plus, 0.0, None)
-            minus = np.clip(minus, 0.0, None)
-        if self.p.ct_model == "neighbor" and size > 0:
-            plus = self._apply_neighbor_ct(plus)
-            minus = self._apply_neighbor_ct(minus)
-        elif self.p.ct_model == "global" and size > 0:
-            bleed = 10 ** (self.p.crosstalk_db / 10.0)
-            total = plus + minus
-            plus = plus + bleed * total
-            minus = minus + bleed * total
-        if self.p.voa_bits > 0:
-            levels = max(2, 1 << int(self.p.voa_bits))
-            span = max(float(plus.max(initial=0.0)), float(minus.max(initial=0.0)), 1e-12)
-            step = span / (levels - 1) if levels > 1 else span
-            if step > 0:
-                plus = np.round(plus / step) * step
-                minus = np.round(minus / step) * step
-        if float(self.p.soa_pattern_alpha) > 0.0:
-            alpha = float(self.p.soa_pattern_alpha)
-            plus = (1 - alpha) * plus + alpha * self._pattern_prev_plus
-            minus = (1 - alpha) * minus + alpha * self._pattern_prev_minus
-            self._pattern_prev_plus = plus
-            self._pattern_prev_minus = minus
-        if self.p.soa_on or getattr(self.p, 'amp_type', 'soa').lower() == 'edfa':
-            plus, minus = self._apply_soa(plus, minus, dt_ns)
-        if self.p.sat_abs_on:
-            plus, minus = self._apply_sat_abs(plus, minus)
-        if self.p.hard_clip_on:
-            plus, minus = self._apply_hard_clip(plus, minus)
-        if self.p.mzi_on:
-            plus, minus = self._apply_mzi(plus, minus, dt_ns)
-        if getattr(self.p, 'post_clip_on', False):
-            plus, minus = self._apply_post_clip(plus, minus)
-        if getattr(self.p, 'voa_post_db', 0.0) != 0.0:
-            voa_scale = 10 ** (-self.p.voa_post_db / 10.0)
-            plus = plus * voa_scale
-            minus = minus * voa_scale
-        if getattr(self.p, 'eom_gate_on', False):
-            plus, minus = self._apply_eom_gate(plus, minus, dt_ns)
-        loss_db = float(self.p.ins_loss_db_mean)
+        for stage in plan.stages:
+            plus, minus = stage(self, plus, minus, dt_ns, plan)
         if float(self.p.ins_loss_db_sigma) > 0.0:
-            loss_db = self.rng.normal(loss_db, float(self.p.ins_loss_db_sigma))
-        trans_scale = float(self.p.transmittance) * 10 ** (-loss_db / 10.0)
-        plus = plus * trans_scale
-        minus = minus * trans_scale
-        stray = 10 ** (self.p.stray_floor_db / 10.0)
-        mean_total = np.mean(plus + minus)
-        plus += stray * mean_total
-        minus += stray * mean_total
-        return plus, minus, plus.tolist(), minus.tolist()
+            loss_db = self.rng.normal(float(self.p.ins_loss_db_mean), float(self.p.ins_loss_db_sigma),
+                                      size=_frame_shape(plus))
+            scale = self._transmittance(trans_scale) * 10 ** (-loss_db / 10.0)
+        else:
+            scale = self._transmittance(trans_scale) * plan.loss_lin
+        plus *= scale
+        minus *= scale
+        stray = np.mean(plus + minus, axis=-1, keepdims=True)
+        stray *= plan.stray
+        plus += stray
+        minus += stray
+        # Per-tile rails (row-major tiles) are the output rails themselves
+        return plus, minus, plus, minus
+
+
+@dataclass(frozen=True)
+class OpticsStage:
+    """One optics effect.
+
+    `build(params, size)` returns the stage's compiled coefficients as a dict
+    (keys naming `OpticsPlan` fields set them, others land in `plan.extra`),
+    or None when the stage is disabled. `apply(optics, plus, minus, dt_ns, plan)`
+    maps (N,) or (B, N) rails to new rails and may reuse its inputs.
+    """
+    name: str
+    build: Callable
+    apply: Callable
+
+
+def _build_mode_mix(p, size):
+    spec = p.mode_mix or (p.mode_mix_matrix if isinstance(p.mode_mix_matrix, (list, tuple)) else None)
+    mixer = build_mixer(spec or None, size)
+    return None if mixer is None else {"mix": mixer}
+
+
+def _build_neighbor_ct(p, size):
+    if p.ct_model != "neighbor" or size <= 0:
+        return None
+    return {"ct_bleed": 10 ** (p.ct_neighbor_db / 10.0), "ct_diag_bleed": 10 ** (p.ct_diag_db / 10.0),
+            "ct_idx": tuple(roll_index(size, k) for k in (1, -1, 2, -2))}
+
+
+def _build_psf_ct(p, size):
+    if p.ct_model != "psf" or size <= 0 or parse_psf(p.psf_kernel) is None:
+        return None
+    side = grid_side(size)
+    spectrum, n = psf_spectrum(str(p.psf_kernel), side, float(p.grid_px) / side, float(p.tile_border_px))
+    return {"psf_spectrum": spectrum, "psf_len": n, "psf_side": side}
+
+
+def _build_global_ct(p, size):
+    if p.ct_model != "global" or size <= 0:
+        return None
+    return {"ct_bleed": 10 ** (p.crosstalk_db / 10.0)}
+
+
+def _build_speckle(p, size):
+    static_on = bool(p.speckle_on) and float(p.speckle_sigma) > 0.0
+    time_on = bool(p.speckle_time_on) and float(p.speckle_time_sigma) > 0.0
+    if not (static_on or time_on) or size <= 0:
+        return None
+    side = grid_side(size)
+    pitch = float(p.grid_px) / side if p.grid_px > 0 else 1.0
+    tau = float(p.speckle_time_tau_frames)
+    return {
+        "speckle_bank": speckle_bank(side, float(p.speckle_corr_px) / pitch,
+                                     max(1, int(p.speckle_bank_frames)), str(p.speckle_bank_path or "")),
+        "speckle_sigma": float(p.speckle_sigma) if static_on else 0.0,
+        "speckle_time_sigma": float(p.speckle_time_sigma) if time_on else 0.0,
+        "speckle_rho": float(np.exp(-1.0 / tau)) if tau > 0 else 0.0,
+    }
+
+
+def _build_voa(p, size):
+    return {"voa_levels": max(2, 1 << int(p.voa_bits))} if p.voa_bits > 0 else None
+
+
+def _build_pattern(p, size):
+    alpha = float(p.soa_pattern_alpha)
+    return {"pattern_alpha": alpha, "soa_sequence": bool(p.soa_sequence)} if alpha > 0.0 else None
+
+
+def _build_edfa(p, size):
+    if getattr(p, 'amp_type', 'soa').lower() != 'edfa':
+        return None
+    gain_lin = 10 ** (p.soa_small_signal_gain_db / 10.0)
+    nf_lin = 10 ** (p.soa_noise_figure_db / 10.0)
+    return {"amp_gain0": gain_lin,
+            "amp_ase_sigma": np.sqrt(np.maximum(gain_lin - 1.0, 0.0) * nf_lin) * 1e-3,
+            "amp_atten": np.exp(-0.2 / max(getattr(p, 'obpf_bw_nm', 0.5), 0.01))}
+
+
+def _build_soa(p, size):
+    if getattr(p, 'amp_type', 'soa').lower() == 'edfa' or not p.soa_on:
+        return None
+    return {"amp_gain0": 10 ** (p.soa_small_signal_gain_db / 10.0),
+            "amp_nf_lin": 10 ** (p.soa_noise_figure_db / 10.0),
+            "amp_psat": max(p.soa_psat_mw, 1e-9),
+            "amp_tau_s": max(p.soa_tau_ns, 1e-3) * 1e-9,
+            "soa_alpha": float(p.soa_alpha),
+            "soa_solver": _soa_solver(p.soa_solver),
+            "soa_substeps": max(1, int(p.soa_substeps)),
+            "soa_sequence": bool(p.soa_sequence)}
+
+
+def _soa_solver(name) -> str:
+    solver = str(name or "euler").lower()
+    if solver not in ("euler", "exp"):
+        raise ValueError(f"unknown soa_solver {name!r}; expected 'euler' or 'exp'")
+    return solver
+
+
+def _build_memory(p, size):
+    tau = float(p.memory_tau_frames)
+    prob = float(p.reflection_prob) if p.reflection_event_db > 0.0 else 0.0
+    if tau <= 0.0 and prob <= 0.0:
+        return None
+    return {"memory_a": float(np.exp(-1.0 / tau)) if tau > 0.0 else 0.0,
+            "reflect_amp": 2.0 * np.sqrt(10 ** (-float(p.reflection_event_db) / 10.0)),
+            "reflect_prob": min(prob, 1.0)}
+
+
+def _build_wdm(p, size):
+    coeffs = {"wdm_xgm": float(p.xgm_coeff) if p.xgm_on else 0.0,
+              "wdm_xpm": float(p.xpm_coeff) if p.xpm_on else 0.0,
+              "wdm_fwm": float(p.fwm_coeff) if p.fwm_on else 0.0}
+    if size <= 0 or not any(v > 0.0 for v in coeffs.values()):
+        return None
+    return {**coeffs, "wdm_ref_mw": max(float(p.soa_psat_mw), 1e-9)}
+
+
+def _build_voa_post(p, size):
+    db = getattr(p, 'voa_post_db', 0.0)
+    return {"voa_post_scale": 10 ** (-db / 10.0)} if db != 0.0 else None
+
+
+def _lut(p, kind: str, *args):
+    """Transfer table for one shaping core, or None when `transfer_lut` is off."""
+    if not p.transfer_lut:
+        return None
+    return transfer_lut(kind, tuple(float(a) for a in args), float(p.transfer_lut_tol_mw), str(p.transfer_lut_path or ""))
+
+
+def _build_sat_abs(p, size):
+    if not p.sat_abs_on:
+        return None
+    return {"lut_sat_abs": _lut(p, "sat_abs", max(p.sat_I_sat, 1e-9), max(p.sat_alpha, 1.0))}
+
+
+def _build_hard_clip(p, size):
+    return {"lut_hard_clip": _lut(p, "tanh", max(p.hard_clip_sat_mw, 1e-6))} if p.hard_clip_on else None
+
+
+def _build_post_clip(p, size):
+    if not getattr(p, 'post_clip_on', False):
+        return None
+    return {"lut_post_clip": _lut(p, "tanh", max(getattr(p, 'post_clip_sat_mw', 0.1), 1e-6))}
+
+
+def _build_mzi(p, size):
+    return {"lut_mzi": _lut(p, "tanh", max(p.mzi_sat_mw, 1e-6), p.mzi_gain, 10.0)} if p.mzi_on else None
+
+
+def _when(flag: str):
+    """Build for a coefficient-free stage switched by a boolean param."""
+    return lambda p, size: {} if getattr(p, flag, False) else None
+
+
+_PLAN_FIELDS = frozenset(f.name for f in fields(OpticsPlan))
+
+# Execution order; insertion loss, transmittance and the stray floor always follow in `simulate`
+OPTICS_STAGES = [
+    OpticsStage("mode_mix", _build_mode_mix, Optics._apply_mode_mix),
+    OpticsStage("neighbor_ct", _build_neighbor_ct, Optics._apply_neighbor_ct),
+    OpticsStage("psf_ct", _build_psf_ct, Optics._apply_psf_ct),
+    OpticsStage("global_ct", _build_global_ct, Optics._apply_global_ct),
+    OpticsStage("speckle", _build_speckle, Optics._apply_speckle),
+    OpticsStage("voa", _build_voa, Optics._apply_voa),
+    OpticsStage("pattern", _build_pattern, Optics._apply_pattern),
+    OpticsStage("memory", _build_memory, Optics._apply_memory),
+    OpticsStage("edfa", _build_edfa, Optics._apply_edfa),
+    OpticsStage("soa", _build_soa, Optics._apply_soa),
+    OpticsStage("wdm", _build_wdm, Optics._apply_wdm),
+    OpticsStage("sat_abs", _build_sat_abs, Optics._apply_sat_abs),
+    OpticsStage("hard_clip", _build_hard_clip, Optics._apply_hard_clip),
+    OpticsStage("mzi", _build_mzi, Optics._apply_mzi),
+    OpticsStage("post_clip", _build_post_clip, Optics._apply_post_clip),
+    OpticsStage("voa_post", _build_voa_post, Optics._apply_voa_post),
+    OpticsStage("eom_gate", _when("eom_gate_on"), Optics._apply_eom_gate),
+]
+
+
+def register_optics_stage(stage: OpticsStage, before: str | None = None, after: str | None = None) -> None:
+    """Add `stage` to `OPTICS_STAGES` (replacing one of the same name), by default last.
+
+    Plans already compiled keep their stage list; call `optics._plan.invalidate()`
+    on live blocks to pick the change up.
+    """
+    OPTICS_STAGES[:] = [st for st in OPTICS_STAGES if st.name != stage.name]
+    anchor = before or after
+    if anchor is None:
+        OPTICS_STAGES.append(stage)
+        return
+    names = [st.name for st in OPTICS_STAGES]
+    if anchor not in names:
+        raise ValueError(f"unknown optics stage {anchor!r}")
+    OPTICS_STAGES.insert(names.index(anchor) + (0 if before else 1), stage)
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class Tracked:
+    """Base for params dataclasses whose blocks compile a plan.
+
+    Every attribute assignment bumps a per-instance version, so `PlanCache`
+    notices parameter changes (sweeps, tuner edits) in O(1). Fields listed in
+    `_live` are read directly at simulate time and never compiled, so
+    per-frame drift of them (transmittance, thresholds) skips the bump. The
+    counter lives in a slot, keeping `__dict__` (dumped to JSON, used to clone
+    params) limited to the dataclass fields.
+    """
+    __slots__ = ("_version",)
+    _live = frozenset()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in self._live:
+            object.__setattr__(self, "_version", getattr(self, "_version", 0) + 1)
+
+
+class PlanCache:
+    """Frozen per-block constants, rebuilt when the watched params change.
+
+    `get(params, *extra)` returns `compile_fn(*extra)`, recompiling only if a
+    params object was swapped or had a field assigned, or `extra` (e.g.
+    channel count) differs. Mutating a container field in place (e.g. editing
+    `mode_mix_matrix` rows) is not detected; assign a new object or call
+    `invalidate()`.
+    """
+
+    def __init__(self, compile_fn):
+        self._compile = compile_fn
+        self._key = None
+        self._plan = None
+        self.compiles = 0
+
+    def invalidate(self) -> None:
+        self._key = None
+
+    def get(self, params: tuple, *extra):
+        key = [extra]
+        for p in params:
+            key.append(id(p))
+            key.append(getattr(p, "_version", 0))
+        if key != self._key:
+            self._plan = self._compile(*extra)
+            self._key = key
+            self.compiles += 1
+        return self._plan
+
+
+def roll_index(n: int, shift: int) -> np.ndarray:
+    """Gather index equivalent to `np.roll(arr, shift, axis=-1)` for length n."""
+    return (np.arange(n) - shift) % max(n, 1)
@@ -0,0 +1,120 @@
+"""2D point-spread-function crosstalk on the tile grid.
+
+Channels sit row-major on a `side x side` tile layout (`side = ceil(sqrt(N))`)
+spanning `grid_px` pixels. Each channel is a point source at its tile centre
+and each receiver integrates the PSF over its tile aperture, the pitch minus
+`tile_border_px` on every edge. The coupling from a tile to one `(dy, dx)`
+tiles away, relative to the light kept in its own aperture, forms a
+`(2*side-1)^2` kernel. Crosstalk is the linear 2D convolution of the tile
+image with that kernel (offsets coupling below -90 dB are dropped). It is done
+as an FFT product with the kernel spectrum cached per (grid, kernel) key, so
+every frame, batch and optics block with the same layout reuses it.
+
+Kernels (`OpticsParams.psf_kernel`):
+  "lorentzian:w=2.5"  isotropic 2D Cauchy, density ~ w / (r^2 + w^2)^(3/2) (px)
+  "gaussian:sigma=1"  isotropic Gaussian (px)
+  "none"              no PSF crosstalk
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+import math
+
+import numpy as np
+
+_KINDS = {"lorentzian": "w", "gaussian": "sigma"}
+_TRUNC = 1e-9  # couplings below this (-90 dB) are dropped from the kernel
+
+
+def parse_psf(spec) -> tuple | None:
+    """`"kind:key=value"` -> (kind, width_px), or None for "none"/empty."""
+    text = str(spec or "").strip().lower()
+    if text in ("", "none", "off"):
+        return None
+    kind, _, args = text.partition(":")
+    if kind not in _KINDS:
+        raise ValueError(f"unknown psf_kernel {spec!r}; expected one of {sorted(_KINDS)} or 'none'")
+    opts = dict(kv.split("=", 1) for kv in args.replace(",", ";").split(";") if "=" in kv)
+    width = float(opts.get(_KINDS[kind], opts.get("w", 1.0)))
+    if width <= 0.0:
+        raise ValueError(f"psf_kernel width must be > 0, got {spec!r}")
+    return kind, width
+
+
+def grid_side(channels: int) -> int:
+    return max(1, math.isqrt(max(int(channels), 1) - 1) + 1)
+
+
+def _cauchy_cdf(width: float, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Fraction of 2D Cauchy PSF energy in the quadrant (-inf, x] x (-inf, y]."""
+    x = x / width
+    y = y / width
+    return 0.25 + (np.arctan(x) + np.arctan(y) + np.arctan(x * y / np.sqrt(1.0 + x * x + y * y))) / (2.0 * np.pi)
+
+
+def coupling_kernel(kind: str, width: float, side: int, pitch_px: float, border_px: float) -> np.ndarray:
+    """(2*side-1, 2*side-1) tile coupling, centre (own tile) normalized to 1."""
+    half = 0.5 * pitch_px - border_px
+    if half <= 0.0:
+        raise ValueError(f"tile_border_px={border_px} leaves no aperture at pitch {pitch_px:.3g} px")
+    off = np.arange(-(side - 1), side) * pitch_px
+    lo, hi = off - half, off + half
+    if kind == "gaussian":
+        # Separable: product of 1D aperture integrals
+        erf = np.vectorize(math.erf, otypes=[float])
+        s = width * math.sqrt(2.0)
+        edge = 0.5 * (erf(hi / s) - erf(lo / s))
+        k = np.outer(edge, edge)
+    else:
+        y1, x1 = lo[:, None], lo[None, :]
+        y2, x2 = hi[:, None], hi[None, :]
+        k = _cauchy_cdf(width, x2, y2) - _cauchy_cdf(width, x1, y2) - _cauchy_cdf(width, x2, y1) + _cauchy_cdf(width, x1, y1)
+    k = np.clip(k, 0.0, None)
+    return k / k[side - 1, side - 1]
+
+
+def _fast_len(n: int) -> int:
+    """Smallest 2^a 3^b 5^c >= n (cheap FFT length)."""
+    best = 1 << max(0, (n - 1).bit_length())
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            m = p35
+            while m < n:
+                m *= 2
+            best = min(best, m)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+@lru_cache(maxsize=32)
+def psf_spectrum(spec: str, side: int, pitch_px: float, border_px: float) -> tuple[np.ndarray, int]:
+    """Cached (rfft2 of the wrapped coupling kernel, FFT length) for one layout."""
+    kind, width = parse_psf(spec)
+    k = coupling_kernel(kind, width, side, pitch_px, border_px)
+    # Drop offsets whose whole row/column couples below _TRUNC, shrinking the FFT
+    keep = np.flatnonzero(np.maximum(k.max(axis=0), k.max(axis=1)) >= _TRUNC)
+    reach = int(np.max(np.abs(keep - (side - 1))))
+    k = k[side - 1 - reach:side + reach, side - 1 - reach:side + reach]
+    n = _fast_len(side + reach)
+    wrapped = np.zeros((n, n))
+    # Offset (dy, dx) lands at index (dy mod n, dx mod n): circular == linear for n >= side + reach
+    idx = np.arange(-reach, reach + 1) % n
+    wrapped[np.ix_(idx, idx)] = k
+    spec_f = np.fft.rfft2(wrapped)
+    spec_f.flags.writeable = False
+    return spec_f, n
+
+
+def psf_convolve(rails: np.ndarray, spectrum: np.ndarray, side: int, n: int) -> np.ndarray:
+    """Apply the coupling kernel to `rails` (..., N) laid out on the tile grid."""
+    N = rails.shape[-1]
+    lead = rails.shape[:-1]
+    img = np.zeros(lead + (side * side,))
+    img[..., :N] = rails
+    img = img.reshape(lead + (side, side))
+    out = np.fft.irfft2(np.fft.rfft2(img, s=(n, n)) * spectrum, s=(n, n))
+    out = out[..., :side, :side].reshape(lead + (side * side,))[..., :N]
+    return np.clip(out, 0.0, None)
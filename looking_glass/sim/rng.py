@@ -0,0 +1,151 @@
+"""Counter-based per-module random streams.
+
+With `SystemParams.rng_streams` every block draws from its own
+`CounterStream` instead of the shared `Generator`. A stream is a Philox
+generator keyed by (seed, module). Each draw call is positioned at counter
+(trial, call), where `call` counts that module's draws since the frame began.
+A frame's noise therefore depends only on the seed, the module, the trial
+index and the module's own draw order. It does not depend on batch size,
+shard layout, or which features other modules have enabled, and any trial can
+be recomputed by seeking to it.
+
+Draws made outside a frame (per-device mismatch: emitter power spread, PRNU,
+TIA gain, comparator offset) come from a separate static block of the same
+stream.
+"""
+from __future__ import annotations
+
+import math
+import zlib
+
+import numpy as np
+
+MODULES = ("input", "clock", "thermal", "emitter", "optics", "pd", "camera", "tia", "comparator", "jitter")
+
+_STATIC = 1  # counter word 3: 0 = per-trial blocks, 1 = static mismatch
+
+
+def stream_key(seed, module: str) -> np.ndarray:
+    """Philox key for `module` under `seed` (int or SeedSequence)."""
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(int(seed))
+    child = np.random.SeedSequence(ss.entropy, spawn_key=tuple(ss.spawn_key) + (zlib.crc32(module.encode()),))
+    return child.generate_state(2, dtype=np.uint64)
+
+
+class CounterStream:
+    """Generator-like draws (`normal`, `random`, `integers`, `poisson`).
+
+    `begin(trial, count)` starts one frame (`count=None`) or a batch of
+    `count` consecutive trials. Draw call k of a frame reads uniforms from
+    Philox counter block (trial * stride, k). The stride is fixed by the
+    per-frame draw size, so a batch reads one contiguous span and row b equals
+    the single-frame draw for trial + b. Normals use Box-Muller (two uniforms
+    per pair) and integers a scaled uniform, so each value consumes a fixed
+    number of uniforms. Poisson draws consume a data-dependent number of
+    words, so they are made frame by frame from a generator positioned at
+    (0, call, trial): counter word 2 keys the trial, and no draw can run into
+    another trial's block.
+    """
+
+    def __init__(self, seed, module: str):
+        self.module = module
+        self._bg = np.random.Philox(key=stream_key(seed, module))
+        self._gen = np.random.Generator(self._bg)
+        self._state = self._bg.state
+        self._trial = None
+        self._count = None
+        self._call = 0
+        self._static_call = 0
+
+    def rekey(self, seed) -> None:
+        self._state["state"]["key"] = stream_key(seed, self.module)
+        self._static_call = 0
+
+    def begin(self, trial: int, count: int | None = None) -> None:
+        self._trial = int(trial)
+        self._count = None if count is None else int(count)
+        self._call = 0
+
+    def end(self) -> None:
+        """Return to the static block; the orchestrator calls this after every frame or batch."""
+        self._trial = None
+
+    def _seek(self, block: int, call: int, word3: int, lane: int = 0) -> np.random.Generator:
+        ctr = self._state["state"]["counter"]
+        ctr[0] = block
+        ctr[1] = call
+        ctr[2] = lane
+        ctr[3] = word3
+        self._bg.state = self._state
+        return self._gen
+
+    def _layout(self, shape: tuple):
+        """(rows, frame_shape, first trial, call, word3) for the next draw call."""
+        if self._trial is None:
+            call, self._static_call = self._static_call, self._static_call + 1
+            return 1, shape, 0, call, _STATIC
+        call, self._call = self._call, self._call + 1
+        if self._count is not None and len(shape) > 0 and shape[0] == self._count:
+            return self._count, shape[1:], self._trial, call, 0
+        # One frame, or a draw that is not frame-shaped (taken from the first trial)
+        return 1, shape, self._trial, call, 0
+
+    def _uniform_rows(self, shape: tuple, per: int):
+        """Doubles in [0, 1): (rows, per) for the next draw call, plus the frame shape."""
+        rows, frame_shape, t0, call, word3 = self._layout(shape)
+        stride = max(4, -(-per // 4) * 4)
+        g = self._seek(t0 * (stride // 4), call, word3)
+        if rows == 1:
+            return g.random(per)[None, :], frame_shape
+        return g.random(rows * stride).reshape(rows, stride)[:, :per], frame_shape
+
+    def random(self, size=None):
+        shape = _shape(size)
+        n = math.prod(shape[1:] if self._batched(shape) else shape)
+        u, _ = self._uniform_rows(shape, n)
+        return _out(u, shape)
+
+    def standard_normal(self, size=None):
+        shape = _shape(size)
+        n = math.prod(shape[1:] if self._batched(shape) else shape)
+        m = (n + 1) // 2
+        u, _ = self._uniform_rows(shape, 2 * m)
+        r = np.sqrt(-2.0 * np.log1p(-u[:, :m]))
+        phi = 2.0 * np.pi * u[:, m:]
+        z = np.concatenate([r * np.cos(phi), r * np.sin(phi)], axis=1)[:, :n]
+        return _out(z, shape)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        if np.any(np.asarray(scale) < 0):
+            raise ValueError("scale < 0")
+        shape = _shape(size) if size is not None else np.broadcast(loc, scale).shape
+        return loc + scale * self.standard_normal(shape)
+
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        u = self.random(size)
+        return (low + np.floor(u * (high - low))).astype(np.int64)
+
+    def poisson(self, lam=1.0, size=None):
+        shape = _shape(size) if size is not None else np.shape(lam)
+        lam = np.broadcast_to(lam, shape)
+        rows, frame_shape, t0, call, word3 = self._layout(shape)
+        if rows == 1:
+            return self._seek(0, call, word3, t0).poisson(lam, shape or None)
+        return np.stack([self._seek(0, call, word3, t0 + b).poisson(lam[b], frame_shape or None)
+                         for b in range(rows)])
+
+    def _batched(self, shape: tuple) -> bool:
+        return self._trial is not None and self._count is not None and len(shape) > 0 and shape[0] == self._count
+
+
+def _shape(size) -> tuple:
+    if size is None:
+        return ()
+    return tuple(int(v) for v in np.atleast_1d(size))
+
+
+def _out(rows: np.ndarray, shape: tuple):
+    out = rows.reshape(shape)
+    return float(out) if shape == () else out
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import numpy as np
+from .noise import biased_normal
 
 q = 1.602176634e-19
 
@@ -13,6 +14,9 @@ class Photodiode:
     def __init__(self, params: PDParams, rng=None):
         self.p = params
         self.rng = np.random.default_rng() if rng is None else rng
+        # Optional importance-sampling proposal for the shot-noise draw
+        self.noise_bias = None
+        self.last_logw = 0.0
 
     def simulate(self, optical_mw, dt_ns: float):
         W = np.clip(np.array(optical_mw)*1e-3, 0.0, None)
@@ -21,5 +25,12 @@ class Photodiode:
         B = 1.0/(dt_ns*1e-9 + 1e-18)
         I_total = I_sig + I_dark
         sigma = np.sqrt(2*q*np.clip(I_total,0,None)*B + 1e-24)
-        noise = self.rng.normal(0.0, sigma, size=I_total.shape)
+        noise, self.last_logw = biased_normal(self.rng, sigma, I_total.shape, self.noise_bias)
         return I_total + noise
+
+    def moments(self, optical_mw, dt_ns: float):
+        """Mean photocurrent (A) and shot-noise variance (A^2) without drawing."""
+        W = np.clip(np.array(optical_mw)*1e-3, 0.0, None)
+        I_total = self.p.responsivity_A_per_W * W + self.p.dark_current_nA * 1e-9
+        B = 1.0/(dt_ns*1e-9 + 1e-18)
+        return I_total, 2*q*np.clip(I_total,0,None)*B + 1e-24
@@ -0,0 +1,77 @@
+"""Correlated multiplicative speckle on the tile grid.
+
+A bank holds `frames` unit-variance Gaussian fields on the `side x side` tile
+grid, made by FFT-filtering white noise with a Gaussian kernel so that the
+field correlation has width `corr_tiles` (`speckle_corr_px` over the tile
+pitch). The filter is circular, so every cyclic shift of a bank field is an
+equally valid field. Each frame therefore picks one (field, shift) pair with a
+single integer draw, and no FFT runs per frame.
+
+The bank is generated once per (side, corr, frames) from a fixed seed and
+cached in memory. With `path` it is also stored as .npy and memory-mapped, so
+large grids and later runs reuse it from disk. The per-frame choice comes from
+the simulation stream, so the bank content itself carries no run-to-run
+randomness.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+import zlib
+
+import numpy as np
+
+_BLOCK = 64  # fields per FFT batch while building a bank
+
+
+def _filter(side: int, corr_tiles: float) -> np.ndarray:
+    """rfft2-domain Gaussian filter scaled so filtered white noise has unit variance."""
+    f = np.fft.fftfreq(side)
+    # Kernel std corr/sqrt(2) gives a Gaussian field correlation of std corr
+    s2 = 0.5 * corr_tiles * corr_tiles
+    full = np.exp(-2.0 * np.pi ** 2 * s2 * (f[:, None] ** 2 + f[None, :] ** 2))
+    return full[:, :side // 2 + 1] / np.sqrt(np.mean(full * full))
+
+
+@lru_cache(maxsize=8)
+def speckle_bank(side: int, corr_tiles: float, frames: int = 256, path: str = "") -> np.ndarray:
+    """(frames, side, side) unit-variance correlated fields, cached (and memmapped with `path`)."""
+    key = f"{side}x{side}_c{corr_tiles:.4g}_k{frames}"
+    if path:
+        fname = Path(path) / f"speckle_{key}.npy"
+        if fname.exists():
+            bank = np.load(fname, mmap_mode="r")
+            if bank.shape == (frames, side, side):
+                return bank
+        fname.parent.mkdir(parents=True, exist_ok=True)
+        out = np.lib.format.open_memmap(fname, mode="w+", dtype=np.float64, shape=(frames, side, side))
+    else:
+        out = np.empty((frames, side, side))
+    rng = np.random.default_rng(zlib.crc32(key.encode()))
+    h = _filter(side, corr_tiles)
+    for start in range(0, frames, _BLOCK):
+        n = min(_BLOCK, frames - start)
+        white = rng.standard_normal((n, side, side))
+        out[start:start + n] = np.fft.irfft2(np.fft.rfft2(white, norm="ortho") * h, s=(side, side), norm="ortho")
+    if path:
+        out.flush()
+        del out
+        return np.load(fname, mmap_mode="r")
+    out.flags.writeable = False
+    return out
+
+
+def draw_fields(bank: np.ndarray, idx: np.ndarray, size: int) -> np.ndarray:
+    """(len(idx), size) fields for flat draws `idx` in [0, frames * side^2).
+
+    A draw selects bank entry `idx // side^2` rolled by `idx % side^2` tiles.
+    """
+    side = bank.shape[1]
+    idx = np.asarray(idx, dtype=np.int64).ravel()
+    k, shift = np.divmod(idx, side * side)
+    dy, dx = np.divmod(shift, side)
+    rows = (np.arange(side)[None, :] - dy[:, None]) % side
+    cols = (np.arange(side)[None, :] - dx[:, None]) % side
+    f = np.asarray(bank[k])  # reads only the selected fields from a memmap
+    b = np.arange(len(idx))[:, None, None]
+    return f[b, rows[:, :, None], cols[:, None, :]].reshape(len(idx), side * side)[:, :size]
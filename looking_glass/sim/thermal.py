@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import numpy as np
+from .memory import exp_memory
 
 
 @dataclass
@@ -31,3 +32,21 @@ class Thermal:
         opt_scale = 1.0 + 0.01 * s
         return {"comp_vth_mV_delta": comp_delta_mV, "opt_trans_scale": opt_scale}
 
+    def trajectory(self, frames: int, frame_period_s=0.1) -> dict:
+        """Drift terms of the next `frames` frames as (frames,) arrays.
+
+        Same AR(1) process as `step`, run as one IIR filter over a block of
+        normal draws; per-frame periods use their mean for the pole. The state
+        carries over to later `step`/`trajectory` calls.
+        """
+        T = int(frames)
+        if self.p.drift_scale <= 0.0:
+            return {"comp_vth_mV_delta": np.zeros(T), "opt_trans_scale": np.ones(T)}
+        fc = max(self.p.corner_hz, 1e-6)
+        alpha = float(np.exp(-2.0 * np.pi * fc * float(np.mean(frame_period_s))))
+        state = exp_memory(self.rng.normal(0.0, 1.0, size=T), alpha, self._state)
+        if T:
+            self._state = float(state[-1])
+        s = state * self.p.drift_scale
+        return {"comp_vth_mV_delta": 1.0 * s, "opt_trans_scale": 1.0 + 0.01 * s}
+
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 import numpy as np
+from .memory import exp_memory
+from .noise import biased_normal
+from .plan import PlanCache, Tracked
 
 @dataclass
-class TIAParams:
+class TIAParams(Tracked):
     tia_transimpedance_kohm: float = 10.0
     bw_mhz: float = 100.0
     bw2_mhz: float = 0.0
@@ -13,45 +16,93 @@ class TIAParams:
     adc_fullscale_v: float = 1.0
     adc_read_noise_mV_rms: float = 0.0
     gain_sigma_pct: float = 0.0
+    # Oversampled waveform engine (see TIA._waveform); 0 keeps the per-frame update
+    waveform_oversample: int = 0
+    sample_frac: float = 1.0  # comparator decision instant as a fraction of the window
+    waveform_sequence: bool = False  # (B, N) rows are consecutive windows, not independent frames
+
+@dataclass(frozen=True)
+class TIAPlan:
+    """Linear coefficients compiled from `TIAParams`."""
+    R: float
+    k1: float  # -2*pi*bw (rad/s); alpha = 1 - exp(k1 * dt_ns * 1e-9)
+    k2: float
+    in_noise_A_rthz: float
+    adc_fs: float
+    adc_step: float
+    read_sigma_v: float
+
 
 class TIA:
     def __init__(self, params: TIAParams, rng=None):
         self.p = params
         self.rng = np.random.default_rng() if rng is None else rng
+        self._plan = PlanCache(self._compile)
         self._last = None
+        self._last2 = None
         self._last_out = None
         # Channel gain mismatch can be represented as per-sample multiplier for simplicity
         self._gain_scale = None
+        # Optional importance-sampling proposal for the input-noise draw
+        self.noise_bias = None
+        self.last_logw = 0.0
 
     def reset(self) -> None:
         self._last = None
+        self._last2 = None
         self._last_out = None
 
-    def simulate(self, I: np.ndarray, dt_ns: float):
-        I = np.array(I)
-        R = self.p.tia_transimpedance_kohm * 1e3
+    def _ensure_gain_scale(self, shape) -> None:
         if self._gain_scale is None and self.p.gain_sigma_pct > 0.0:
             sigma = self.p.gain_sigma_pct/100.0
-            self._gain_scale = self.rng.normal(1.0, sigma, size=I.shape)
+            self._gain_scale = self.rng.normal(1.0, sigma, size=shape)
+
+    def plan(self) -> TIAPlan:
+        """Compiled coefficients; recompiled after any param change."""
+        return self._plan.get((self.p,))
+
+    def _compile(self) -> TIAPlan:
+        p = self.p
+        fs = max(p.adc_fullscale_v, 1e-6)
+        return TIAPlan(
+            R=p.tia_transimpedance_kohm * 1e3,
+            k1=-2.0*np.pi*(p.bw_mhz * 1e6),
+            k2=-2.0*np.pi*(max(0.0, p.bw2_mhz) * 1e6),
+            in_noise_A_rthz=p.in_noise_pA_rthz*1e-12,
+            adc_fs=fs,
+            adc_step=fs / 2**p.adc_bits if p.adc_bits > 0 else 0.0,
+            read_sigma_v=p.adc_read_noise_mV_rms*1e-3,
+        )
+
+    def simulate(self, I: np.ndarray, dt_ns: float):
+        # I is (N,) or (B, N); dt_ns is a scalar or a (B, 1) column. The filter
+        # state then takes the shape of the input batch.
+        plan = self.plan()
+        I = np.array(I)
+        R = plan.R
+        self._ensure_gain_scale(I.shape[-1:])
         if self._gain_scale is not None:
             R = R * self._gain_scale
         V = I * R
+        if self.p.waveform_oversample > 0:
+            out = self._waveform(V, dt_ns, plan)
+            in_noise_A = plan.in_noise_A_rthz*np.sqrt(1.0/(dt_ns*1e-9 + 1e-18))
+            noise, self.last_logw = biased_normal(self.rng, in_noise_A*R, V.shape, self.noise_bias)
+            return self._adc(out + noise, plan)
         # Two-pole LPF with optional peaking approximation
-        bw = self.p.bw_mhz * 1e6
-        bw2 = max(0.0, self.p.bw2_mhz) * 1e6
-        alpha = 1.0 - np.exp(-2.0*np.pi*bw*dt_ns*1e-9)
+        alpha = 1.0 - np.exp(plan.k1*dt_ns*1e-9)
         if self._last is None:
             self._last = np.zeros_like(V)
         V_f = self._last + alpha*(V - self._last)
         self._last = V_f
-        if bw2 > 0.0:
-            a2 = 1.0 - np.exp(-2.0*np.pi*bw2*dt_ns*1e-9)
+        if plan.k2 != 0.0:
+            a2 = 1.0 - np.exp(plan.k2*dt_ns*1e-9)
             V_f2 = self._last + a2*(V_f - self._last)
             self._last = V_f2
             V_f = V_f2
         # Input-referred noise to output
-        in_noise_A = self.p.in_noise_pA_rthz*1e-12*np.sqrt(1.0/(dt_ns*1e-9 + 1e-18))
-        noise = self.rng.normal(0.0, in_noise_A*R, size=V.shape)
+        in_noise_A = plan.in_noise_A_rthz*np.sqrt(1.0/(dt_ns*1e-9 + 1e-18))
+        noise, self.last_logw = biased_normal(self.rng, in_noise_A*R, V.shape, self.noise_bias)
         Vn = V_f + noise
         # Slew limit
         if self._last_out is None:
@@ -61,13 +112,91 @@ class TIA:
         delta = np.clip(delta, -max_delta, max_delta)
         out = self._last_out + delta
         self._last_out = out
+        return self._adc(out, plan)
+
+    def _adc(self, out, plan: TIAPlan):
         # ADC quantization and read noise
         if self.p.adc_bits > 0:
-            fs = max(self.p.adc_fullscale_v, 1e-6)
-            levels = 2**self.p.adc_bits
-            step = fs / levels
-            out = np.clip(out, -fs, fs)
-            out = (np.round(out/step) * step)
+            out = np.clip(out, -plan.adc_fs, plan.adc_fs)
+            out = (np.round(out/plan.adc_step) * plan.adc_step)
         if self.p.adc_read_noise_mV_rms > 0.0:
-            out = out + self.rng.normal(0.0, self.p.adc_read_noise_mV_rms*1e-3, size=out.shape)
+            out = out + self.rng.normal(0.0, plan.read_sigma_v, size=out.shape)
         return out
+
+    def _waveform(self, V: np.ndarray, dt_ns, plan: TIAPlan) -> np.ndarray:
+        """Noise-free output at the decision instant of every window in `V`.
+
+        Each window is split into `waveform_oversample` samples of constant
+        input, which pass through the two poles (exact per-sample IIR updates)
+        and the slew limit. The sample at `sample_frac` of the window is
+        returned, and filter and slew state carry over to the next call, so
+        short windows without per-frame reset see the previous windows' tails
+        (ISI). Independent (B, N) rows are filtered together along the sample
+        axis; with `waveform_sequence` the rows (all leading axes, row-major) are
+        consecutive windows on one time axis.
+        """
+        K = int(self.p.waveform_oversample)
+        s = min(K, max(1, int(np.ceil(self.p.sample_frac * K)))) - 1
+        h = np.asarray(dt_ns, dtype=float) / K  # ns per sample, scalar or (B, 1)
+        seq = self.p.waveform_sequence and V.ndim >= 2
+        if seq:
+            rows = V.reshape(-1, V.shape[-1])
+            w = np.repeat(rows, K, axis=0)
+            if h.ndim:
+                h = np.repeat(np.broadcast_to(h, V.shape[:-1] + (1,)).reshape(-1, 1), K, axis=0)
+            state = V.shape[-1:]
+        else:
+            w = np.broadcast_to(V, (K,) + V.shape)
+            h = h[None] if h.ndim else h
+            state = V.shape
+        if self._last is None:
+            self._last = np.zeros(state)
+        x = exp_memory(w, np.exp(plan.k1*h*1e-9), self._last)
+        self._last = x[-1]
+        if plan.k2 != 0.0:
+            if self._last2 is None:
+                self._last2 = np.zeros(state)
+            x = exp_memory(x, np.exp(plan.k2*h*1e-9), self._last2)
+            self._last2 = x[-1]
+        # Slew limit: only step sample by sample where it binds
+        if self._last_out is None:
+            self._last_out = np.zeros(state)
+        step = self.p.slew_v_per_us * (h * 1e-3)
+        step = np.broadcast_to(step, (len(x),) + (np.shape(step)[1:] if np.ndim(step) else (1,) * (x.ndim - 1)))
+        prev = self._last_out
+        if np.all(np.abs(x[0] - prev) <= step[0]) and np.all(np.abs(np.diff(x, axis=0)) <= step[1:]):
+            out = x
+        else:
+            out = np.empty_like(x)
+            for t in range(len(x)):
+                prev = out[t] = prev + np.clip(x[t] - prev, -step[t], step[t])
+        self._last_out = out[-1]
+        if seq:
+            return out.reshape((len(rows), K) + state)[:, s].reshape(V.shape)
+        return out[s]
+
+    def rail_pair_moments(self, Ip, Im, dt_ns: float):
+        """Small-signal view of one reset plus/minus rail pair, without drawing.
+
+        Returns (Vp, Vm, kp, km, var_out): noise-free outputs (V), the gains
+        (ohm) from plus/minus input current to dv = Vp - Vm, and the per-rail
+        output noise variance (V^2: input noise, ADC quantization and read
+        noise). The minus rail's filter starts from the plus rail's state, as
+        in `simulate`, so plus-rail current reaches dv as R*alpha^2.
+        """
+        plan = self.plan()
+        Ip = np.asarray(Ip, dtype=float)
+        R = plan.R
+        if self._gain_scale is not None:
+            R = R * self._gain_scale
+        R = np.broadcast_to(R, Ip.shape[-1:])
+        alpha = 1.0 - np.exp(plan.k1*dt_ns*1e-9)
+        Vp = alpha * Ip * R
+        Vm = Vp + alpha * (np.asarray(Im, dtype=float) * R - Vp)
+        in_noise_A = plan.in_noise_A_rthz*np.sqrt(1.0/(dt_ns*1e-9 + 1e-18))
+        var_out = (in_noise_A*R)**2 + plan.read_sigma_v**2
+        if self.p.adc_bits > 0:
+            Vp = np.clip(Vp, -plan.adc_fs, plan.adc_fs)
+            Vm = np.clip(Vm, -plan.adc_fs, plan.adc_fs)
+            var_out = var_out + plan.adc_step**2 / 12.0
+        return Vp, Vm, R*alpha*alpha, R*alpha, var_out
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+
+LEVELS = (-1, 0, 1)
+
+
+def _z_for(conf: float) -> float:
+    return NormalDist().inv_cdf(0.5 + 0.5 * float(conf))
+
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def q_function(x):
+    """Gaussian tail probability Q(x) = P(Z > x), accurate far into the tail."""
+    return 0.5 * _erfc(np.asarray(x, dtype=float) / math.sqrt(2.0))
+
+
+def wilson_ci(n_err: int, n_bits: int, conf: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    n = int(n_bits)
+    k = int(n_err)
+    if n <= 0:
+        return 0.0, 1.0
+    z = _z_for(conf)
+    p = k / n
+    denom = 1 + (z*z)/n
+    center = (p + (z*z)/(2*n)) / denom
+    half = (z * ((p*(1-p)/n + (z*z)/(4*n*n)) ** 0.5)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # Continued fraction for the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 500):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return h
+
+
+def betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    ln_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                + a * math.log(x) + b * math.log1p(-x))
+    front = math.exp(ln_front)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def _beta_ppf(q: float, a: float, b: float) -> float:
+    lo, hi = 0.0, 1.0
+    for _ in range(200):
+        mid = 0.5 * (lo + hi)
+        if betainc(a, b, mid) < q:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo <= 1e-15 * max(hi, 1e-300):
+            break
+    return 0.5 * (lo + hi)
+
+
+def clopper_pearson_ci(n_err: int, n_bits: int, conf: float = 0.95) -> tuple[float, float]:
+    """Exact (Clopper-Pearson) binomial interval."""
+    n = int(n_bits)
+    k = int(n_err)
+    if n <= 0:
+        return 0.0, 1.0
+    alpha = 1.0 - float(conf)
+    lo = 0.0 if k == 0 else _beta_ppf(0.5 * alpha, k, n - k + 1)
+    hi = 1.0 if k == n else _beta_ppf(1.0 - 0.5 * alpha, k + 1, n - k)
+    return lo, hi
+
+
+class BerAccumulator:
+    """Streaming pooled error counter for ternary decisions.
+
+    Keeps a 3x3 truth-by-decision confusion matrix and per-channel error/bit
+    counts, so memory does not grow with the number of trials. `update`
+    accepts (N,) vectors for one frame or (B, N) arrays for a batch.
+    """
+
+    def __init__(self, channels: int | None = None):
+        self.confusion = np.zeros((3, 3), dtype=np.int64)
+        self.ch_err = None if channels is None else np.zeros(int(channels), dtype=np.int64)
+        self.ch_bits = None if channels is None else np.zeros(int(channels), dtype=np.int64)
+        self.trials = 0
+
+    def update(self, t_out, truth) -> None:
+        t_out = np.asarray(t_out)
+        truth = np.asarray(truth)
+        if truth.ndim == 1:
+            t_out = t_out[None, :]
+            truth = truth[None, :]
+        idx = (truth.astype(np.int64) + 1) * 3 + (np.clip(t_out, -1, 1).astype(np.int64) + 1)
+        self.confusion += np.bincount(idx.ravel(), minlength=9).reshape(3, 3)
+        err = t_out != truth
+        M = truth.shape[-1]
+        if self.ch_err is None or self.ch_err.shape[0] != M:
+            if self.ch_err is not None and self.ch_err.any():
+                raise ValueError(f"channel count changed from {self.ch_err.shape[0]} to {M}")
+            self.ch_err = np.zeros(M, dtype=np.int64)
+            self.ch_bits = np.zeros(M, dtype=np.int64)
+        self.ch_err += err.sum(axis=0)
+        self.ch_bits += truth.shape[0]
+        self.trials += truth.shape[0]
+
+    def merge(self, other: "BerAccumulator") -> "BerAccumulator":
+        self.confusion += other.confusion
+        if other.ch_err is not None:
+            if self.ch_err is None:
+                self.ch_err = other.ch_err.copy()
+                self.ch_bits = other.ch_bits.copy()
+            else:
+                self.ch_err += other.ch_err
+                self.ch_bits += other.ch_bits
+        self.trials += other.trials
+        return self
+
+    @property
+    def n_bits(self) -> int:
+        return int(self.confusion.sum())
+
+    @property
+    def n_err(self) -> int:
+        return self.n_bits - int(np.trace(self.confusion))
+
+    @property
+    def ber(self) -> float:
+        n = self.n_bits
+        return self.n_err / n if n else 0.0
+
+    def wilson(self, conf: float = 0.95) -> tuple[float, float]:
+        return wilson_ci(self.n_err, self.n_bits, conf)
+
+    def clopper_pearson(self, conf: float = 0.95) -> tuple[float, float]:
+        return clopper_pearson_ci(self.n_err, self.n_bits, conf)
+
+    def level_counts(self) -> dict[int, tuple[int, int]]:
+        """(n_err, n_bits) per true ternary level."""
+        out = {}
+        for i, lvl in enumerate(LEVELS):
+            n = int(self.confusion[i].sum())
+            out[lvl] = (n - int(self.confusion[i, i]), n)
+        return out
+
+    def summary(self, conf: float = 0.95, exact: bool = True, detail: bool = True) -> dict:
+        """Pooled BER with Wilson (and optionally Clopper-Pearson) bounds.
+
+        `detail` adds per-channel BER and the confusion matrix.
+        """
+        lo, hi = self.wilson(conf)
+        out = {
+            "pooled_ber": float(self.ber),
+            "n_err": self.n_err,
+            "n_bits": self.n_bits,
+            "trials": int(self.trials),
+            "ber_ci_conf": float(conf),
+            "ber_wilson_lo": float(lo),
+            "ber_wilson_hi": float(hi),
+        }
+        if exact:
+            cp_lo, cp_hi = self.clopper_pearson(conf)
+            out["ber_cp_lo"] = float(cp_lo)
+            out["ber_cp_hi"] = float(cp_hi)
+        out["level_ber"] = {str(lvl): (e / n if n else None) for lvl, (e, n) in self.level_counts().items()}
+        if detail and self.ch_err is not None:
+            out["channel_ber"] = (self.ch_err / np.clip(self.ch_bits, 1, None)).tolist()
+        if detail:
+            out["confusion"] = self.confusion.tolist()
+        return out
+
+
+@dataclass
+class StopRule:
+    """Sequential stopping criteria for a BER estimate.
+
+    A run stops as soon as any enabled target is met (relative Wilson CI
+    width, minimum error count) once `min_trials` have run, or when the trial
+    or wall-clock budget is exhausted. Criteria are checked every
+    `check_every` trials.
+    """
+    rel_ci_width: float | None = None   # (hi - lo) / ber at confidence `conf`
+    min_errors: int | None = None
+    max_seconds: float | None = None
+    max_trials: int | None = None
+    min_trials: int = 0
+    check_every: int = 100
+    conf: float = 0.95
+
+    def enabled(self) -> bool:
+        return any(v is not None for v in (self.rel_ci_width, self.min_errors, self.max_seconds))
+
+    def reason(self, acc: BerAccumulator, trials: int, elapsed_s: float) -> str | None:
+        """Return why the run should stop now, or None to continue."""
+        if trials >= int(self.min_trials):
+            if self.min_errors is not None and acc.n_err >= int(self.min_errors):
+                return "min_errors"
+            if self.rel_ci_width is not None and acc.n_err > 0:
+                lo, hi = acc.wilson(self.conf)
+                if (hi - lo) / acc.ber <= float(self.rel_ci_width):
+                    return "rel_ci_width"
+        if self.max_trials is not None and trials >= int(self.max_trials):
+            return "max_trials"
+        if self.max_seconds is not None and elapsed_s >= float(self.max_seconds):
+            return "max_seconds"
+        return None
@@ -0,0 +1,68 @@
+"""Packed ternary storage and popcount kernels.
+
+Ternary vectors are int8 arrays in {-1, 0, +1}. `pack_trits` stores each trit
+in two bits (00 zero, 01 plus, 10 minus), four per byte, and pads rows to whole
+64-bit words of 32 trits. `trit_errors` and `trit_confusion` work directly on
+the packed rows: the words are XORed and masked, and set bits are counted.
+Padding trits are zero on both sides, so they never count as errors; they are
+taken out of the (0, 0) confusion cell.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+TRITS_PER_WORD = 32
+_EVEN = np.uint64(0x5555555555555555)  # low bit of every 2-bit lane
+_DECODE = np.array([0, 1, -1, 0], dtype=np.int8)
+_BYTE_POP = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of (..., W) uint64 words."""
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POP[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def packed_bytes(n: int) -> int:
+    """Bytes per packed row of `n` trits."""
+    return 8 * -(-int(n) // TRITS_PER_WORD)
+
+
+def pack_trits(t) -> np.ndarray:
+    """(..., n) ternary -> (..., packed_bytes(n)) uint8, 2 bits per trit."""
+    t = np.asarray(t)
+    n = t.shape[-1]
+    code = np.zeros(t.shape[:-1] + (packed_bytes(n) * 4,), dtype=np.uint8)
+    code[..., :n] = (t > 0).view(np.uint8) | ((t < 0).view(np.uint8) << 1)
+    q = code.reshape(code.shape[:-1] + (-1, 4))
+    return q[..., 0] | (q[..., 1] << 2) | (q[..., 2] << 4) | (q[..., 3] << 6)
+
+
+def unpack_trits(packed: np.ndarray, n: int) -> np.ndarray:
+    """Inverse of `pack_trits`: (..., bytes) uint8 -> (..., n) int8."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    code = (packed[..., None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    return _DECODE[code.reshape(packed.shape[:-1] + (-1,))[..., :int(n)]]
+
+
+def _words(packed: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(packed, dtype=np.uint8).view(np.uint64)
+
+
+def trit_errors(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Mismatched trits per row of two packed arrays."""
+    d = _words(a) ^ _words(b)
+    return _popcount((d | (d >> np.uint64(1))) & _EVEN)
+
+
+def trit_confusion(truth: np.ndarray, t_out: np.ndarray, n: int) -> np.ndarray:
+    """3x3 truth-by-decision counts (rows/cols -1, 0, +1) of packed rows of `n` trits."""
+    masks = []
+    for w in (_words(truth), _words(t_out)):
+        hi = w >> np.uint64(1)
+        masks.append((hi & _EVEN, ~(w | hi) & _EVEN, w & _EVEN))
+    out = np.array([[int(_popcount(i & j).sum()) for j in masks[1]] for i in masks[0]], dtype=np.int64)
+    rows = int(np.prod(np.shape(truth)[:-1], dtype=np.int64))
+    out[1, 1] -= rows * (packed_bytes(n) * 4 - int(n))
+    return out
@@ -6,6 +6,7 @@ import random
 from typing import Dict, Any, Tuple
 
 from .orchestrator import Orchestrator, SystemParams
+from .analytic import analytic_ber
 from .sim.emitter import EmitterParams
 from .sim.optics import OpticsParams
 from .sim.sensor import PDParams
@@ -80,6 +81,20 @@ def evaluate(system: SystemParams,
     return result
 
 
+def evaluate_analytic(system: SystemParams,
+                      emit: EmitterParams,
+                      optx: OpticsParams,
+                      pd: PDParams,
+                      tia: TIAParams,
+                      comp: ComparatorParams,
+                      clk: ClockParams,
+                      patterns: int = 64) -> Dict[str, Any]:
+    """Gaussian-approximation BER in milliseconds (no Monte Carlo, no calibration)."""
+    orch = Orchestrator(system, emit, optx, pd, tia, comp, clk)
+    res = analytic_ber(orch, patterns=patterns)
+    return {"ber": res["analytic_ber"], "summary": res}
+
+
 def auto_tune(system: SystemParams,
               emit: EmitterParams,
               optx: OpticsParams,
@@ -91,7 +106,15 @@ def auto_tune(system: SystemParams,
               budget: int = 80,
               seed: int = 42,
               use_calibration: bool = True,
-              constraints: Dict[tuple[str, str], dict] | None = None) -> Dict[str, Any]:
+              constraints: Dict[tuple[str, str], dict] | None = None,
+              screen: str | None = None,
+              confirm_top: int = 3) -> Dict[str, Any]:
+    """Simulated-annealing search over realistic hardware bounds.
+
+    With `screen="analytic"` candidates are scored by the semi-analytic BER
+    (so `budget` can be in the thousands) and only the `confirm_top` best
+    distinct configurations are re-evaluated with Monte Carlo `trials`.
+    """
     rnd = random.Random(seed)
     space = TuneSpace()
     constraints = constraints or {}
@@ -121,10 +144,18 @@ def auto_tune(system: SystemParams,
             new_idx = max(0, min(len(choices_sorted)-1, idx + step))
             return choices_sorted[new_idx]
         return current
+    def score(cfg):
+        if screen == "analytic":
+            res = evaluate_analytic(*cfg)
+            screened.append((res["ber"], len(screened), cfg))
+        else:
+            res = evaluate(*cfg, trials=trials, use_calibration=use_calibration)
+        return res, res.get("ber_calibrated", res["ber"])
+
+    screened: list = []
     # Start from current
     best_cfg = (system, emit, optx, pd, tia, comp, clk)
-    best = evaluate(*best_cfg, trials=trials, use_calibration=use_calibration)
-    best_cost = best.get("ber_calibrated", best["ber"]) 
+    best, best_cost = score(best_cfg)
     temp = 0.5
     cooling = 0.97
     for i in range(budget):
@@ -151,15 +182,34 @@ def auto_tune(system: SystemParams,
                       w_minus_contrast=clip_for(("optics","w_minus_contrast"), jitter(ox2.w_minus_contrast, 0.03)),
                       stray_floor_db=clip_for(("optics","stray_floor_db"), jitter(ox2.stray_floor_db, 2.0)))
         cand_cfg = (sys2, em2, ox2, pd2, ti2, co2, cl2)
-        cand = evaluate(*cand_cfg, trials=trials, use_calibration=use_calibration)
-        cost = cand.get("ber_calibrated", cand["ber"]) 
+        cand, cost = score(cand_cfg)
         if cost < best_cost or rnd.random() < math.exp((best_cost - cost)/max(1e-6,temp)):
             best_cfg = cand_cfg
             best = cand
             best_cost = cost
         temp *= cooling
+    screen_info = None
+    if screen == "analytic":
+        # Confirm the best analytic candidates with Monte Carlo
+        confirmed = []
+        seen = set()
+        for a_ber, _, cfg in sorted(screened, key=lambda r: (r[0], r[1])):
+            key = repr(cfg)
+            if key in seen:
+                continue
+            seen.add(key)
+            res = evaluate(*cfg, trials=trials, use_calibration=use_calibration)
+            confirmed.append((res.get("ber_calibrated", res["ber"]), a_ber, cfg, res))
+            if len(confirmed) >= max(1, int(confirm_top)):
+                break
+        mc_cost, _, best_cfg, best = min(confirmed, key=lambda r: r[0])
+        screen_info = {
+            "mode": "analytic",
+            "evaluated": len(screened),
+            "confirmed": [{"analytic_ber": a, "mc_ber": c} for c, a, _, _ in confirmed],
+        }
     sys2, em2, ox2, pd2, ti2, co2, cl2 = best_cfg
-    return {
+    out = {
         "best_ber": best.get("ber_calibrated", best.get("ber")),
         "best_summary": best.get("summary_calibrated", best.get("summary")),
         "params": {
@@ -172,4 +222,7 @@ def auto_tune(system: SystemParams,
             "clock": cl2.__dict__,
         }
     }
+    if screen_info is not None:
+        out["screen"] = screen_info
+    return out
 
@@ -4,6 +4,7 @@ import os
 import sys
 import numpy as np
 import yaml
+from dataclasses import replace
 
 ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
@@ -55,6 +56,18 @@ def transfer_curve(optics, total_mw=2.0, span_mw=4.0, steps=41, dt_ns=9.0):
     return result
 
 
+def stage_luts(optics, tol_mw=1e-6, cache_dir=""):
+    """Tabulated transfer curves of the pack's enabled shaping stages (see looking_glass/sim/lut.py)."""
+    p = replace(optics.p, transfer_lut=True, transfer_lut_tol_mw=tol_mw, transfer_lut_path=cache_dir)
+    plan = Optics(p).plan(1)
+    out = {}
+    for name in ("sat_abs", "hard_clip", "post_clip", "mzi"):
+        lut = getattr(plan, "lut_" + name)
+        if lut is not None:
+            out[name] = lut.curve()
+    return out
+
+
 def osnr_growth(optics, passes=6, total_mw=2.0, diff_mw=0.0, dt_ns=9.0):
     plus = np.array([0.5 * total_mw + 0.5 * diff_mw])
     minus = np.array([0.5 * total_mw - 0.5 * diff_mw])
@@ -107,6 +120,9 @@ def main():
     parser.add_argument("--window-ns", type=float, default=9.0)
     parser.add_argument("--trials", type=int, default=400)
     parser.add_argument("--passes", type=int, default=6)
+    parser.add_argument("--stage-luts", action="store_true", help="Include tabulated transfer curves of the shaping stages")
+    parser.add_argument("--lut-tol-mw", type=float, default=1e-6)
+    parser.add_argument("--lut-cache", default="", help="Directory caching the tables as .npz")
     parser.add_argument("--json", default=None)
     args = parser.parse_args()
 
@@ -129,6 +145,8 @@ def main():
         "osnr_growth": growth,
         "ternary_histogram": hist
     }
+    if args.stage_luts:
+        data["stage_luts"] = stage_luts(build_optics(args.optics), args.lut_tol_mw, args.lut_cache)
     if args.json:
         with open(args.json, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
@@ -0,0 +1,27 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+
+
+def build_orch(seed: int = 0, channels: int = 16, system=None, emit=None, optx=None, tia=None, comp=None,
+               cam=None) -> Orchestrator:
+    """Default Orchestrator; each dict overrides fields of one block's params."""
+    return Orchestrator(SystemParams(channels=channels, seed=seed, **(system or {})),
+                        EmitterParams(channels=channels, **(emit or {})), OpticsParams(**(optx or {})),
+                        PDParams(), TIAParams(**(tia or {})), ComparatorParams(**(comp or {})), ClockParams(), cam)
+
+
+@pytest.fixture
+def make_orch():
+    return build_orch
@@ -0,0 +1,38 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.analytic import analytic_ber
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.stats import BerAccumulator
+from looking_glass.tuner import auto_tune
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+
+
+def _cfg(noise_mV: float = 3.0):
+    return (SystemParams(channels=16, seed=3), EmitterParams(channels=16), OpticsParams(ct_model="neighbor"),
+            PDParams(), TIAParams(), ComparatorParams(input_noise_mV_rms=noise_mV), ClockParams())
+
+
+def test_analytic_matches_monte_carlo():
+    orch = Orchestrator(*_cfg())
+    state = orch.rng.bit_generator.state
+    est = analytic_ber(orch)
+    assert orch.rng.bit_generator.state == state  # screening draws nothing from the run RNG
+    acc = BerAccumulator()
+    orch.record(5000, batch=1000, acc=acc)
+    assert abs(est["analytic_ber"] - acc.ber) < 0.15 * acc.ber
+    assert est["sigma_mV"]["comp"] == 3.0
+
+
+def test_auto_tune_analytic_screen_confirms_with_monte_carlo():
+    res = auto_tune(*_cfg(1.0), trials=20, budget=30, screen="analytic", confirm_top=2, use_calibration=False)
+    assert res["screen"]["evaluated"] == 31
+    assert len(res["screen"]["confirmed"]) == 2
+    assert res["best_ber"] == min(c["mc_ber"] for c in res["screen"]["confirmed"])
@@ -0,0 +1,41 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+
+NEIGHBOR = dict(ct_model="neighbor")
+
+
+def test_step_batch_shapes_and_forced_input(make_orch):
+    orch = make_orch(1, optx=NEIGHBOR)
+    tern = np.random.default_rng(0).integers(-1, 2, size=(32, 16))
+    res = orch.step_batch(32, force_ternary=tern)
+    assert res["ber"].shape == (32,)
+    assert res["t_out"].shape == (32, 16)
+    np.testing.assert_array_equal(res["truth"], tern)
+    np.testing.assert_array_equal(res["n_err"], (res["t_out"] != tern).sum(axis=1))
+
+
+def test_step_batch_matches_step_statistics(make_orch):
+    trials = 2000
+    loop = make_orch(3, optx=NEIGHBOR)
+    rows = [loop.step() for _ in range(trials)]
+    ber_loop = sum(r["n_err"] for r in rows) / (16.0 * trials)
+    res = make_orch(4, optx=NEIGHBOR).step_batch(trials)
+    ber_batch = res["n_err"].sum() / (16.0 * trials)
+    assert abs(ber_loop - ber_batch) < 0.01
+    assert abs(np.mean([r["energy_pj"] for r in rows]) - res["energy_pj"].mean()) < 1.0
+
+
+def test_step_batch_sequential_for_stateful_optics(make_orch):
+    soa = dict(NEIGHBOR, soa_on=True, soa_small_signal_gain_db=6.0)
+    orch = make_orch(5, optx=soa)
+    assert not orch._batch_independent()
+    ref = make_orch(5, optx=soa)
+    res = orch.step_batch(8)
+    rows = [ref.step() for _ in range(8)]
+    np.testing.assert_allclose(res["dv_mV"], [r["dv_mV"] for r in rows])
@@ -0,0 +1,46 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.camera import Camera, CameraParams
+
+
+def test_gaussian_shot_noise_matches_moments_and_keeps_poisson_below_threshold():
+    params = CameraParams(gauss_above_e=50.0, adc_bits=0, read_noise_e_rms=0.0, prnu_pct=0.0, dark_current_e_per_s=0.0)
+    cam = Camera(params, rng=np.random.default_rng(0))
+    P = np.tile([1e-6, 2e-4], (4000, 1))  # ~26 and ~5e3 electrons in 10 ns
+    Ip, Im = cam.simulate_pair(P, np.zeros_like(P), 10.0)
+    mean, var = cam.moments(P[0], 10.0)
+    np.testing.assert_allclose(Ip.mean(axis=0), mean, rtol=5e-3)
+    np.testing.assert_allclose(Ip.var(axis=0), var, rtol=0.1)
+    assert np.all(Im == 0.0)  # dark rail stays Poisson: zero mean, zero electrons
+
+    e = Ip * 10e-9 / 1.602176634e-19
+    np.testing.assert_allclose(e[:, 0], np.round(e[:, 0]), atol=1e-6)  # integer Poisson counts below threshold
+    assert not np.allclose(e[:, 1], np.round(e[:, 1]))
+
+
+def test_prnu_maps_are_kept_per_geometry():
+    cam = Camera(CameraParams(prnu_pct=5.0, dsnu_pct=10.0), rng=np.random.default_rng(2))
+    cam.simulate(np.full((3, 8), 1e-3), np.full((3, 1), 10.0))
+    prnu8, dark8 = cam._prnu, cam._dark
+    cam.simulate(np.full(16, 1e-3), 10.0)
+    assert cam._prnu.shape == (16,) and cam._dark.shape == (16,)
+    cam.simulate(np.full(8, 1e-3), 10.0)
+    assert cam._prnu is prnu8 and cam._dark is dark8
+    mean, _ = cam.moments(np.full(16, 1e-4), 10.0)
+    assert mean.shape == (16,) and np.ptp(mean) > 0
+
+    frame = Camera(CameraParams(prnu_pct=5.0, frame_readout=True, roi_px=(0, 0, 8, 16)), rng=np.random.default_rng(2))
+    frame.set_tile_grid(16, 0.0)
+    frame.simulate(np.full(16, 1e-4), 10.0)
+    prnu_top = frame._prnu
+    frame.p.roi_px = (8, 0, 8, 16)  # same pixel count, bottom half of the sensor
+    frame.simulate(np.full(16, 1e-4), 10.0)
+    assert frame._prnu.shape == prnu_top.shape and frame._prnu is not prnu_top
+    mean, _ = frame.moments(np.full(16, 1e-4), 10.0)
+    np.testing.assert_array_equal(mean[:8], 0.0)  # top tile rows are outside the ROI
+    assert np.ptp(mean[8:]) > 0
@@ -53,3 +53,31 @@ def test_extinction_temperature_scaling_once():
 
     np.testing.assert_allclose(Pp, [on, off, off])
     np.testing.assert_allclose(Pm, [off, off, on])
+
+
+def test_rail_table_gather_matches_levels_and_tracks_temperature():
+    params = EmitterParams(channels=4, power_mw_per_ch=1.0, temp_coeff_pct_per_C=2.0,
+                           modulation_mode="pushpull", pushpull_alpha=0.5)
+    emitter = EmitterArray(params, rng=np.random.default_rng(0))
+    tern = np.array([[1, 0, -1, 2], [-1, -1, 0, 1]])
+
+    for temp_C in (25.0, 40.0):
+        Pp, Pm = emitter.mean_rails(tern, temp_C)
+        total = params.power_mw_per_ch * (1.0 + (temp_C - 25.0) * params.temp_coeff_pct_per_C / 100.0)
+        sign = np.sign(tern)
+        np.testing.assert_allclose(Pp, 0.5 * total * (1 + 0.5 * sign))
+        np.testing.assert_allclose(Pm, 0.5 * total * (1 - 0.5 * sign))
+    assert emitter._table_temp == 40.0
+
+
+def test_channel_wavelengths_follow_temperature_without_accumulating():
+    params = EmitterParams(channels=4, wavelengths_nm=[850.0, 851.0], wav_drift_nm_per_C=0.1,
+                           rin_dbhz=float("-inf"))
+    emitter = EmitterArray(params, rng=np.random.default_rng(1))
+    tern = np.zeros(4, dtype=int)
+
+    for _ in range(3):
+        emitter.simulate(tern, dt_ns=1.0, temp_C=35.0)
+    np.testing.assert_allclose(emitter._channel_wavelengths, [851.0, 852.0, 851.0, 852.0])
+    emitter.simulate(tern, dt_ns=1.0, temp_C=25.0)
+    np.testing.assert_allclose(emitter._channel_wavelengths, [850.0, 851.0, 850.0, 851.0])
@@ -0,0 +1,31 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.lut import transfer_lut
+from looking_glass.sim.optics import Optics, OpticsParams
+
+
+def test_lut_stages_stay_within_tolerance():
+    kw = dict(sat_abs_on=True, sat_alpha=2.0, hard_clip_on=True, mzi_on=True, post_clip_on=True,
+              stray_floor_db=-300.0)
+    x = np.random.default_rng(0).random((8, 64)) * 3.0
+    ref = Optics(OpticsParams(**kw)).simulate(x, 3.0 - x, 1.0)[0]
+    optx = Optics(OpticsParams(transfer_lut=True, transfer_lut_tol_mw=1e-7, **kw))
+    plan = optx.plan(64)
+    assert all(getattr(plan, "lut_" + k).max_err <= 1e-7 for k in ("sat_abs", "hard_clip", "post_clip", "mzi"))
+    np.testing.assert_allclose(optx.simulate(x, 3.0 - x, 1.0)[0], ref, atol=1e-6)
+
+
+def test_lut_disk_cache_round_trip(tmp_path):
+    transfer_lut.cache_clear()
+    first = transfer_lut("tanh", (0.2,), 1e-6, str(tmp_path))
+    assert len(list(tmp_path.glob("lut_*.npz"))) == 1
+    transfer_lut.cache_clear()
+    again = transfer_lut("tanh", (0.2,), 1e-6, str(tmp_path))
+    np.testing.assert_array_equal(again.x, first.x)
+    assert again.max_err == first.max_err
+    np.testing.assert_allclose(again(np.array([0.0, 0.05, 10.0])), 0.2 * np.tanh(np.array([0.0, 0.25, 50.0])), atol=1e-6)
@@ -0,0 +1,36 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.memory import exp_memory
+from looking_glass.sim.optics import Optics, OpticsParams
+
+
+def test_scan_matches_recursion_across_blocks():
+    a = np.exp(-1.0 / 4.0)
+    for width in (3, 100):  # cumulative scan, then the row loop
+        x = np.random.default_rng(0).random((500, width))
+        y, ref = np.ones(width), []
+        for row in x:
+            y = (1.0 - a) * row + a * y
+            ref.append(y)
+        np.testing.assert_allclose(exp_memory(x, a, np.ones(width), use_scipy=False), ref, rtol=1e-10)
+        np.testing.assert_allclose(exp_memory(x, a, np.ones(width)), ref, rtol=1e-10)
+
+
+def test_memory_batch_equals_frames_and_reflections_beat():
+    x = np.random.default_rng(1).random((40, 6))
+    batch = Optics(OpticsParams(memory_tau_frames=3.0))
+    out = batch.simulate(x, x, 1.0)[0]
+    step = Optics(OpticsParams(memory_tau_frames=3.0))
+    ref = np.stack([step.simulate(x[t], x[t], 1.0)[0] for t in range(len(x))])
+    np.testing.assert_allclose(out, ref, rtol=1e-12)
+    assert not batch.has_frame_memory()
+    refl = Optics(OpticsParams(reflection_event_db=30.0, reflection_prob=1.0, stray_floor_db=-300.0),
+                  rng=np.random.default_rng(2))
+    ratio = refl.simulate(np.ones((2000, 8)), np.ones((2000, 8)), 1.0)[0] / OpticsParams().transmittance
+    amp = 2.0 * np.sqrt(1e-3)
+    assert abs(ratio.mean() - 1.0) < 2e-3 and abs(ratio.std() - amp / np.sqrt(2.0)) < 2e-3
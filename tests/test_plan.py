@@ -0,0 +1,68 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import Optics, OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+
+
+def test_neighbor_crosstalk_matches_roll_reference():
+    p = OpticsParams(ct_model="neighbor", stray_floor_db=-300.0)
+    x = np.random.default_rng(0).random((4, 9))
+    out, _, _, _ = Optics(p).simulate(x, x, 5.0)
+    a, d = 10 ** (p.ct_neighbor_db / 10.0), 10 ** (p.ct_diag_db / 10.0)
+    ref = x + a * (np.roll(x, 1, -1) + np.roll(x, -1, -1))
+    ref = ref + d * (np.roll(ref, 2, -1) + 2 * ref + np.roll(ref, -2, -1))
+    np.testing.assert_allclose(out, ref * p.transmittance, rtol=1e-12)
+
+
+def test_param_change_recompiles_plan():
+    optx = Optics(OpticsParams(ct_model="global"))
+    first = optx.plan(16)
+    assert optx.plan(16) is first
+    optx.p.crosstalk_db = -20.0
+    second = optx.plan(16)
+    assert second is not first and second.ct_bleed == 10 ** (-20.0 / 10.0)
+    optx.p.transmittance = 0.5  # read live, no recompile
+    assert optx.plan(16) is second
+    x = np.ones(16)
+    assert optx.simulate(x, x, 5.0)[0][0] < Optics(OpticsParams(ct_model="global")).simulate(x, x, 5.0)[0][0]
+    assert "_version" not in optx.p.__dict__
+
+
+def test_dwdm_walkoff_leaves_params_untouched():
+    optx_p = OpticsParams()
+    optx_p.dwdm_slope_db_per_nm = 1.0
+    orch = Orchestrator(SystemParams(channels=8, temp_C=35.0), EmitterParams(channels=8), optx_p,
+                        PDParams(), TIAParams(), ComparatorParams(), ClockParams())
+    orch.step()
+    orch.step_batch(4, sequential=False)
+    assert optx_p.transmittance == OpticsParams().transmittance
+    assert orch.optx._plan.compiles == 1
+
+
+def test_stage_registry_compiles_only_enabled_stages():
+    from looking_glass.sim import optics as optics_mod
+    optx = Optics(OpticsParams(ct_model="global", soa_on=False, voa_post_db=3.0))
+    assert optx.plan(8).stage_names == ("global_ct", "voa_post")
+    saved = list(optics_mod.OPTICS_STAGES)
+    try:
+        optics_mod.register_optics_stage(optics_mod.OpticsStage(
+            "offset", lambda p, size: {"offset": 1.0},
+            lambda self, plus, minus, dt_ns, plan: (plus + plan.extra["offset"], minus)), before="voa_post")
+        optx._plan.invalidate()
+        plan = optx.plan(8)
+        assert plan.stage_names == ("global_ct", "offset", "voa_post") and plan.extra == {"offset": 1.0}
+        p0 = Optics(OpticsParams(stray_floor_db=-300.0, transmittance=1.0, ins_loss_db_mean=0.0))
+        out = p0.simulate(np.zeros(4), np.zeros(4), 5.0)[0]
+        np.testing.assert_allclose(out, 1.0)
+    finally:
+        optics_mod.OPTICS_STAGES[:] = saved
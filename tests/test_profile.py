@@ -0,0 +1,37 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.profiling import StageProfiler
+
+
+SOA = dict(ct_model="neighbor", soa_on=True)
+
+
+def test_profiler_records_stages_without_changing_results(make_orch):
+    plain, timed = make_orch(3, optx=SOA), make_orch(3, optx=SOA)
+    prof = StageProfiler(memory=True).attach(timed)
+    for _ in range(4):
+        assert plain.step() == timed.step()
+    np.testing.assert_array_equal(plain.step_batch(3)["dv_mV"], timed.step_batch(3)["dv_mV"])
+    stages = prof.summary()["stages"]
+    assert stages["frame"]["calls"] == 7
+    assert stages["tia"]["calls"] == 14
+    assert stages["optics.soa"]["calls"] == 7 and stages["optics.neighbor_ct"]["calls"] == 7
+    assert stages["optics"]["self_ms"] < stages["optics"]["total_ms"]
+    assert abs(sum(s["share"] for s in stages.values()) - 1.0) < 1e-9
+    assert all(s["alloc_kb"] >= 0.0 for s in stages.values())
+
+
+def test_detach_restores_plain_methods(make_orch):
+    orch = make_orch(3, optx=SOA)
+    prof = StageProfiler().attach(orch)
+    orch.step()
+    prof.detach()
+    assert "simulate" not in orch.tia.__dict__ and "_simulate_frame" not in orch.__dict__
+    assert orch.optx.stage_wrap is None
+    orch.step()
+    assert prof.summary()["stages"]["frame"]["calls"] == 1
@@ -0,0 +1,39 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.optics import Optics, OpticsParams
+from looking_glass.sim.psf import coupling_kernel, psf_spectrum
+
+
+def _psf_optics(**kw):
+    return Optics(OpticsParams(ct_model="psf", stray_floor_db=-300.0, transmittance=1.0, **kw))
+
+
+def test_psf_crosstalk_matches_direct_convolution():
+    side, N = 5, 23  # last two tiles of the 5x5 grid are empty
+    x = np.random.default_rng(0).random(N)
+    k = coupling_kernel("lorentzian", 1.5, side, 80.0 / side, 2.0)
+    img = np.zeros(side * side)
+    img[:N] = x
+    ref = np.zeros(side * side)
+    for i in range(side * side):
+        for j in range(side * side):
+            ref[i] += k[i // side - j // side + side - 1, i % side - j % side + side - 1] * img[j]
+    out, _, _, _ = _psf_optics(psf_kernel="lorentzian:w=1.5", grid_px=80, tile_border_px=2).simulate(x, x, 5.0)
+    np.testing.assert_allclose(out, ref[:N], rtol=1e-10, atol=1e-14)
+    assert k[side - 1, side] > k[side, side] > k[side - 1, side + 1] > 0.0
+
+
+def test_psf_kernel_cached_and_batched():
+    psf_spectrum.cache_clear()
+    a, b = _psf_optics(grid_px=256), _psf_optics(grid_px=256)
+    x = np.random.default_rng(1).random((6, 4096))
+    batched, _, _, _ = a.simulate(x, x, 5.0)
+    single, _, _, _ = b.simulate(x[2], x[2], 5.0)
+    assert psf_spectrum.cache_info().misses == 1
+    np.testing.assert_allclose(batched[2], single, rtol=1e-12)
+    assert _psf_optics(psf_kernel="none").plan(16).stages == ()
@@ -0,0 +1,28 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.rare import estimate_ber_is, validate_against_brute_force
+
+
+NOISY = dict(input_noise_mV_rms=3.0)
+
+
+def test_unbiased_proposal_has_unit_weights(make_orch):
+    orch = make_orch(1, comp=NOISY)
+    est = estimate_ber_is(orch, 200, shift_sigma=0.0, scale=1.0)
+    assert orch.noise_bias is None
+    # With q == p every weight is exactly one, so IS reduces to plain counting
+    assert est["is_ber"] == est["n_hits"] / est["n_bits"]
+
+
+def test_importance_sampling_matches_brute_force(make_orch):
+    res = validate_against_brute_force(lambda: make_orch(1, comp=NOISY), mc_trials=20000, is_trials=5000,
+                                       shift_sigma=2.0, batch=1000)
+    assert res["mc_n_err"] > 1000
+    assert res["n_hits"] > res["mc_n_err"] / 4  # proposal hits errors more often per frame
+    assert abs(res["z"]) < 4.0
+    assert res["is_rel_err"] < 0.05
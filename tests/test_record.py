@@ -0,0 +1,30 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import TRIAL_DTYPE
+
+
+NEIGHBOR = dict(ct_model="neighbor")
+
+
+def test_record_matches_full_step_results(make_orch):
+    ref = make_orch(11, optx=NEIGHBOR)
+    rows = [ref.step() for _ in range(40)]
+    log = make_orch(11, optx=NEIGHBOR).record(40, vector_every=8)
+    assert log.metrics.dtype == TRIAL_DTYPE
+    np.testing.assert_array_equal(log.metrics["n_err"], [r["n_err"] for r in rows])
+    np.testing.assert_allclose(log.metrics["energy_pj"], [r["energy_pj"] for r in rows])
+    np.testing.assert_array_equal(log.vector_trials, [0, 8, 16, 24, 32])
+    np.testing.assert_array_equal(log.t_out, [rows[i]["t_out"] for i in log.vector_trials])
+    np.testing.assert_allclose(log.dv_mV[2], rows[16]["dv_mV"])
+
+
+def test_record_batched_without_vectors(make_orch):
+    log = make_orch(11, optx=NEIGHBOR).record(100, batch=32)
+    assert log.metrics.shape == (100,)
+    assert log.t_out is None
+    assert np.all(log.metrics["n_bits"] == 16)
@@ -25,3 +25,14 @@ def test_build_orchestrator_without_optional_packs():
     result = orch.step()
     assert "ber" in result
     assert "energy_pj" in result
+
+
+def test_workers_reject_early_stopping():
+    import pytest
+
+    from looking_glass.scenario import run_scenario_cli
+
+    scenario_path = repo_root / "configs" / "scenarios" / "pd_only.yaml"
+    with pytest.raises(SystemExit):
+        run_scenario_cli([str(scenario_path), "--workers", "2", "--min-errors", "5",
+                          "--sweep-window-ns", "5:10:2"])
@@ -0,0 +1,42 @@
+import copy
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.shard import orchestrator_params, run_sharded, shard_sizes
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+from looking_glass.sim.thermal import ThermalParams
+
+
+def _params():
+    orch = Orchestrator(SystemParams(channels=16, seed=11), EmitterParams(channels=16, power_sigma_pct=5.0),
+                        OpticsParams(ct_model="neighbor"), PDParams(), TIAParams(gain_sigma_pct=3.0),
+                        ComparatorParams(input_noise_mV_rms=2.0, vth_sigma_mV=0.5), ClockParams(),
+                        thermal_p=ThermalParams(drift_scale=0.5))
+    return orchestrator_params(orch)
+
+
+def test_shard_sizes_cover_budget():
+    assert shard_sizes(250, 100) == [100, 100, 50]
+    assert shard_sizes(0, 100) == []
+
+
+def test_sharded_run_is_independent_of_worker_count():
+    p = _params()
+    before = copy.deepcopy(p)
+    serial = run_sharded(p, 300, shard_size=64, workers=1, batch=32)
+    pooled = run_sharded(p, 300, shard_size=64, workers=2, batch=32)
+    for k in ("elapsed_s", "workers"):
+        serial.pop(k)
+        pooled.pop(k)
+    assert serial == pooled
+    assert serial["trials"] == 300 and serial["shards"] == 5
+    # Shards share the caller's params; drift must never be written back into them
+    assert [vars(x) if x is not None else None for x in p] == [vars(x) if x is not None else None for x in before]
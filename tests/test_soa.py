@@ -0,0 +1,34 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.optics import Optics, OpticsParams, soa_gain_step
+
+
+def test_exp_solver_is_exact_where_euler_overshoots():
+    G0, total, tau = np.full(3, 20.0), np.array([0.1, 5.0, 50.0]), 0.5e-9
+    dt = 10 * tau
+    exact = soa_gain_step(G0, total, dt, 20.0, 10.0, tau, "exp")
+    g_ss = 20.0 / (1.0 + total / 10.0)
+    np.testing.assert_allclose(exact, g_ss + (G0 - g_ss) * np.exp(-(1.0 + total / 10.0) * 10), rtol=1e-12)
+    fine = soa_gain_step(G0, total, dt, 20.0, 10.0, tau, "euler", substeps=20000)
+    np.testing.assert_allclose(fine, exact, rtol=1e-3)
+    # One Euler step with dt = 10 tau is clipped to the gain floor for strong input
+    assert soa_gain_step(G0, total, dt, 20.0, 10.0, tau)[2] == 1e-3
+
+
+def test_sequence_batch_matches_frame_by_frame():
+    # 0 dB small-signal gain: no ASE draws, so both paths are deterministic
+    kw = dict(soa_on=True, soa_small_signal_gain_db=0.0, soa_psat_mw=0.5, soa_tau_ns=2.0, soa_solver="exp",
+              soa_pattern_alpha=0.3, soa_sequence=True)
+    x = np.random.default_rng(1).random((12, 8))
+    batch = Optics(OpticsParams(**kw), rng=np.random.default_rng(5))
+    out = batch.simulate(x, 1.0 - x, 1.0)[0]
+    step = Optics(OpticsParams(**kw), rng=np.random.default_rng(5))
+    ref = np.stack([step.simulate(x[t], 1.0 - x[t], 1.0)[0] for t in range(len(x))])
+    np.testing.assert_allclose(out, ref, rtol=1e-12)
+    np.testing.assert_array_equal(batch._soa_gain, step._soa_gain)
+    assert not batch.has_frame_memory()
@@ -0,0 +1,43 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.optics import Optics, OpticsParams
+from looking_glass.sim.speckle import speckle_bank
+
+
+def _speckle_optics(**kw):
+    p = OpticsParams(ct_model="none", stray_floor_db=-300.0, transmittance=1.0, grid_px=64, **kw)
+    return Optics(p, rng=np.random.default_rng(0))
+
+
+def test_bank_has_unit_variance_and_requested_correlation():
+    bank = speckle_bank(64, 4.0, 128)
+    assert abs(bank.std() - 1.0) < 0.02
+    lag4 = np.mean(bank * np.roll(bank, 4, axis=2))
+    assert abs(lag4 - np.exp(-0.5)) < 0.03
+
+
+def test_time_speckle_ar1_same_in_batch_and_sequence():
+    kw = dict(speckle_time_on=True, speckle_time_sigma=0.1, speckle_time_tau_frames=10)
+    seq_o, bat_o = _speckle_optics(**kw), _speckle_optics(**kw)
+    x = np.ones(256)
+    seq = np.array([seq_o.simulate(x, x, 5.0)[0] for _ in range(120)])
+    bat = bat_o.simulate(np.ones((120, 256)), np.ones((120, 256)), 5.0)[0]
+    np.testing.assert_allclose(bat, seq, rtol=1e-12)
+    lag1 = np.corrcoef(seq[:-1].ravel(), seq[1:].ravel())[0, 1]
+    assert abs(lag1 - np.exp(-0.1)) < 0.05
+
+
+def test_static_speckle_from_memmapped_bank(tmp_path):
+    optx = _speckle_optics(speckle_on=True, speckle_sigma=0.15, speckle_corr_px=11,
+                           speckle_bank_frames=8, speckle_bank_path=str(tmp_path))
+    x = np.ones(64)
+    a, b = optx.simulate(x, x, 5.0)[0], optx.simulate(x, x, 5.0)[0]
+    np.testing.assert_array_equal(a, b)
+    assert 0.05 < a.std() < 0.3
+    assert isinstance(optx.plan(64).speckle_bank, np.memmap)
+    assert len(list(tmp_path.glob("speckle_*.npy"))) == 1
@@ -0,0 +1,68 @@
+from pathlib import Path
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.stats import BerAccumulator, StopRule, clopper_pearson_ci, wilson_ci
+
+
+def test_interval_reference_values():
+    np.testing.assert_allclose(wilson_ci(5, 100), (0.021543, 0.111752), atol=1e-5)
+    np.testing.assert_allclose(clopper_pearson_ci(5, 100), (0.016432, 0.112835), atol=1e-5)
+    # k = 0: upper bound is 1 - (alpha/2)^(1/n)
+    lo, hi = clopper_pearson_ci(0, 100)
+    assert lo == 0.0
+    np.testing.assert_allclose(hi, 1.0 - 0.025 ** (1.0 / 100), rtol=1e-9)
+
+
+def test_accumulator_pools_batches_and_levels():
+    rng = np.random.default_rng(0)
+    truth = rng.integers(-1, 2, size=(50, 8))
+    out = truth.copy()
+    out[::7, 3] = 0
+    acc = BerAccumulator(8)
+    acc.update(out[:20], truth[:20])
+    other = BerAccumulator(8)
+    for t, o in zip(truth[20:], out[20:]):
+        other.update(o, t)
+    acc.merge(other)
+    n_err = int((out != truth).sum())
+    assert acc.n_bits == 400 and acc.n_err == n_err
+    assert acc.ch_err.tolist() == (out != truth).sum(axis=0).tolist()
+    levels = acc.level_counts()
+    assert levels[0][0] == 0
+    assert sum(e for e, _ in levels.values()) == n_err
+    s = acc.summary()
+    assert s["ber_wilson_lo"] <= s["pooled_ber"] <= s["ber_wilson_hi"]
+    assert s["ber_cp_lo"] <= s["pooled_ber"] <= s["ber_cp_hi"]
+
+
+def test_stop_rule_reasons():
+    acc = BerAccumulator(4)
+    truth = np.zeros((100, 4), dtype=int)
+    out = truth.copy()
+    out[:10, 0] = 1
+    acc.update(out, truth)
+    assert StopRule(min_errors=10).reason(acc, 100, 0.0) == "min_errors"
+    assert StopRule(min_errors=10, min_trials=200, max_trials=1000).reason(acc, 100, 0.0) is None
+    assert StopRule(rel_ci_width=0.01, max_trials=100).reason(acc, 100, 0.0) == "max_trials"
+    assert StopRule(rel_ci_width=0.01, max_seconds=1.0).reason(acc, 100, 2.0) == "max_seconds"
+    lo, hi = acc.wilson()
+    assert StopRule(rel_ci_width=(hi - lo) / acc.ber).reason(acc, 100, 0.0) == "rel_ci_width"
+
+
+def test_run_until_requires_budget_for_unreachable_target(make_orch):
+    import pytest
+
+    orch = make_orch(2)
+    target = StopRule(min_errors=10**9, check_every=10)
+    with pytest.raises(ValueError):
+        orch.run_until(target)
+    with pytest.raises(ValueError):
+        orch.run_until(StopRule(rel_ci_width=0.1))
+    log, acc, reason = orch.run_until(replace(target, max_trials=25))
+    assert reason == "max_trials"
+    assert log.metrics.shape == (25,) and acc.n_bits == 25 * 16
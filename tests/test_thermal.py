@@ -0,0 +1,68 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+from looking_glass.sim.thermal import Thermal, ThermalParams
+
+
+def test_trajectory_matches_stepping_frame_by_frame():
+    p = ThermalParams(drift_scale=2.0, corner_hz=1e5)
+    block = Thermal(p, rng=np.random.default_rng(4))
+    single = Thermal(p, rng=np.random.default_rng(4))
+    traj = block.trajectory(500, frame_period_s=1e-7)
+    steps = [single.step(frame_period_s=1e-7) for _ in range(500)]
+    np.testing.assert_allclose(traj["comp_vth_mV_delta"], [s["comp_vth_mV_delta"] for s in steps], rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(traj["opt_trans_scale"], [s["opt_trans_scale"] for s in steps], rtol=1e-12)
+    assert np.isclose(block._state, single._state, rtol=1e-9)
+
+
+def test_drift_feeds_batches_without_mutating_params():
+    comp_p, optx_p = ComparatorParams(vth_mV=5.0), OpticsParams(transmittance=0.7)
+    orch = Orchestrator(SystemParams(channels=8, seed=2), EmitterParams(channels=8), optx_p, PDParams(), TIAParams(),
+                        comp_p, ClockParams(), thermal_p=ThermalParams(drift_scale=50.0, corner_hz=1e6))
+    assert orch._batch_independent()
+    orch.step_batch(16)
+    orch.step()
+    assert comp_p.vth_mV == 5.0 and optx_p.transmittance == 0.7
+    drifted = orch.comp.vth_live_mV
+    assert np.ndim(drifted) == 0 and drifted != 5.0
+    comp_p.vth_mV = 6.0  # a sweep point restarts the drift from the new value
+    orch.step()
+    assert orch._drift[0] == (6.0, 0.7)
+    orch.reset_drift()
+    assert orch.comp.vth_live_mV is None and orch.optx.transmittance_live is None
+
+
+def test_temperature_ramp_runs_vectorized_without_mutating_params():
+    sys_p = SystemParams(channels=8, seed=2, temp_C=30.0, temp_ramp_C_per_hr=3.6e12)  # 1 C per ns
+    orch = Orchestrator(sys_p, EmitterParams(channels=8, temp_coeff_pct_per_C=1.0), OpticsParams(), PDParams(),
+                        TIAParams(), ComparatorParams(drift_mV_per_C=0.5), ClockParams())
+    assert orch._batch_independent()
+    out = orch.step_batch(6)
+    assert sys_p.temp_C == 30.0
+    temps = 30.0 + np.cumsum(out["window_ns"])
+    np.testing.assert_allclose(orch.emit._delta_lambda_nm[:, 0], (temps - 25.0) * 0.1, rtol=1e-12)
+    assert orch.temp_C == temps[-1]
+    tern = np.tile([-1, 0, 1, 1], (6, 2))
+    Pp, Pm = orch.emit.mean_rails(tern, temps[:, None])
+    for b in range(6):
+        Pp_b, Pm_b = orch.emit.mean_rails(tern[b], temps[b])
+        np.testing.assert_array_equal(Pp[b], Pp_b)
+        np.testing.assert_array_equal(Pm[b], Pm_b)
+    orch.step()
+    assert sys_p.temp_C == 30.0 and orch.temp_C > temps[-1]
+    sys_p.temp_C = 20.0  # reassigning restarts the ramp from the new value
+    assert orch.temp_C == 20.0
+    orch.step()
+    orch.reset_drift()
+    assert orch.temp_C == 20.0
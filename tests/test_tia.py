@@ -0,0 +1,53 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.sim.tia import TIA, TIAParams
+
+QUIET = dict(in_noise_pA_rthz=0.0, adc_bits=0, bw_mhz=80.0)
+
+
+def test_waveform_end_sample_matches_frame_update_for_single_pole():
+    rng = np.random.default_rng(0)
+    frame = TIA(TIAParams(**QUIET))
+    wave = TIA(TIAParams(waveform_oversample=16, **QUIET))
+    for I in rng.normal(1e-4, 5e-5, (5, 8)):
+        np.testing.assert_allclose(wave.simulate(I, 3.0), frame.simulate(I, 3.0), rtol=1e-12, atol=1e-15)
+
+    # Sampling mid-window sees less of the new symbol
+    mid = TIA(TIAParams(waveform_oversample=16, sample_frac=0.5, **QUIET))
+    assert np.all(mid.simulate(np.full(8, 1e-4), 3.0) < wave.plan().R * 1e-4 * (1 - np.exp(wave.plan().k1 * 3e-9)))
+
+
+def test_waveform_sequence_block_matches_window_by_window():
+    rng = np.random.default_rng(1)
+    I = rng.normal(1e-4, 5e-5, (6, 5))
+    dt = 3.0 + rng.normal(0.0, 0.01, (6, 1))
+    params = dict(waveform_oversample=16, bw2_mhz=200.0, slew_v_per_us=0.2, **QUIET)
+    block = TIA(TIAParams(waveform_sequence=True, **params)).simulate(I, dt)
+    single = TIA(TIAParams(**params))
+    steps = np.array([single.simulate(I[t], dt[t, 0]) for t in range(len(I))])
+    np.testing.assert_allclose(block, steps, rtol=1e-12, atol=1e-15)
+
+
+def test_orchestrator_waveform_sequence_batch_matches_frame_by_frame(make_orch):
+    import pytest
+
+    def orch(reset=False):
+        # Slow TIA without reset: strong ISI carried from frame to frame and rail to rail
+        return make_orch(3, system=dict(rng_streams=True, reset_analog_state_each_frame=reset),
+                         tia=dict(QUIET, waveform_oversample=8, waveform_sequence=True, bw_mhz=30.0))
+    fast = orch()
+    assert fast._batch_independent()
+    block = [fast.step_batch(12) for _ in range(2)]  # state carries across blocks too
+    slow = orch().step_batch(24, sequential=True)
+    np.testing.assert_allclose(np.vstack([b["dv_mV"] for b in block]), slow["dv_mV"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(np.vstack([b["t_out"] for b in block]), slow["t_out"])
+
+    reset = orch(reset=True)
+    assert not reset._batch_independent()
+    with pytest.raises(ValueError):
+        reset.step_batch(4, sequential=False)
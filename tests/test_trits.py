@@ -0,0 +1,44 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from looking_glass.orchestrator import Orchestrator, SystemParams
+from looking_glass.sim.emitter import EmitterParams
+from looking_glass.sim.optics import OpticsParams
+from looking_glass.sim.sensor import PDParams
+from looking_glass.sim.tia import TIAParams
+from looking_glass.sim.comparator import ComparatorParams
+from looking_glass.sim.clock import ClockParams
+from looking_glass.stats import BerAccumulator
+from looking_glass.trits import pack_trits, trit_confusion, trit_errors, unpack_trits
+
+
+def test_packed_kernels_match_unpacked_counts():
+    rng = np.random.default_rng(0)
+    for n in (1, 31, 32, 33, 100):
+        truth = rng.integers(-1, 2, (9, n)).astype(np.int8)
+        out = np.where(rng.random((9, n)) < 0.3, rng.integers(-1, 2, (9, n)), truth).astype(np.int8)
+        pt, po = pack_trits(truth), pack_trits(out)
+        assert pt.dtype == np.uint8 and pt.shape == (9, 8 * -(-n // 32))
+        np.testing.assert_array_equal(unpack_trits(pt, n), truth)
+        np.testing.assert_array_equal(trit_errors(po, pt), (out != truth).sum(axis=1))
+        acc = BerAccumulator()
+        acc.update(out, truth)
+        np.testing.assert_array_equal(trit_confusion(pt, po, n), acc.confusion)
+
+
+def test_record_packed_vectors_match_int8_log():
+    def orch():
+        return Orchestrator(SystemParams(channels=16, seed=5), EmitterParams(channels=16), OpticsParams(),
+                            PDParams(), TIAParams(), ComparatorParams(input_noise_mV_rms=5.0), ClockParams())
+
+    plain = orch().record(64, batch=16, vector_every=2)
+    packed = orch().record(64, batch=16, vector_every=2, packed=True)
+    assert plain.t_out.dtype == np.int8 and packed.t_out.shape == (32, 8)
+    np.testing.assert_array_equal(packed.trits()[0], plain.t_out)
+    np.testing.assert_array_equal(packed.errors(), plain.errors())
+    np.testing.assert_array_equal(packed.confusion(), plain.confusion())
+    assert packed.confusion().sum() == 32 * 16